@@ -0,0 +1,15 @@
+"""
+Benchmarks for pytheos, to be run with airspeed velocity (asv).
+
+Run in the repository root:
+
+    asv run
+    asv compare HEAD~1 HEAD
+    asv continuous master HEAD
+
+Results are stored in .asv/results for each commit and machine, so that
+asv compare and asv publish show regressions from run to run.
+For a quick check of the working tree without building environments:
+
+    asv run --python=same --quick
+"""
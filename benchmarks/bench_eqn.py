@@ -0,0 +1,144 @@
+"""
+Benchmarks for the forward equations, pressure from volume and temperature
+"""
+from pytheos.eqn_bm3 import bm3_p
+from pytheos.eqn_vinet import vinet_p
+from pytheos.eqn_kunc import kunc_p
+from pytheos.eqn_therm_constq import constq_pth
+from pytheos.eqn_therm_Tange import tange_pth
+from pytheos.eqn_therm_Speziale import speziale_pth
+from pytheos.eqn_therm_Dorogokupets2007 import dorogokupets2007_pth
+from pytheos.eqn_therm_Dorogokupets2015 import dorogokupets2015_pth
+from pytheos.eqn_therm import alphakt_pth
+from pytheos.eqn_anharmonic import zharkov_panh
+from pytheos.eqn_electronic import zharkov_pel, tsuchiya_pel
+from pytheos.eqn_hugoniot import hugoniot_p, hugoniot_t
+from pytheos.eqn_jamieson import jamieson_pst, jamieson_pth
+from pytheos.eqn_debye import debye_E
+from pytheos.scales.registry import get_scale
+from .common import sizes, uncertainties, check_size, make_array, get_params
+
+# static equations and scales to take parameters from
+static_eqns = {'bm3_p': (bm3_p, 'gold/Fei2007bm3'),
+               'vinet_p': (vinet_p, 'gold/Fei2007vinet'),
+               'kunc_p': (kunc_p, 'periclase/Dorogokupets2015')}
+
+# thermal, anharmonic, and electronic equations, scales to take parameters
+# from, and the parameter dictionary
+thermal_eqns = {
+    'constq_pth': (constq_pth, 'gold/Fei2007bm3', 'params_th'),
+    'tange_pth': (tange_pth, 'periclase/Tange2009', 'params_th'),
+    'speziale_pth': (speziale_pth, 'periclase/Speziale2001', 'params_th'),
+    'dorogokupets2007_pth': (dorogokupets2007_pth, 'gold/Dorogokupets2007',
+                             'params_th'),
+    'dorogokupets2015_pth': (dorogokupets2015_pth, 'gold/Dorogokupets2015',
+                             'params_th'),
+    'zharkov_panh': (zharkov_panh, 'gold/Dorogokupets2015', 'params_anh'),
+    'zharkov_pel': (zharkov_pel, 'gold/Dorogokupets2015', 'params_el'),
+    'tsuchiya_pel': (tsuchiya_pel, 'gold/Yokoo2009', 'params_el')}
+
+# shock equations use Jamieson's linear fit for gold
+shock_key = 'gold/Jamieson1982H'
+
+
+class StaticEqn(object):
+    """
+    static pressure from volume
+    """
+    params = (sorted(static_eqns.keys()), sizes, uncertainties)
+    param_names = ['eqn', 'size', 'uncertainties']
+
+    def setup(self, eqn, size, with_uncertainties):
+        check_size(size, with_uncertainties)
+        self.func, key = static_eqns[eqn]
+        self.args = get_params(key)
+        v0 = self.args[0]
+        self.v = make_array(v0, 0.6 * v0, size, with_uncertainties)
+
+    def time_eqn(self, eqn, size, with_uncertainties):
+        self.func(self.v, *self.args)
+
+
+class ThermalEqn(object):
+    """
+    thermal, anharmonic, and electronic pressures from volume and
+    temperature
+    """
+    params = (sorted(thermal_eqns.keys()) + ['alphakt_pth'], sizes,
+              uncertainties)
+    param_names = ['eqn', 'size', 'uncertainties']
+
+    def setup(self, eqn, size, with_uncertainties):
+        check_size(size, with_uncertainties)
+        if eqn == 'alphakt_pth':
+            # no scale in pytheos uses alphakt, values for platinum
+            v0 = 60.38
+            self.func = alphakt_pth
+            self.args = [v0, 2.6e-5, 273., 1., 4.]
+        else:
+            self.func, key, name = thermal_eqns[eqn]
+            scale = get_scale(key)
+            self.args = get_params(key, name) + [scale.n, scale.z]
+            v0 = self.args[0]
+        self.v = make_array(v0, 0.6 * v0, size, with_uncertainties)
+        self.temp = make_array(300., 3000., size, with_uncertainties)
+
+    def time_eqn(self, eqn, size, with_uncertainties):
+        self.func(self.v, self.temp, *self.args)
+
+
+class ShockEqn(object):
+    """
+    pressure and temperature along a hugoniot and pressures from
+    Jamieson's equations
+    """
+    params = (['hugoniot_p', 'hugoniot_t', 'jamieson_pst', 'jamieson_pth'],
+              sizes, uncertainties)
+    param_names = ['eqn', 'size', 'uncertainties']
+    timeout = 300.
+
+    def setup(self, eqn, size, with_uncertainties):
+        check_size(size, with_uncertainties)
+        scale = get_scale(shock_key)
+        rho0, c0, s = get_params(shock_key, 'params_hugoniot')
+        v0, gamma0, q, theta0 = get_params(shock_key, 'params_therm')
+        if eqn == 'hugoniot_p':
+            self.func = hugoniot_p
+            self.x = make_array(rho0, 1.4 * rho0, size, with_uncertainties)
+            self.args, self.kwargs = [rho0, c0, s], {}
+        elif eqn == 'hugoniot_t':
+            self.func = hugoniot_t
+            self.x = make_array(rho0, 1.4 * rho0, size, with_uncertainties)
+            self.args = [rho0, c0, s, gamma0, q, theta0, scale.n,
+                         scale.mass]
+            self.kwargs = {'three_r': scale.three_r, 'c_v': scale.c_v}
+        else:
+            self.func = jamieson_pst if eqn == 'jamieson_pst' \
+                else jamieson_pth
+            self.x = make_array(v0, 0.7 * v0, size, with_uncertainties)
+            self.args = [v0, c0, s, gamma0, q, theta0, scale.n, scale.z,
+                         scale.mass, scale.c_v]
+            self.kwargs = {'three_r': scale.three_r}
+
+    def time_eqn(self, eqn, size, with_uncertainties):
+        self.func(self.x, *self.args, **self.kwargs)
+
+
+class DebyeE(object):
+    """
+    Debye energy
+    """
+    params = (sizes, uncertainties, ['default', 'table'])
+    param_names = ['size', 'uncertainties', 'method']
+
+    def setup(self, size, with_uncertainties, method):
+        check_size(size, with_uncertainties)
+        if with_uncertainties and (method == 'table'):
+            # the table cannot handle uncertainties
+            raise NotImplementedError
+        self.x = make_array(0.01, 10., size, with_uncertainties)
+        self.table = (method == 'table')
+        debye_E(self.x[:1], table=self.table)
+
+    def time_debye_E(self, size, with_uncertainties, method):
+        debye_E(self.x, table=self.table)
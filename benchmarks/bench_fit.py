@@ -0,0 +1,133 @@
+"""
+Benchmarks for the lmfit models, fitted to the data in
+examples/7-11-eos-fit/data.  Pressures are calculated from the volume of
+gold using Fei et al. (2007).  With uncertainties, the fits are weighted
+by the standard deviations of the pressures.
+"""
+import numpy as np
+from uncertainties import unumpy as unp
+from pytheos.fit_static import BM3Model, VinetModel, KuncModel
+from pytheos.fit_thermal import ConstqModel, TangeModel, SpezialeModel, \
+    Dorogokupets2007Model, Dorogokupets2015Model
+from pytheos.fit_electronic import ZharkovElecModel
+from pytheos.fit_anharmonic import ZharkovAnhModel
+from pytheos.scales.registry import get_scale
+from .common import uncertainties, read_data
+
+scale_key = 'gold/Fei2007bm3'
+
+# SiC polytypes in the data, values from examples/7-11-eos-fit
+datasets = {'3C': {'v0': 82.8042, 'k0': 241.2, 'k0p': 2.84, 'n': 2.,
+                   'z': 4.},
+            '6H': {'v0': 124.27, 'k0': 243.1, 'k0p': 2.79, 'n': 2.,
+                   'z': 6.}}
+
+static_models = {'bm3': BM3Model, 'vinet': VinetModel, 'kunc': KuncModel}
+
+# thermal models, initial values, and parameters to fix in addition to v0.
+# Anharmonic and electronic models are added to the constq model.
+thermal_models = {
+    'constq': (ConstqModel, {'gamma0': 1.06, 'q': 1., 'theta0': 1200.},
+               ['gamma0', 'theta0']),
+    'tange': (TangeModel, {'gamma0': 1.06, 'a': 0.1, 'b': 1.,
+                           'theta0': 1200.},
+              ['gamma0', 'theta0']),
+    'speziale': (SpezialeModel, {'gamma0': 1.06, 'q0': 1., 'q1': 1.,
+                                 'theta0': 1200.},
+                 ['gamma0', 'theta0']),
+    'dorogokupets2007': (Dorogokupets2007Model,
+                         {'gamma0': 1.06, 'gamma_inf': 0.4, 'beta': 1.,
+                          'theta0': 1200.},
+                         ['gamma0', 'theta0']),
+    'dorogokupets2015': (Dorogokupets2015Model,
+                         {'gamma0': 1.06, 'gamma_inf': 0.4, 'beta': 1.,
+                          'theta01': 1200., 'm1': 3., 'theta02': 600.,
+                          'm2': 3.},
+                         ['gamma0', 'beta', 'theta01', 'm1', 'theta02',
+                          'm2']),
+    'zharkov_anh': (ZharkovAnhModel, {'a0': 0.1e-6, 'm': 0.01}, []),
+    'zharkov_el': (ZharkovElecModel, {'e0': 0.1e-6, 'g': 0.01}, [])}
+
+
+def _get_pressure(data, temp):
+    """
+    calculate pressure from the volume of gold
+
+    :param data: structured array from read_data
+    :param temp: temperature in K
+    :return: pressure in GPa
+    :note: internal function
+    """
+    v_std = unp.uarray(data['VAu'], data['sVAu'])
+    return get_scale(scale_key).cal_p(v_std, temp)
+
+
+class StaticFit(object):
+    """
+    fit static models to the 300-K data
+    """
+    params = (sorted(static_models.keys()), sorted(datasets.keys()),
+              uncertainties)
+    param_names = ['model', 'data', 'uncertainties']
+
+    def setup(self, model, dataset, with_uncertainties):
+        data = read_data(dataset + '-300EOS-final.csv')
+        values = datasets[dataset]
+        p = _get_pressure(data, np.ones_like(data['VAu']) * 300.)
+        self.p = unp.nominal_values(p)
+        self.v = data['V' + dataset]
+        self.weights = 1. / unp.std_devs(p) if with_uncertainties else None
+        self.model = static_models[model]()
+        self.params = self.model.make_params(
+            v0=values['v0'], k0=values['k0'], k0p=values['k0p'])
+        self.params['v0'].vary = False
+
+    def time_fit(self, model, dataset, with_uncertainties):
+        self.model.fit(self.p, self.params, v=self.v, weights=self.weights)
+
+
+class ThermalFit(object):
+    """
+    fit thermal models to the high-temperature data, with the static
+    parameters fixed
+    """
+    params = (sorted(thermal_models.keys()), sorted(datasets.keys()),
+              uncertainties)
+    param_names = ['model', 'data', 'uncertainties']
+
+    def setup(self, model, dataset, with_uncertainties):
+        data = read_data(dataset + '-HiTEOS-final.csv')
+        values = datasets[dataset]
+        temp = unp.uarray(data['T' + dataset], data['sT' + dataset])
+        p = _get_pressure(data, temp)
+        self.p = unp.nominal_values(p)
+        self.v = data['V' + dataset]
+        self.temp = data['T' + dataset]
+        self.weights = 1. / unp.std_devs(p) if with_uncertainties else None
+        n, z, v0 = values['n'], values['z'], values['v0']
+        cls, init, fixed = thermal_models[model]
+        eos_st = BM3Model(prefix='st_')
+        self.params = eos_st.make_params(v0=v0, k0=values['k0'],
+                                         k0p=values['k0p'])
+        if cls in (ZharkovAnhModel, ZharkovElecModel):
+            eos_th = ConstqModel(n, z, prefix='th_')
+            self.params += eos_th.make_params(v0=v0, gamma0=1.06, q=1.,
+                                              theta0=1200.)
+            for name in ['v0', 'gamma0', 'q', 'theta0']:
+                self.params['th_' + name].vary = False
+            eos_x = cls(n, z, prefix='x_')
+            self.params += eos_x.make_params(v0=v0, **init)
+            self.params['x_v0'].vary = False
+            self.model = eos_st + eos_th + eos_x
+        else:
+            eos_th = cls(n, z, prefix='th_')
+            self.params += eos_th.make_params(v0=v0, **init)
+            for name in ['v0'] + fixed:
+                self.params['th_' + name].vary = False
+            self.model = eos_st + eos_th
+        for name in ['v0', 'k0', 'k0p']:
+            self.params['st_' + name].vary = False
+
+    def time_fit(self, model, dataset, with_uncertainties):
+        self.model.fit(self.p, self.params, v=self.v, temp=self.temp,
+                       weights=self.weights)
@@ -0,0 +1,47 @@
+"""
+Benchmarks for the inversions, volume or density from pressure
+"""
+from pytheos.eqn_bm3 import bm3_v
+from pytheos.eqn_vinet import vinet_v
+from pytheos.eqn_kunc import kunc_v
+from pytheos.eqn_hugoniot import hugoniot_rho
+from .common import sizes, uncertainties, check_size, make_array, get_params
+
+static_eqns = {'bm3_v': (bm3_v, 'gold/Fei2007bm3'),
+               'vinet_v': (vinet_v, 'gold/Fei2007vinet'),
+               'kunc_v': (kunc_v, 'periclase/Dorogokupets2015')}
+
+
+class StaticInversion(object):
+    """
+    volume from pressure for the static equations
+    """
+    params = (sorted(static_eqns.keys()), sizes, uncertainties)
+    param_names = ['eqn', 'size', 'uncertainties']
+    timeout = 600.
+
+    def setup(self, eqn, size, with_uncertainties):
+        check_size(size, with_uncertainties)
+        self.func, key = static_eqns[eqn]
+        self.args = get_params(key)
+        self.p = make_array(0., 150., size, with_uncertainties)
+
+    def time_inversion(self, eqn, size, with_uncertainties):
+        self.func(self.p, *self.args)
+
+
+class HugoniotInversion(object):
+    """
+    density from pressure along a hugoniot
+    """
+    params = (sizes, uncertainties)
+    param_names = ['size', 'uncertainties']
+    timeout = 600.
+
+    def setup(self, size, with_uncertainties):
+        check_size(size, with_uncertainties)
+        self.args = get_params('gold/Jamieson1982H', 'params_hugoniot')
+        self.p = make_array(0., 150., size, with_uncertainties)
+
+    def time_hugoniot_rho(self, size, with_uncertainties):
+        hugoniot_rho(self.p, *self.args)
@@ -0,0 +1,152 @@
+"""
+Benchmarks for the pressure scales, MGEOS and JHEOS
+"""
+import copy
+import numpy as np
+from pytheos.scales.registry import get_scale, list_scales
+from pytheos.phase_boundary import cal_phase_boundary, cal_delta_g
+from .common import sizes, uncertainties, check_size, make_array
+
+scale_keys = [info['key'] for info in list_scales()]
+mgeos_keys = [info['key'] for info in list_scales()
+              if info['type'] == 'MGEOS']
+
+
+def _setup_scale(key, size, with_uncertainties):
+    """
+    get a fresh scale object and input arrays
+
+    :param key: scale key
+    :param size: array size
+    :param with_uncertainties: if True, inputs are ufloat arrays
+    :return: scale, volume array, pressure array, temperature array
+    :note: internal function.  A copy is made so that the cached static
+        pressure of JHEOS is built in setup, not during timing.
+    """
+    check_size(size, with_uncertainties)
+    scale = copy.deepcopy(get_scale(key))
+    v0 = scale.cal_v(0.1, 300.)
+    v = make_array(v0, 0.8 * v0, size, with_uncertainties)
+    p = make_array(10., 100., size, with_uncertainties)
+    temp = make_array(300., 2000., size, with_uncertainties)
+    return scale, v, p, temp
+
+
+class ScalePressure(object):
+    """
+    pressure from volume and temperature, cal_p.  Without uncertainties,
+    nominal values of the parameters are used.
+    """
+    params = (scale_keys, sizes, uncertainties)
+    param_names = ['scale', 'size', 'uncertainties']
+    timeout = 300.
+
+    def setup(self, key, size, with_uncertainties):
+        self.scale, self.v, self.p, self.temp = _setup_scale(
+            key, size, with_uncertainties)
+
+    def time_cal_p(self, key, size, with_uncertainties):
+        self.scale.cal_p(self.v, self.temp, nominal=not with_uncertainties)
+
+
+class ScaleVolume(object):
+    """
+    volume from pressure and temperature, cal_v
+    """
+    params = (scale_keys, sizes, uncertainties)
+    param_names = ['scale', 'size', 'uncertainties']
+    timeout = 300.
+
+    def setup(self, key, size, with_uncertainties):
+        self.scale, self.v, self.p, self.temp = _setup_scale(
+            key, size, with_uncertainties)
+
+    def time_cal_v(self, key, size, with_uncertainties):
+        self.scale.cal_v(self.p, self.temp)
+
+
+class ScaleProperties(object):
+    """
+    bulk moduli, thermal expansion, heat capacity, and Gruneisen parameter
+    from volume and temperature, cal_properties of MGEOS
+    """
+    params = (mgeos_keys, sizes)
+    param_names = ['scale', 'size']
+    timeout = 300.
+
+    def setup(self, key, size):
+        self.scale, self.v, self.p, self.temp = _setup_scale(
+            key, size, False)
+
+    def time_cal_properties(self, key, size):
+        self.scale.cal_properties(self.v, self.temp)
+
+
+class ScaleAdiabat(object):
+    """
+    volume and temperature along adiabats of MGEOS, all starting
+    temperatures integrated together
+    """
+    params = (['periclase/Tange2009', 'platinum/Dorogokupets2015'],
+              [1, 100, 1000])
+    param_names = ['scale', 'n_adiabats']
+    timeout = 300.
+
+    def setup(self, key, n_adiabats):
+        self.scale = copy.deepcopy(get_scale(key))
+        self.p = np.linspace(0., 135., 136)
+        self.temp0 = np.linspace(1200., 2200., n_adiabats)
+
+    def time_cal_adiabat(self, key, n_adiabats):
+        self.scale.cal_adiabat(self.p, self.temp0)
+
+
+class ScaleGibbs(object):
+    """
+    Gibbs free energy table of MGEOS on a (P, T) grid, built in one pass,
+    and free energy from the table
+    """
+    params = (['periclase/Tange2009', 'sodium_chloride/Dorogokupets2007'],
+              [100, 300, 1000])
+    param_names = ['scale', 'n_grid']
+    timeout = 300.
+
+    def setup(self, key, n_grid):
+        self.scale = copy.deepcopy(get_scale(key))
+        self.table = copy.deepcopy(self.scale).tabulate_gibbs(
+            [0., 50.], [300., 3000.], n_p=n_grid, n_t=n_grid, error=False)
+        self.p = np.linspace(0., 50., 10 ** 6)
+        self.temp = np.linspace(300., 3000., 10 ** 6)
+
+    def time_tabulate_gibbs(self, key, n_grid):
+        self.scale._gibbs_cache = None
+        self.scale.tabulate_gibbs([0., 50.], [300., 3000.], n_p=n_grid,
+                                  n_t=n_grid, error=False)
+
+    def time_cal_g_table(self, key, n_grid):
+        self.table.cal_g(self.p, self.temp)
+
+
+class ScalePhaseBoundary(object):
+    """
+    B1-B2 boundary of NaCl for many temperatures at once, from the
+    equations and from Gibbs free energy tables
+    """
+    params = ([False, True], [10, 100, 1000])
+    param_names = ['tables', 'n_temp']
+    timeout = 300.
+
+    def setup(self, tables, n_temp):
+        self.b1 = copy.deepcopy(get_scale('sodium_chloride/Dorogokupets2007'))
+        self.b2 = copy.deepcopy(
+            get_scale('sodium_chloride_b2/Dorogokupets2007'))
+        self.tables = [eos.tabulate_gibbs([0., 60.], [300., 3000.],
+                                          n_p=300, n_t=300, error=False)
+                       for eos in [self.b1, self.b2]] if tables else None
+        self.temp = np.linspace(300., 3000., n_temp)
+        # B1-B2 boundary at 29.3 GPa and 300 K
+        self.dg0 = -cal_delta_g(self.b1, self.b2, 29.3, 300., 0.)
+
+    def time_cal_phase_boundary(self, tables, n_temp):
+        cal_phase_boundary(self.b1, self.b2, self.temp, dg0=self.dg0,
+                           p_range=(0., 60.), tables=self.tables)
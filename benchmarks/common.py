@@ -0,0 +1,72 @@
+"""
+Shared settings and inputs for the benchmarks
+"""
+import os
+import numpy as np
+import uncertainties as uct
+from uncertainties import unumpy as unp
+from pytheos.scales.registry import get_scale
+
+# array sizes and uncertainties switches for parametrized benchmarks
+sizes = [1, 1000, 1000000]
+uncertainties = [False, True]
+# largest size run with uncertainties objects.  1e6 ufloats take minutes
+# and gigabytes, which is not useful to time.
+max_size_uncertainties = 1000
+
+data_dir = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'examples', '7-11-eos-fit', 'data')
+
+
+def check_size(size, with_uncertainties):
+    """
+    skip a benchmark which is too slow to run
+
+    :param size: array size
+    :param with_uncertainties: if True, inputs are ufloat arrays
+    :note: asv skips a benchmark if setup raises NotImplementedError
+    """
+    if with_uncertainties and (size > max_size_uncertainties):
+        raise NotImplementedError
+
+
+def make_array(start, stop, size, with_uncertainties, rel_std=1.e-3):
+    """
+    make an input array
+
+    :param start: first value
+    :param stop: last value
+    :param size: array size
+    :param with_uncertainties: if True, return ufloat array
+    :param rel_std: standard deviation relative to the values
+    :return: float array or ufloat array
+    """
+    x = np.linspace(start, stop, size)
+    if with_uncertainties:
+        return unp.uarray(x, np.abs(x) * rel_std)
+    return x
+
+
+def get_params(key, name='params_st'):
+    """
+    get parameters of a pressure scale
+
+    :param key: scale key, such as 'gold/Fei2007bm3'
+    :param name: name of the parameter dictionary in the scale
+    :return: list of nominal values
+    """
+    return [uct.nominal_value(value)
+            for value in getattr(get_scale(key), name).values()]
+
+
+def read_data(filename):
+    """
+    read a csv file in the example data directory
+
+    :param filename: name of the file
+    :return: numpy structured array, with parentheses removed from the
+        column names, such as VAu for V(Au)
+    """
+    return np.genfromtxt(os.path.join(data_dir, filename), delimiter=',',
+                         names=True)
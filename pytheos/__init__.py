@@ -58,35 +58,77 @@ Some important motivations are:
 
 """
 __version__ = "0.0.2"
-from .eqn_bm3 import bm3_p, bm3_v, bm3_k, bm3_g, \
-    bm3_small_f, bm3_big_F, bm3_k_num, bm3_v_single  # , bm3_p_u, bm3_v_u, bm3_k_u
-from .eqn_vinet import vinet_p, vinet_v, vinet_k, \
-    vinet_k_num  # ,  vinet_p_u, vinet_v_u, vinet_k_u
-from .eqn_kunc import kunc_p, kunc_v, kunc_k_num  # , kunc_p_u, kunc_v_u
-from .eqn_hugoniot import hugoniot_p, hugoniot_t, hugoniot_rho
-from .eqn_jamieson import jamieson_pst, jamieson_pth
-from .eqn_debye import debye_E
-from .eqn_therm_constq import constq_grun, \
-    constq_debyetemp, constq_pth
-from .eqn_therm_Tange import tange_grun, tange_debyetemp, \
-    tange_pth
-from .eqn_therm_Speziale import speziale_grun, speziale_debyetemp, \
-    speziale_pth
-from .eqn_therm_Dorogokupets2007 import altshuler_grun, altshuler_debyetemp,\
-    dorogokupets2007_pth
-from .eqn_therm_Dorogokupets2015 import dorogokupets2015_pth
-from .eqn_anharmonic import zharkov_panh
-from .eqn_electronic import zharkov_pel
-from .fit_static import BM3Model, VinetModel, KuncModel
-from .fit_thermal import ConstqModel, Dorogokupets2007Model, \
-    Dorogokupets2015Model, SpezialeModel, TangeModel
-from .fit_electronic import ZharkovElecModel
-from .fit_anharmonic import ZharkovAnhModel
-from .conversion import vol_uc2mol
-from . import plot
-from .scales import gold
-from .scales import platinum
-from .scales import periclase
-from .scales import sodium_chloride
-from .scales import sodium_chloride_b2
-from .scales import neon
\ No newline at end of file
+import importlib
+
+# names exported at the top level and the modules they come from.
+# Modules are imported on the first access, so that import pytheos does not
+# pull in lmfit, matplotlib, periodictable, and the scale modules.
+_exports = {
+    '.eqn_bm3': ['bm3_p', 'bm3_v', 'bm3_k', 'bm3_kp', 'bm3_g', 'bm3_small_f',
+                 'bm3_big_F', 'bm3_k_num', 'bm3_v_single'],
+    '.eqn_vinet': ['vinet_p', 'vinet_v', 'vinet_k', 'vinet_kp', 'vinet_k_num'],
+    '.eqn_kunc': ['kunc_p', 'kunc_v', 'kunc_k', 'kunc_kp', 'kunc_k_num'],
+    '.eqn_hugoniot': ['hugoniot_p', 'hugoniot_t', 'hugoniot_rho'],
+    '.eqn_jamieson': ['jamieson_pst', 'jamieson_pth'],
+    '.eqn_debye': ['debye_E'],
+    '.eqn_therm_constq': ['constq_grun', 'constq_debyetemp', 'constq_pth'],
+    '.eqn_therm_Tange': ['tange_grun', 'tange_debyetemp', 'tange_pth'],
+    '.eqn_therm_Speziale': ['speziale_grun', 'speziale_debyetemp',
+                            'speziale_pth'],
+    '.eqn_therm_Dorogokupets2007': ['altshuler_grun', 'altshuler_debyetemp',
+                                    'dorogokupets2007_pth'],
+    '.eqn_therm_Dorogokupets2015': ['dorogokupets2015_pth'],
+    '.eqn_anharmonic': ['zharkov_panh'],
+    '.eqn_electronic': ['zharkov_pel'],
+    '.fit_static': ['BM3Model', 'VinetModel', 'KuncModel'],
+    '.fit_thermal': ['ConstqModel', 'Dorogokupets2007Model',
+                     'Dorogokupets2015Model', 'SpezialeModel', 'TangeModel'],
+    '.fit_electronic': ['ZharkovElecModel'],
+    '.fit_anharmonic': ['ZharkovAnhModel'],
+    '.fit_jacobian': ['make_dfun'],
+    '.fit_resample': ['bootstrap_fit', 'jackknife_fit'],
+    '.fit_eiv': ['errors_in_variables_fit'],
+    '.fit_global': ['GlobalFit'],
+    '.phase_boundary': ['cal_phase_boundary', 'flag_transition'],
+    '.propagation': ['linear_propagation', 'monte_carlo_propagation'],
+    '.properties': ['cal_properties', 'cal_adiabat'],
+    '.conversion': ['vol_uc2mol'],
+    '.scales.convert': ['convert_pressure', 'ConversionMap'],
+    '.scales.registry': ['get_scale', 'list_scales'],
+}
+_attributes = dict((name, module) for module, names in _exports.items()
+                   for name in names)
+_modules = {'plot': '.plot', 'scales': '.scales',
+            'gold': '.scales.gold', 'platinum': '.scales.platinum',
+            'periclase': '.scales.periclase',
+            'sodium_chloride': '.scales.sodium_chloride',
+            'sodium_chloride_b2': '.scales.sodium_chloride_b2',
+            'neon': '.scales.neon'}
+
+__all__ = sorted(list(_attributes.keys()) + list(_modules.keys()))
+
+
+def __getattr__(name):
+    """
+    import modules on the first access to their names
+    """
+    if name in _attributes:
+        value = getattr(importlib.import_module(_attributes[name], __name__),
+                        name)
+    elif name in _modules:
+        value = importlib.import_module(_modules[name], __name__)
+    else:
+        try:
+            # submodules such as pytheos.eqn_bm3
+            value = importlib.import_module('.' + name, __name__)
+        except ModuleNotFoundError as e:
+            if e.name != __name__ + '.' + name:
+                raise
+            raise AttributeError("module 'pytheos' has no attribute '" +
+                                 name + "'")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + __all__)
@@ -3,10 +3,11 @@
 function to be problematic to the functions here.
 """
 import numpy as np
-import uncertainties as uct
+from uncertainties import unumpy as unp
 from scipy.optimize import brenth
 from scipy.differentiate import derivative
 from .etc import isuncertainties
+from .solver import invert_static
 from scipy.optimize import brentq, curve_fit
 from scipy.interpolate import PchipInterpolator
 
@@ -40,9 +41,30 @@ def cal_p_bm3(v, k, p_ref=0.0):
          (1. - vvr**(-2. / 3.))**2.) * vvr**(-5. / 3.)
     return p
 
+
+def cal_dpdv_bm3(v, k, p_ref=0.0):
+    """
+    calculate dP/dV analytically from 3rd order Birch-Murnaghan equation
+
+    :param v: volume at different pressures
+    :param k: [v0, k0, k0p]
+    :param p_ref: reference pressure, default = 0.
+    :return: dP/dV
+    """
+    vvr = v / k[0]
+    u = vvr**(-2. / 3.)
+    a = 0.5 * (3. * k[1] - 5. * p_ref)
+    b = 9. / 8. * k[1] * (k[2] - 4. + 35. / 9. * p_ref / k[1])
+    g = p_ref - a * (1. - u) + b * (1. - u)**2.
+    dudx = -2. / 3. * vvr**(-5. / 3.)
+    dgdx = (a - 2. * b * (1. - u)) * dudx
+    return (dgdx * vvr**(-5. / 3.) -
+            5. / 3. * g * vvr**(-8. / 3.)) / k[0]
+
+
 def bm3_v(p, v0, k0, k0p, p_ref=0.0, min_strain=0.01):
     """
-    find volume at given pressure using brenth in scipy.optimize
+    find volume at given pressure using Newton iterations on the whole array
 
     :param p: pressure
     :param v0: volume at reference conditions
@@ -51,13 +73,35 @@ def bm3_v(p, v0, k0, k0p, p_ref=0.0, min_strain=0.01):
     :param p_ref: reference pressure (default = 0)
     :param min_strain: minimum strain value to find solution (default = 0.01)
     :return: volume at high pressure
+    :note: elements which do not converge are solved by bm3_v_single.
+        For uncertainties, the volume is linearized around the nominal
+        solution, which gives the same first order errors as uct.wrap.
     """
     if isuncertainties([p, v0, k0, k0p]):
-        f_u = np.vectorize(uct.wrap(bm3_v_single), excluded=[1, 2, 3, 4, 5])
-        return f_u(p, v0, k0, k0p, p_ref=p_ref, min_strain=min_strain)
-    else:
-        f_v = np.vectorize(bm3_v_single, excluded=[1, 2, 3, 4, 5])
-        return f_v(p, v0, k0, k0p, p_ref=p_ref, min_strain=min_strain)
+        v0_n, k0_n, k0p_n = unp.nominal_values([v0, k0, k0p])
+        p_n = unp.nominal_values(p)
+        v_n = bm3_v(p_n, v0_n, k0_n, k0p_n, p_ref=p_ref,
+                    min_strain=min_strain)
+        dpdv = cal_dpdv_bm3(v_n, [v0_n, k0_n, k0p_n], p_ref=p_ref)
+        v = v_n + (p - bm3_p(v_n, v0, k0, k0p, p_ref=p_ref)) / dpdv
+        return np.where(p_n <= 1.e-5, v0, v)
+
+    def f_p(v):
+        return bm3_p(v, v0, k0, k0p, p_ref=p_ref)
+
+    def f_dpdv(v):
+        return cal_dpdv_bm3(v, [v0, k0, k0p], p_ref=p_ref)
+
+    def v_init(p):
+        # Murnaghan equation for the initial guess
+        return v0 * np.power(1. + k0p * p / k0, -1. / k0p)
+
+    def f_single(p):
+        return bm3_v_single(p, v0, k0, k0p, p_ref=p_ref,
+                            min_strain=min_strain)
+
+    return invert_static(p, v0, f_p, f_dpdv, v_init, f_single,
+                         min_strain=min_strain)
 
 
 def cal_v_bm3(p, k):
@@ -71,20 +115,38 @@ def cal_v_bm3(p, k):
     return bm3_v(p, k[0], k[1], k[2])
 
 
-def bm3_k(p, v0, k0, k0p):
+def bm3_k(p, v0, k0, k0p, numerical=False):
     """
     calculate bulk modulus, wrapper for cal_k_bm3
-    cannot handle uncertainties
 
     :param p: pressure
     :param v0: volume at reference conditions
     :param k0: bulk modulus at reference conditions
     :param k0p: pressure derivative of bulk modulus at different conditions
+    :param numerical: if True, calculate numerically with bm3_k_num for
+        validation.  Nominal values are used.
     :return: bulk modulus at high pressure
     """
+    if numerical:
+        v0, k0, k0p = unp.nominal_values([v0, k0, k0p])
+        v = bm3_v(unp.nominal_values(p), v0, k0, k0p)
+        return bm3_k_num(v, v0, k0, k0p)
     return cal_k_bm3(p, [v0, k0, k0p])
 
 
+def bm3_kp(p, v0, k0, k0p):
+    """
+    calculate pressure derivative of bulk modulus, wrapper for cal_kp_bm3
+
+    :param p: pressure
+    :param v0: volume at reference conditions
+    :param k0: bulk modulus at reference conditions
+    :param k0p: pressure derivative of bulk modulus at different conditions
+    :return: pressure derivative of bulk modulus at high pressure
+    """
+    return cal_kp_bm3(p, [v0, k0, k0p])
+
+
 def bm3_dPdV(v, v0, k0, k0p, precision=1.e-5):
     """
     calculate dP/dV for numerical calculation of bulk modulus
@@ -96,11 +158,11 @@ def bm3_dPdV(v, v0, k0, k0p, precision=1.e-5):
     :param k0p: pressure derivative of bulk modulus at different conditions
     :param precision: precision for numerical calculation (default = 1.e-5*v0)
     :return: dP/dV
+    :note: for validation of the analytical forms.  All volumes are
+        differentiated in one call of scipy.differentiate.derivative.
     """
-    def f_scalar(v, v0, k0, k0p, precision=precision):
-        return derivative(bm3_p, v, args=(v0, k0, k0p), dx=v0 * precision)
-    f_v = np.vectorize(f_scalar, excluded=[1, 2, 3, 4])
-    return f_v(v, v0, k0, k0p, precision=precision)
+    return derivative(bm3_p, np.asarray(v, dtype=float),
+                      args=(v0, k0, k0p), initial_step=v0 * precision).df
 
 
 def bm3_k_num(v, v0, k0, k0p, precision=1.e-5):
@@ -114,6 +176,7 @@ def bm3_k_num(v, v0, k0, k0p, precision=1.e-5):
     :param k0p: pressure derivative of bulk modulus at different conditions
     :param precision: precision for numerical calculation (default = 1.e-5*v0)
     :return: dP/dV
+    :note: for validation, use cal_k_bm3_from_v for calculation
     """
     return -1. * v * bm3_dPdV(v, v0, k0, k0p, precision=precision)
 
@@ -131,6 +194,13 @@ def cal_k_bm3(p, k):
 
 
 def cal_k_bm3_from_v(v, k):
+    """
+    calculate bulk modulus analytically from volume
+
+    :param v: volume
+    :param k: [v0, k0, k0p]
+    :return: bulk modulus
+    """
     v0 = k[0]
     k0 = k[1]
     k0p = k[2]
@@ -143,6 +213,53 @@ def cal_k_bm3_from_v(v, k):
     return bulk_modulus
 
 
+def cal_kp_bm3(p, k):
+    """
+    calculate pressure derivative of bulk modulus
+
+    :param p: pressure
+    :param k: [v0, k0, k0p]
+    :return: pressure derivative of bulk modulus at high pressure
+    """
+    v = cal_v_bm3(p, k)
+    return cal_kp_bm3_from_v(v, k)
+
+
+def cal_kp_bm3_from_v(v, k):
+    """
+    calculate pressure derivative of bulk modulus analytically from volume
+
+    :param v: volume
+    :param k: [v0, k0, k0p]
+    :return: pressure derivative of bulk modulus
+    :note: K = k0 (1 + 2f)^(5/2) (1 + a f + b f^2) and dP/df is
+        3 K / (1 + 2f), so K' = (1 + 2f) / 3 dln(K)/df
+    """
+    v0 = k[0]
+    k0p = k[2]
+    f = 0.5 * (np.power(v0 / v, 2. / 3.) - 1.)
+    a = 3. * k0p - 5.
+    b = 27. / 2. * (k0p - 4.)
+    dlnkdf = 5. / (1. + 2. * f) + (a + 2. * b * f) / (1. + a * f + b * f * f)
+    return (1. + 2. * f) / 3. * dlnkdf
+
+
+def cal_e_bm3(v, k):
+    """
+    calculate static energy from 3rd order Birch-Murnaghan equation,
+    9/2 v0 k0 f^2 (1 + (k0p - 4) f), relative to v0
+
+    :param v: volume
+    :param k: [v0, k0, k0p]
+    :return: energy in the unit of pressure times volume, such as GPa A^3
+    """
+    v0 = k[0]
+    k0 = k[1]
+    k0p = k[2]
+    f = 0.5 * (np.power(v0 / v, 2. / 3.) - 1.)
+    return 4.5 * v0 * k0 * f * f * (1. + (k0p - 4.) * f)
+
+
 def bm3_g(p, v0, g0, g0p, k0, k0p):
     """
     calculate shear modulus at given pressure.
@@ -1,5 +1,5 @@
 import numpy as np
-import uncertainties as uct
+from uncertainties import unumpy as unp
 from .etc import isuncertainties
 
 
@@ -43,17 +43,290 @@ def debye_E_single(x):
     return result
 
 
-def debye_E(x):
+def cal_debye_E(x):
+    """
+    calculate Debye energy using old fortran routine for arrays.
+    All three ranges of x are computed with masks, giving the same values
+    as debye_E_single.
+
+    :params x: Debye x value, float array
+    :return: Debye energy in the same dtype as x,
+        nan for negative or nan x
+    :note: internal function, cannot handle uncertainties
+    """
+    x = np.asarray(x)
+    result = np.full(x.shape, np.nan, dtype=x.dtype)
+    xr = np.real(x)
+    # for 0 <= x <= 0.1
+    small = (xr >= 0.) & (xr <= 0.1)
+    xs = x[small]
+    result[small] = 1. - 0.375 * xs + xs * xs * \
+        (0.05 - (5.952380953e-4) * xs * xs)
+    # for 0.1 < x <= 7.25
+    mid = (xr > 0.1) & (xr <= 7.25)
+    xm = x[mid]
+    result[mid] = ((((.0946173 * xm - 4.432582) * xm +
+                     85.07724) * xm - 800.6087) * xm +
+                   3953.632) / ((((xm + 15.121491) * xm +
+                                  143.155337) * xm + 682.0012) *
+                                xm + 3953.632)
+    # for x > 7.25, round(25 / x) is at most 3, so the series in the
+    # fortran routine has at most three terms
+    large = xr > 7.25
+    xl = x[large]
+    n = np.round(25. / xr[large])
+    exx = np.exp(-xl)
+    temp = np.zeros_like(xl)
+    temp2 = np.ones_like(xl)
+    for i in range(1, 4):
+        temp2 = temp2 * exx
+        x3 = i * xl
+        temp = temp + np.where(
+            n >= i, temp2 * (6. + x3 * (6. + x3 * (3. + x3))) / i**4, 0.)
+    result[large] = 3.0 * (6.493939402 - temp) / (xl * xl * xl)
+    return result
+
+
+def cal_debye_dEdx(x, debye=None):
+    """
+    calculate x derivative of Debye energy for arrays
+
+    :params x: Debye x value, float array
+    :param debye: Debye energy at x if already calculated
+    :return: dE/dx
+    :note: internal function, cannot handle uncertainties
+    """
+    x = np.asarray(x)
+    if debye is None:
+        debye = cal_debye_E(x)
+    small = np.real(x) <= 0.1
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # dD/dx = 3 / (exp(x) - 1) - 3 D / x
+        dedx = 3. / np.expm1(x) - 3. * debye / x
+    dedx = np.where(small, -0.375 + 0.1 * x -
+                    4. * (5.952380953e-4) * x * x * x, dedx)
+    return dedx
+
+
+def debye_E(x, dtype=None, table=False, rtol=1.e-10):
     """
     calculate Debye energy using old fortran routine
 
     :params x: Debye x value
+    :param dtype: numpy dtype for calculation, such as np.float32 for
+        faster calculation with lower precision.  Default is float64.
+    :param table: if True, use the tabulated Chebyshev evaluator,
+        see DebyeTable.  dtype is ignored.
+    :param rtol: maximum relative error of the table
     :return: Debye energy
-    :note: this is a wraper function (vectorization) for debye_E_single
+    :note: this is a wraper function (vectorization) for cal_debye_E.
+        For uncertainties, the energy is linearized with the analytical
+        derivative.
+    """
+    if isuncertainties([x]):
+        x_n = unp.nominal_values(x)
+        debye = cal_debye_E(np.asarray(x_n, dtype=float))
+        return debye + cal_debye_dEdx(x_n, debye=debye) * (x - x_n)
+    if table:
+        return get_debye_table(rtol=rtol).cal_E(x)
+    x = np.asarray(x)
+    if dtype is not None:
+        x = x.astype(dtype)
+    elif not np.issubdtype(x.dtype, np.inexact):
+        x = x.astype(float)
+    return cal_debye_E(x)
+
+
+def cal_debye_Cv(x, debye=None):
+    """
+    calculate heat capacity from Debye model for arrays, in the unit of 3nR
+
+    :params x: Debye x value, float array
+    :param debye: Debye energy at x if already calculated
+    :return: heat capacity divided by 3nR
+    :note: internal function, cannot handle uncertainties
+    """
+    x = np.asarray(x)
+    if debye is None:
+        debye = cal_debye_E(x)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        cv = 4. * debye - 3. * x / np.expm1(x)
+    return np.where(np.real(x) == 0., 1., cv)
+
+
+def debye_Cv(x, table=False, rtol=1.e-10):
+    """
+    calculate heat capacity from Debye model in the unit of 3nR,
+    4 E - 3 x / (exp(x) - 1)
+
+    :params x: Debye x value
+    :param table: if True, use the tabulated Chebyshev evaluator,
+        see DebyeTable
+    :param rtol: maximum relative error of the table
+    :return: heat capacity divided by 3nR
     """
     if isuncertainties([x]):
-        f_u = uct.wrap(debye_E_single)
-        f_v = np.vectorize(f_u)
-    else:
-        f_v = np.vectorize(debye_E_single)
-    return f_v(x)
+        x_n = np.asarray(unp.nominal_values(x), dtype=float)
+        debye = cal_debye_E(x_n)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            d_term = (np.expm1(x_n) - x_n * np.exp(x_n)) / \
+                np.power(np.expm1(x_n), 2.)
+        d_term = np.where(x_n <= 1.e-6, -0.5, d_term)
+        dcvdx = 4. * cal_debye_dEdx(x_n, debye=debye) - 3. * d_term
+        return cal_debye_Cv(x_n, debye=debye) + dcvdx * (x - x_n)
+    x = np.asarray(x, dtype=float)
+    if table:
+        return get_debye_table(rtol=rtol).cal_Cv(x)
+    return cal_debye_Cv(x)
+
+
+class DebyeTable(object):
+    """
+    Piecewise Chebyshev approximation of Debye energy and heat capacity.
+    [0, x_max] is divided into intervals of equal width, starting from
+    0.8.  The width is halved until the relative error to cal_debye_E and
+    cal_debye_Cv, checked on points between the Chebyshev nodes and at both
+    ends of the intervals, is below rtol.  From the width of 0.05, 0.1 and
+    7.25 are on the interval edges, where debye_E changes its formula.
+    Intervals are closed on the right, as the ranges of cal_debye_E.
+    Above x_max, debye_E is exactly 3 * 6.493939402 / x^3.
+    """
+
+    def __init__(self, rtol=1.e-10, degree=4, x_max=50., n_check=16,
+                 max_intervals=2**15):
+        """
+        :param rtol: maximum relative error allowed
+        :param degree: degree of Chebyshev polynomial in each interval
+        :param x_max: upper limit of x for the table
+        :param n_check: number of points for error check in each interval
+        :param max_intervals: maximum number of intervals
+        :note: ValueError is raised if rtol is not reached within
+            max_intervals or if halving the width stops reducing the
+            error.  The error stops at about 5e-12, at x = 10 where the
+            number of terms in cal_debye_E changes.
+        """
+        self.rtol = rtol
+        self.degree = degree
+        self.x_max = x_max
+        h = 0.8
+        error_aligned = np.inf
+        while True:
+            n_int = int(np.ceil(x_max / h - 1.e-9))
+            if n_int > max_intervals:
+                raise ValueError(
+                    'Cannot reach rtol = {0} with {1} intervals.'.format(
+                        rtol, max_intervals))
+            coeffs_E = self._fit(cal_debye_E, h, n_int)
+            coeffs_Cv = self._fit(cal_debye_Cv, h, n_int)
+            self.h = h
+            self.coeffs_E = coeffs_E
+            self.coeffs_Cv = coeffs_Cv
+            # check error away from the nodes and at both ends of the
+            # intervals, which include the formula switches of cal_debye_E
+            # at 0.1 and 7.25
+            x = np.concatenate([
+                ((np.arange(n_int)[:, None] +
+                  (np.arange(n_check) + 0.5) / n_check) * h).ravel(),
+                np.arange(n_int + 1) * h, (np.arange(n_int) + 1.e-9) * h,
+                [0.1, 7.25]])
+            x = x[x <= x_max]
+            err_E = np.abs(self.cal_E(x) / cal_debye_E(x) - 1.).max()
+            err_Cv = np.abs(self.cal_Cv(x) / cal_debye_Cv(x) - 1.).max()
+            self.max_error = max(err_E, err_Cv)
+            if self.max_error <= rtol:
+                break
+            if h <= 0.05:
+                # error is limited by cal_debye_E once it stops decreasing
+                if self.max_error > 0.5 * error_aligned:
+                    raise ValueError(
+                        'Cannot reach rtol = {0}.  The error stays at '
+                        '{1:.1e}.'.format(rtol, self.max_error))
+                error_aligned = self.max_error
+            h *= 0.5
+
+    def _fit(self, f, h, n_int):
+        """
+        fit Chebyshev polynomials to f and convert them to power series
+        in local coordinate t in [-1, 1]
+
+        :param f: function to fit
+        :param h: width of interval
+        :param n_int: number of intervals
+        :return: coefficients in (degree + 1, n_int) array,
+            from the highest order
+        :note: internal function
+        """
+        t = np.cos(np.pi * (np.arange(self.degree + 1) + 0.5) /
+                   (self.degree + 1))
+        x = (np.arange(n_int)[:, None] + 0.5 * (t + 1.)) * h
+        y = f(x.ravel()).reshape(x.shape)
+        c = np.polynomial.chebyshev.chebfit(t, y.T, self.degree)
+        # conversion matrix from Chebyshev to power series
+        m = np.zeros((self.degree + 1, self.degree + 1))
+        for k in range(self.degree + 1):
+            pc = np.polynomial.chebyshev.cheb2poly(np.eye(self.degree + 1)[k])
+            m[:pc.size, k] = pc
+        return np.ascontiguousarray((m @ c)[::-1])
+
+    def _evaluate(self, coeffs, x):
+        """
+        evaluate piecewise polynomials using Horner's method
+
+        :param coeffs: coefficients from _fit
+        :param x: Debye x value, float array
+        :return: values of polynomials, nan for x out of [0, x_max]
+        :note: internal function
+        """
+        x = np.asarray(x, dtype=float)
+        u = x / self.h
+        # intervals are closed on the right, as the ranges of cal_debye_E
+        idx = np.clip(np.ceil(u).astype(np.int64) - 1, 0,
+                      coeffs.shape[1] - 1)
+        t = 2. * (u - idx) - 1.
+        result = coeffs[0][idx]
+        for c in coeffs[1:]:
+            result = result * t + c[idx]
+        result[~((x >= 0.) & (x <= self.x_max))] = np.nan
+        return result
+
+    def cal_E(self, x):
+        """
+        calculate Debye energy from the table
+
+        :params x: Debye x value, float array
+        :return: Debye energy
+        """
+        x = np.asarray(x, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(x > self.x_max, 3.0 * 6.493939402 / (x * x * x),
+                            self._evaluate(self.coeffs_E, x))
+
+    def cal_Cv(self, x):
+        """
+        calculate heat capacity from the table in the unit of 3nR
+
+        :params x: Debye x value, float array
+        :return: heat capacity divided by 3nR
+        """
+        x = np.asarray(x, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return np.where(x > self.x_max,
+                            4. * 3.0 * 6.493939402 / (x * x * x) -
+                            3. * x * np.exp(-x),
+                            self._evaluate(self.coeffs_Cv, x))
+
+
+_debye_tables = {}
+
+
+def get_debye_table(rtol=1.e-10):
+    """
+    get DebyeTable for given tolerance.  The table is built on the first
+    call and reused after.
+
+    :param rtol: maximum relative error allowed
+    :return: DebyeTable
+    """
+    if rtol not in _debye_tables:
+        _debye_tables[rtol] = DebyeTable(rtol=rtol)
+    return _debye_tables[rtol]
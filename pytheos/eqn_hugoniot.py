@@ -2,6 +2,7 @@ import numpy as np
 from scipy.integrate import odeint
 import scipy.constants as constants
 import uncertainties as uct
+from uncertainties import unumpy as unp
 from scipy.optimize import brenth
 from .eqn_debye import debye_E
 from .etc import isuncertainties
@@ -91,8 +92,92 @@ def hugoniot_t_single(rho, rho0, c0, s, gamma0, q, theta0, n, mass,
     return temp_h * 1.e3
 
 
+def cal_hugoniot_t(rho, rho0, c0, s, gamma0, q, theta0, n, mass,
+                   three_r=3. * constants.R, t_ref=300., c_v=0.,
+                   sensitivity=False):
+    """
+    calculate temperature along a hugoniot for many densities through
+    a single integration.  Unique eta values are sorted and odeint reports
+    the solution at all of them, from eta = 0 upward for compression and
+    downward for expansion.
+
+    :param rho: density in g/cm^3
+    :param rho0: density at 1 bar in g/cm^3
+    :param c0: velocity at 1 bar in km/s
+    :param s: slope of the velocity change
+    :param gamma0: Gruneisen parameter at 1 bar
+    :param q: logarithmic derivative of Gruneisen parameter
+    :param theta0: Debye temperature in K
+    :param n: number of elements in a chemical formula
+    :param mass: molar mass in gram
+    :param three_r: 3 times gas constant.
+        Jamieson modified this value to compensate for mismatches
+    :param t_ref: reference temperature, 300 K
+    :param c_v: heat capacity, see Jamieson 1983 for detail
+    :param sensitivity: if True, also integrate sensitivity equations for
+        derivatives of temperature at fixed eta
+    :return: temperature along hugoniot in the same shape as rho.
+        If sensitivity is True, also derivatives at fixed eta with respect
+        to rho0, c0, s, gamma0, q, theta0 in (6,) + rho.shape array
+    :note: internal function, cannot handle uncertainties
+    """
+    eta = 1. - rho0 / np.asarray(rho, dtype=float)
+    temp = np.full(eta.shape, np.nan)
+    temp[eta == 0.] = t_ref
+    dtemp = np.full((6,) + eta.shape, np.nan)
+    # at eta = 0, temperature is t_ref for any parameters
+    dtemp[:, eta == 0.] = 0.
+    threenk = three_r / mass * n  # [J/mol/K] / [g/mol] = [J/g/K]
+    k = [rho0, c0, s, gamma0, q, theta0 / 1.e3]
+    if sensitivity:
+        f_dy, y0 = _dTS_h_delta, np.zeros(7)
+        y0[0] = t_ref / 1.e3
+    else:
+        f_dy, y0 = _dT_h_delta, t_ref / 1.e3
+    for side in [eta > 0., eta < 0.]:
+        if not np.any(side):
+            continue
+        # odeint accepts a decreasing sequence of eta for expansion
+        eta_u, inverse = np.unique(eta[side], return_inverse=True)
+        if eta_u[0] < 0.:
+            eta_u, inverse = eta_u[::-1], eta_u.size - 1 - inverse
+        y_h = odeint(f_dy, y0, np.append(0., eta_u),
+                     args=(k, threenk, c_v), full_output=1)[0][1:]
+        temp[side] = y_h[:, 0][inverse.ravel()] * 1.e3
+        if sensitivity:
+            # theta0 is in kK in the integration
+            scale = np.array([1.e3, 1.e3, 1.e3, 1.e3, 1.e3, 1.])
+            dtemp[:, side] = (y_h[:, 1:] * scale)[inverse.ravel()].T
+    if sensitivity:
+        return temp, dtemp
+    return temp
+
+
+def _dTS_h_delta(y, eta, k, threenk, c_v, h=1.e-20):
+    """
+    internal function for temperature along a Hugoniot and its derivatives
+    with respect to k.  Partial derivatives of _dT_h_delta are calculated
+    by complex-step differentiation in one call.
+
+    :param y: temperature in kK and its derivatives with respect to k
+    :param eta: = 1 - rho0/rho
+    :param k: = [rho0, c0, s, gamma0, q, theta0]
+    :param threenk: see the definition in Jamieson 1983
+    :param c_v: manual input of Cv value,
+        if 0 calculated through Debye function
+    :param h: step for complex-step differentiation
+    :return: eta derivative of y
+    """
+    steps = 1.j * h * np.eye(7)
+    t_c = y[0] + steps[0]
+    k_c = [k_i + steps[i + 1] for i, k_i in enumerate(k)]
+    f = _dT_h_delta(t_c, eta, k_c, threenk, c_v)
+    dfdt = np.imag(f[0]) / h
+    return np.append(np.real(f[0]), dfdt * y[1:] + np.imag(f[1:]) / h)
+
+
 def hugoniot_t(rho, rho0, c0, s, gamma0, q, theta0, n, mass,
-               three_r=3. * constants.R, t_ref=300., c_v=0.):
+               three_r=3. * constants.R, t_ref=300., c_v=0., batch=True):
     """
     calculate temperature along a hugoniot
 
@@ -109,16 +194,41 @@ def hugoniot_t(rho, rho0, c0, s, gamma0, q, theta0, n, mass,
         Jamieson modified this value to compensate for mismatches
     :param t_ref: reference temperature, 300 K
     :param c_v: heat capacity, see Jamieson 1983 for detail
+    :param batch: if True, integrate once for all densities using
+        cal_hugoniot_t.  If False, integrate for each density separately.
     :return: temperature along hugoniot
+    :note: in batch mode, uncertainties are propagated with derivatives
+        from the sensitivity equations, which gives the same first order
+        errors as uct.wrap.
     """
-    if isuncertainties([rho, rho0, c0, s, gamma0, q, theta0]):
-        f_v = np.vectorize(uct.wrap(hugoniot_t_single),
-                           excluded=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
-    else:
-        f_v = np.vectorize(hugoniot_t_single, excluded=[1, 2, 3, 4, 5, 6,
-                                                        7, 8, 9, 10, 11])
-    return f_v(rho, rho0, c0, s, gamma0, q, theta0, n, mass,
-               three_r=three_r, t_ref=t_ref, c_v=c_v)
+    if not batch:
+        if isuncertainties([rho, rho0, c0, s, gamma0, q, theta0]):
+            f_v = np.vectorize(uct.wrap(hugoniot_t_single),
+                               excluded=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
+        else:
+            f_v = np.vectorize(hugoniot_t_single,
+                               excluded=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
+        return f_v(rho, rho0, c0, s, gamma0, q, theta0, n, mass,
+                   three_r=three_r, t_ref=t_ref, c_v=c_v)
+    if not isuncertainties([rho, rho0, c0, s, gamma0, q, theta0]):
+        return cal_hugoniot_t(rho, rho0, c0, s, gamma0, q, theta0, n, mass,
+                              three_r=three_r, t_ref=t_ref, c_v=c_v)
+    k = [rho0, c0, s, gamma0, q, theta0]
+    k_n = [uct.nominal_value(k_i) for k_i in k]
+    rho_n = np.asarray(unp.nominal_values(rho), dtype=float)
+    temp, dtemp = cal_hugoniot_t(rho_n, *k_n, n, mass, three_r=three_r,
+                                 t_ref=t_ref, c_v=c_v, sensitivity=True)
+    # eta derivative for changes of rho and rho0.  It is gamma0 * t_ref at
+    # eta = 0, where temperature still changes with rho0 through eta.
+    eta = 1. - k_n[0] / rho_n
+    dtdeta = _dT_h_delta(temp / 1.e3, eta, k_n[:-1] + [k_n[-1] / 1.e3],
+                         three_r / mass * n, c_v) * 1.e3
+    dtemp[0] = dtemp[0] - dtdeta / rho_n
+    result = temp + dtdeta * k_n[0] / np.power(rho_n, 2.) * (rho - rho_n)
+    for dtemp_i, k_i, k_n_i in zip(dtemp, k, k_n):
+        if isinstance(k_i, uct.UFloat):
+            result = result + dtemp_i * (k_i - k_n_i)
+    return result
 #    return np.squeeze(T_h[0]) * 1.e3
 
 
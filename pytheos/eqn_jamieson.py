@@ -103,16 +103,18 @@ def hugoniot_p_nlin(rho, rho0, a, b, c):
     :param c: prefactor for nonlinear fit of Hugoniot data
     :return: pressure along Hugoniot in GPa
     """
-    eta = 1. - (rho0 / rho)
+    eta = np.asarray(1. - (rho0 / rho))
     Up = np.zeros_like(eta)
+    nonzero = eta != 0.
+    e = eta[nonzero]
     if isuncertainties([rho, rho0, a, b, c]):
-        Up[eta != 0.] = ((b * eta - 1.) + unp.sqrt(
-            np.power((1. - b * eta), 2.) - 4. * np.power(eta, 2.) * a * c)) /\
-            (-2. * eta * c)
+        Up[nonzero] = ((b * e - 1.) + unp.sqrt(
+            np.power((1. - b * e), 2.) - 4. * np.power(e, 2.) * a * c)) /\
+            (-2. * e * c)
     else:
-        Up[eta != 0.] = ((b * eta - 1.) + np.sqrt(
-            np.power((1. - b * eta), 2.) - 4. * np.power(eta, 2.) * a * c)) /\
-            (-2. * eta * c)
+        Up[nonzero] = ((b * e - 1.) + np.sqrt(
+            np.power((1. - b * e), 2.) - 4. * np.power(e, 2.) * a * c)) /\
+            (-2. * e * c)
     Us = a + Up * b + Up * Up * c
     Ph = rho0 * Up * Us
     return Ph
@@ -1,13 +1,14 @@
 """
-2017/05/03 kunc_k is not available yet because I did not derive analytical
-form yet.
+kunc_k and kunc_kp are calculated from the analytical forms, see
+cal_k_kunc_from_v and cal_kp_kunc_from_v.
 """
 import numpy as np
-import uncertainties as uct
 from uncertainties import unumpy as unp
 from scipy.optimize import brenth
 from scipy.differentiate import derivative
+from scipy.special import expn
 from .etc import isuncertainties
+from .solver import invert_static
 
 
 def kunc_p(v, v0, k0, k0p, order=5):
@@ -51,6 +52,27 @@ def cal_p_kunc(v, k, order=5, uncertainties=True):
     return p
 
 
+def cal_dpdv_kunc(v, k, order=5):
+    """
+    calculate dP/dV analytically from Kunc EOS
+
+    :param v: unit-cell volume in A^3
+    :param k: [v0, k0, k0p]
+    :param order: order for the Kunc equation
+    :return: dP/dV in GPa/A^3
+    :note: internal function, cannot handle uncertainties
+    """
+    v0 = k[0]
+    k0 = k[1]
+    k0p = k[2]
+    x = np.power(v / v0, 1. / 3.)
+    eta = 1.5 * k0p - order + 0.5
+    f2 = np.exp(eta * (1. - x))
+    dpdx = -3. * k0 * f2 / np.power(x, order + 1.) * \
+        (x + order * (1. - x) + eta * x * (1. - x))
+    return dpdx / (3. * v0 * np.power(x, 2.))
+
+
 def kunc_v_single(p, v0, k0, k0p, order=5, min_strain=0.01):
     """
     find volume at given pressure using brenth in scipy.optimize
@@ -74,7 +96,7 @@ def kunc_v_single(p, v0, k0, k0p, order=5, min_strain=0.01):
 
 def kunc_v(p, v0, k0, k0p, order=5, min_strain=0.01):
     """
-    find volume at given pressure using brenth in scipy.optimize
+    find volume at given pressure
 
     :param p: pressure in GPa
     :param v0: unit-cell volume in A^3 at 1 bar
@@ -83,14 +105,36 @@ def kunc_v(p, v0, k0, k0p, order=5, min_strain=0.01):
     :param order: order of Kunc function
     :param min_strain: defining minimum v/v0 value to search volume for
     :return: unit-cell volume at high pressure in GPa
-    :note: a wrapper function vectorizing kunc_v_single
+    :note: Newton iterations on the whole array with analytic dP/dV.
+        Elements which do not converge are solved by kunc_v_single.
+        For uncertainties, the volume is linearized around the nominal
+        solution.
     """
     if isuncertainties([p, v0, k0, k0p]):
-        f_u = np.vectorize(uct.wrap(kunc_v_single), excluded=[1, 2, 3, 4, 5])
-        return f_u(p, v0, k0, k0p, order=order, min_strain=min_strain)
-    else:
-        f_v = np.vectorize(kunc_v_single, excluded=[1, 2, 3, 4, 5])
-        return f_v(p, v0, k0, k0p, order=order, min_strain=min_strain)
+        v0_n, k0_n, k0p_n = unp.nominal_values([v0, k0, k0p])
+        p_n = unp.nominal_values(p)
+        v_n = kunc_v(p_n, v0_n, k0_n, k0p_n, order=order,
+                     min_strain=min_strain)
+        dpdv = cal_dpdv_kunc(v_n, [v0_n, k0_n, k0p_n], order=order)
+        v = v_n + (p - kunc_p(v_n, v0, k0, k0p, order=order)) / dpdv
+        return np.where(p_n <= 1.e-5, v0, v)
+
+    def f_p(v):
+        return cal_p_kunc(v, [v0, k0, k0p], order=order,
+                          uncertainties=False)
+
+    def f_dpdv(v):
+        return cal_dpdv_kunc(v, [v0, k0, k0p], order=order)
+
+    def v_init(p):
+        return v0 * np.power(1. + k0p * p / k0, -1. / k0p)
+
+    def f_single(p):
+        return kunc_v_single(p, v0, k0, k0p, order=order,
+                             min_strain=min_strain)
+
+    return invert_static(p, v0, f_p, f_dpdv, v_init, f_single,
+                         min_strain=min_strain)
 
 
 """
@@ -111,6 +155,163 @@ def cal_v_kunc(p, k, order=5):
 """
 
 
+def kunc_k(p, v0, k0, k0p, order=5, numerical=False):
+    """
+    calculate bulk modulus, wrapper for cal_k_kunc
+
+    :param p: pressure in GPa
+    :param v0: unit-cell volume in A^3 at 1 bar
+    :param k0: bulk modulus at reference conditions
+    :param k0p: pressure derivative of bulk modulus at reference conditions
+    :param order: order of Kunc function
+    :param numerical: if True, calculate numerically with kunc_k_num for
+        validation.  Nominal values are used.
+    :return: bulk modulus at high pressure in GPa
+    """
+    if numerical:
+        v0, k0, k0p = unp.nominal_values([v0, k0, k0p])
+        v = kunc_v(unp.nominal_values(p), v0, k0, k0p, order=order)
+        return kunc_k_num(v, v0, k0, k0p, order=order)
+    return cal_k_kunc(p, [v0, k0, k0p], order=order)
+
+
+def kunc_kp(p, v0, k0, k0p, order=5):
+    """
+    calculate pressure derivative of bulk modulus, wrapper for cal_kp_kunc
+
+    :param p: pressure in GPa
+    :param v0: unit-cell volume in A^3 at 1 bar
+    :param k0: bulk modulus at reference conditions
+    :param k0p: pressure derivative of bulk modulus at reference conditions
+    :param order: order of Kunc function
+    :return: pressure derivative of bulk modulus at high pressure
+    """
+    return cal_kp_kunc(p, [v0, k0, k0p], order=order)
+
+
+def cal_k_kunc(p, k, order=5):
+    """
+    calculate bulk modulus in GPa
+
+    :param p: pressure in GPa
+    :param k: [v0, k0, k0p]
+    :param order: order of Kunc function
+    :return: bulk modulus at high pressure in GPa
+    """
+    v = kunc_v(p, k[0], k[1], k[2], order=order)
+    return cal_k_kunc_from_v(v, k, order=order)
+
+
+def cal_k_kunc_from_v(v, k, order=5):
+    """
+    calculate bulk modulus analytically from volume
+
+    :param v: unit-cell volume in A^3
+    :param k: [v0, k0, k0p]
+    :param order: order of Kunc function
+    :return: bulk modulus in GPa
+    :note: K = -V dP/dV = k0 g(y) exp(eta (1 - y)) / y^order with
+        y = (v / v0)^(1/3) and g(y) = y + order (1 - y) + eta y (1 - y)
+    """
+    v0 = k[0]
+    k0 = k[1]
+    k0p = k[2]
+    y = np.power(v / v0, 1. / 3.)
+    eta = 1.5 * k0p - order + 0.5
+    if isuncertainties([v, v0, k0, k0p]):
+        f_exp = unp.exp(eta * (1. - y))
+    else:
+        f_exp = np.exp(eta * (1. - y))
+    g = y + order * (1. - y) + eta * y * (1. - y)
+    return k0 * g * f_exp / np.power(y, order)
+
+
+def cal_kp_kunc(p, k, order=5):
+    """
+    calculate pressure derivative of bulk modulus
+
+    :param p: pressure in GPa
+    :param k: [v0, k0, k0p]
+    :param order: order of Kunc function
+    :return: pressure derivative of bulk modulus at high pressure
+    """
+    v = kunc_v(p, k[0], k[1], k[2], order=order)
+    return cal_kp_kunc_from_v(v, k, order=order)
+
+
+def cal_kp_kunc_from_v(v, k, order=5):
+    """
+    calculate pressure derivative of bulk modulus analytically from volume
+
+    :param v: unit-cell volume in A^3
+    :param k: [v0, k0, k0p]
+    :param order: order of Kunc function
+    :return: pressure derivative of bulk modulus
+    :note: K' = -dln(K)/dln(V) = -y / 3 dln(K)/dy, see cal_k_kunc_from_v
+    """
+    v0 = k[0]
+    k0p = k[2]
+    y = np.power(v / v0, 1. / 3.)
+    eta = 1.5 * k0p - order + 0.5
+    g = y + order * (1. - y) + eta * y * (1. - y)
+    dgdy = 1. - order + eta - 2. * eta * y
+    return (eta * y + order) / 3. - y * dgdy / (3. * g)
+
+
+def cal_e_kunc(v, k, order=5):
+    """
+    calculate static energy from Kunc EOS relative to v0,
+    9 v0 k0 exp(eta) * integral of (u^(2 - order) - u^(3 - order)) *
+    exp(-eta u) from y to 1, with y = (v / v0)^(1/3)
+
+    :param v: unit-cell volume in A^3
+    :param k: [v0, k0, k0p]
+    :param order: order for the Kunc equation
+    :return: energy in GPa A^3
+    :note: the integral is from the exponential integral E_n for integer
+        order >= 3 and eta > 0, otherwise from cal_e_kunc_gl.
+        Cannot handle uncertainties.
+    """
+    v0 = k[0]
+    k0 = k[1]
+    k0p = k[2]
+    y = np.power(np.asarray(v, dtype=float) / v0, 1. / 3.)
+    eta = 1.5 * k0p - order + 0.5
+    if (eta <= 0.) or (order != int(order)) or (order < 3):
+        return cal_e_kunc_gl(v, k, order=order)
+
+    def integ(n):
+        # integral of u^-n exp(-eta u) from y to 1
+        return np.power(y, 1. - n) * expn(n, eta * y) - expn(n, eta)
+
+    return 9. * v0 * k0 * np.exp(eta) * \
+        (integ(int(order) - 2) - integ(int(order) - 3))
+
+
+def cal_e_kunc_gl(v, k, order=5, n_points=32):
+    """
+    calculate static energy from Kunc EOS using Gauss-Legendre quadrature
+    for all volumes at once
+
+    :param v: unit-cell volume in A^3
+    :param k: [v0, k0, k0p]
+    :param order: order for the Kunc equation
+    :param n_points: number of quadrature points
+    :return: energy in GPa A^3
+    :note: internal function, cannot handle uncertainties
+    """
+    v0 = k[0]
+    k0 = k[1]
+    k0p = k[2]
+    t, w = np.polynomial.legendre.leggauss(n_points)
+    # the last axis is for the quadrature points
+    y = np.power(np.asarray(v, dtype=float) / v0, 1. / 3.)[..., None]
+    u = y + 0.5 * (1. - y) * (t + 1.)
+    eta = 1.5 * k0p - order + 0.5
+    f = (1. - u) * np.power(u, 2. - order) * np.exp(eta * (1. - u))
+    return 9. * v0 * k0 * 0.5 * (1. - y[..., 0]) * np.sum(w * f, axis=-1)
+
+
 def kunc_dPdV(v, v0, k0, k0p, order=5, precision=1.e-5):
     """
     calculate dP/dV for numerical calculation of bulk modulus
@@ -122,12 +323,12 @@ def kunc_dPdV(v, v0, k0, k0p, order=5, precision=1.e-5):
     :param k0p: pressure derivative of bulk modulus at reference conditions
     :param precision: precision for numerical calc (default = 1.e-5 * v0)
     :return: dP/dV
+    :note: for validation of the analytical forms.  All volumes are
+        differentiated in one call of scipy.differentiate.derivative.
     """
-    def f_scalar(v, v0, k0, k0p, order=order, precision=1.e-5):
-        return derivative(kunc_p, v, args=(v0, k0, k0p, order),
-                          dx=v0 * precision)
-    f_v = np.vectorize(f_scalar, excluded=[1, 2, 3, 4, 5])
-    return f_v(v, v0, k0, k0p, order=order, precision=precision)
+    return derivative(kunc_p, np.asarray(v, dtype=float),
+                      args=(v0, k0, k0p, order),
+                      initial_step=v0 * precision).df
 
 
 def kunc_k_num(v, v0, k0, k0p, order=5, precision=1.e-5):
@@ -141,6 +342,7 @@ def kunc_k_num(v, v0, k0, k0p, order=5, precision=1.e-5):
     :param k0p: pressure derivative of bulk modulus at reference conditions
     :param precision: precision for numerical calc (default = 1.e-5 * v0)
     :return: bulk modulus
+    :note: for validation, use cal_k_kunc_from_v for calculation
     """
     return -1. * v * kunc_dPdV(v, v0, k0, k0p, order=order,
                                precision=precision)
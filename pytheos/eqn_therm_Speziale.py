@@ -7,6 +7,7 @@ from uncertainties import unumpy as unp
 import uncertainties as uct
 from scipy import constants
 from scipy.integrate import quad
+from scipy.special import expi
 from .conversion import vol_uc2mol
 from .eqn_debye import debye_E
 from .etc import isuncertainties
@@ -43,17 +44,77 @@ def speziale_debyetemp(v, v0, gamma0, q0, q1, theta0):
     :return: Debye temperature in K
     """
     if isuncertainties([v, v0, gamma0, q0, q1, theta0]):
-        f_vu = np.vectorize(uct.wrap(integrate_gamma),
-                            excluded=[1, 2, 3, 4, 5, 6])
-        integ = f_vu(v, v0, gamma0, q0, q1, theta0)
+        f_vu = np.vectorize(uct.wrap(cal_integ_gamma),
+                            excluded=[1, 2, 3, 4])
+        integ = f_vu(v, v0, gamma0, q0, q1)
         theta = unp.exp(unp.log(theta0) - integ)
     else:
-        f_v = np.vectorize(integrate_gamma, excluded=[1, 2, 3, 4, 5, 6])
-        integ = f_v(v, v0, gamma0, q0, q1, theta0)
+        integ = cal_integ_gamma(v, v0, gamma0, q0, q1)
         theta = np.exp(np.log(theta0) - integ)
     return theta
 
 
+def cal_integ_gamma(v, v0, gamma0, q0, q1):
+    """
+    calculate integral of gamma / v from v0 to v for the Speziale equation
+    using the exponential integral,
+    gamma0 / q1 * exp(-a) * (Ei(a * (v / v0)^q1) - Ei(a)) with a = q0 / q1
+
+    :param v: unit-cell volume in A^3
+    :param v0: unit-cell volume in A^3 at 1 bar
+    :param gamma0: Gruneisen parameter at 1 bar
+    :param q0: logarithmic derivative of Gruneisen parameter
+    :param q1: logarithmic derivative of Gruneisen parameter
+    :return: integral, -ln(theta / theta0)
+    :note: internal function, cannot handle uncertainties.
+        Elements without finite result, such as for q0 = 0 or q1 = 0,
+        are calculated by cal_integ_gamma_gl.  So are complex inputs,
+        because expi in scipy drops small imaginary parts.
+    """
+    v = np.asarray(v)
+    if np.iscomplexobj(np.asarray([v0, gamma0, q0, q1])) or \
+            np.iscomplexobj(v):
+        return cal_integ_gamma_gl(v, v0, gamma0, q0, q1)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        a = np.divide(q0, q1)
+        s = np.power(v / v0, q1)
+        integ = np.divide(gamma0, q1) * np.exp(-a) * \
+            (expi(a * s) - expi(a))
+    failed = ~np.isfinite(integ)
+    if np.any(failed):
+        integ = np.array(integ, copy=True)
+        integ[failed] = cal_integ_gamma_gl(
+            *[np.broadcast_to(x, integ.shape)[failed]
+              for x in [v, v0, gamma0, q0, q1]])
+    return integ
+
+
+def cal_integ_gamma_gl(v, v0, gamma0, q0, q1, n_points=32):
+    """
+    calculate integral of gamma / v from v0 to v for the Speziale equation
+    using Gauss-Legendre quadrature in ln(v) for all volumes at once
+
+    :param v: unit-cell volume in A^3
+    :param v0: unit-cell volume in A^3 at 1 bar
+    :param gamma0: Gruneisen parameter at 1 bar
+    :param q0: logarithmic derivative of Gruneisen parameter
+    :param q1: logarithmic derivative of Gruneisen parameter
+    :param n_points: number of quadrature points
+    :return: integral, -ln(theta / theta0)
+    :note: internal function, cannot handle uncertainties
+    """
+    t, w = np.polynomial.legendre.leggauss(n_points)
+    # the last axis is for the quadrature points
+    gamma0, q0, q1 = [np.asarray(x)[..., None] for x in [gamma0, q0, q1]]
+    ln_x = np.log(np.asarray(v) / v0)[..., None]
+    y = 0.5 * ln_x * (t + 1.)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # (x^q1 - 1) / q1 goes to ln(x) for q1 = 0
+        f = np.where(q1 == 0., y, np.expm1(q1 * y) / q1)
+    gamma = gamma0 * np.exp(q0 * f)
+    return 0.5 * ln_x[..., 0] * np.sum(w * gamma, axis=-1)
+
+
 def integrate_gamma(v, v0, gamma0, q0, q1, theta0):
     """
     internal function to calculate Debye temperature
@@ -3,11 +3,11 @@
 Solve uncertainties problem by adding new function `isuncertainties`
 """
 import numpy as np
-import uncertainties as uct
 from uncertainties import unumpy as unp
 from scipy.optimize import brenth
 from scipy.differentiate import derivative
 from .etc import isuncertainties
+from .solver import invert_static
 
 
 def vinet_p(v, v0, k0, k0p):
@@ -50,6 +50,26 @@ def cal_p_vinet(v, k, uncertainties=True):
     return p
 
 
+def cal_dpdv_vinet(v, k):
+    """
+    calculate dP/dV analytically from vinet equation
+
+    :param v: unit-cell volume in A^3
+    :param k: [v0, k0, k0p]
+    :return: dP/dV in GPa/A^3
+    :note: internal function, cannot handle uncertainties
+    """
+    v0 = k[0]
+    k0 = k[1]
+    k0p = k[2]
+    x = np.power(v / v0, 1. / 3.)
+    eta = 1.5 * (k0p - 1.)
+    f2 = np.exp(eta * (1. - x))
+    dpdx = -3. * k0 * f2 / np.power(x, 3.) * \
+        (2. - x + eta * x * (1. - x))
+    return dpdx / (3. * v0 * np.power(x, 2.))
+
+
 def vinet_v_single(p, v0, k0, k0p, min_strain=0.01):
     """
     find volume at given pressure using brenth in scipy.optimize
@@ -81,14 +101,33 @@ def vinet_v(p, v0, k0, k0p, min_strain=0.01):
     :param k0p: pressure derivative of bulk modulus at reference conditions
     :param min_strain: defining minimum v/v0 value to search volume for
     :return: unit cell volume at high pressure in A^3
-    :note: wrapper function vetorizing vinet_v_single
+    :note: Newton iterations on the whole array with analytic dP/dV.
+        Elements which do not converge are solved by vinet_v_single.
+        For uncertainties, the volume is linearized around the nominal
+        solution.
     """
     if isuncertainties([p, v0, k0, k0p]):
-        f_u = np.vectorize(uct.wrap(vinet_v_single), excluded=[1, 2, 3, 4])
-        return f_u(p, v0, k0, k0p, min_strain=min_strain)
-    else:
-        f_v = np.vectorize(vinet_v_single, excluded=[1, 2, 3, 4])
-        return f_v(p, v0, k0, k0p, min_strain=min_strain)
+        v0_n, k0_n, k0p_n = unp.nominal_values([v0, k0, k0p])
+        p_n = unp.nominal_values(p)
+        v_n = vinet_v(p_n, v0_n, k0_n, k0p_n, min_strain=min_strain)
+        dpdv = cal_dpdv_vinet(v_n, [v0_n, k0_n, k0p_n])
+        v = v_n + (p - vinet_p(v_n, v0, k0, k0p)) / dpdv
+        return np.where(p_n <= 1.e-5, v0, v)
+
+    def f_p(v):
+        return cal_p_vinet(v, [v0, k0, k0p], uncertainties=False)
+
+    def f_dpdv(v):
+        return cal_dpdv_vinet(v, [v0, k0, k0p])
+
+    def v_init(p):
+        return v0 * np.power(1. + k0p * p / k0, -1. / k0p)
+
+    def f_single(p):
+        return vinet_v_single(p, v0, k0, k0p, min_strain=min_strain)
+
+    return invert_static(p, v0, f_p, f_dpdv, v_init, f_single,
+                         min_strain=min_strain)
 
 
 def cal_v_vinet(p, k):
@@ -106,16 +145,52 @@ def cal_v_vinet(p, k):
 def vinet_k(p, v0, k0, k0p, numerical=False):
     """
     calculate bulk modulus, wrapper for cal_k_vinet
-    cannot handle uncertainties
 
     :param p: pressure in GPa
     :param v0: unit-cell volume in A^3 at 1 bar
     :param k0: bulk modulus at reference conditions
     :param k0p: pressure derivative of bulk modulus at reference conditions
+    :param numerical: if True, calculate numerically with vinet_k_num for
+        validation.  Nominal values are used.
     :return: bulk modulus at high pressure in GPa
     """
-    f_u = uct.wrap(cal_k_vinet)
-    return f_u(p, [v0, k0, k0p])
+    if numerical:
+        v0, k0, k0p = unp.nominal_values([v0, k0, k0p])
+        v = vinet_v(unp.nominal_values(p), v0, k0, k0p)
+        return vinet_k_num(v, v0, k0, k0p)
+    return cal_k_vinet(p, [v0, k0, k0p])
+
+
+def vinet_kp(p, v0, k0, k0p):
+    """
+    calculate pressure derivative of bulk modulus, wrapper for cal_kp_vinet
+
+    :param p: pressure in GPa
+    :param v0: unit-cell volume in A^3 at 1 bar
+    :param k0: bulk modulus at reference conditions
+    :param k0p: pressure derivative of bulk modulus at reference conditions
+    :return: pressure derivative of bulk modulus at high pressure
+    """
+    return cal_kp_vinet(p, [v0, k0, k0p])
+
+
+def cal_e_vinet(v, k):
+    """
+    calculate static energy from vinet equation,
+    9 v0 k0 / eta^2 (1 - (1 - eta (1 - y)) exp(eta (1 - y))), relative to v0
+
+    :param v: unit-cell volume in A^3
+    :param k: [v0, k0, k0p]
+    :return: energy in GPa A^3
+    :note: cannot handle uncertainties
+    """
+    v0 = k[0]
+    k0 = k[1]
+    k0p = k[2]
+    y = np.power(v / v0, 1. / 3.)
+    eta = 1.5 * (k0p - 1.)
+    z = eta * (1. - y)
+    return 9. * v0 * k0 / (eta * eta) * (1. - (1. - z) * np.exp(z))
 
 
 def vinet_dPdV(v, v0, k0, k0p, precision=1.e-5):
@@ -129,11 +204,11 @@ def vinet_dPdV(v, v0, k0, k0p, precision=1.e-5):
     :param k0p: pressure derivative of bulk modulus at reference conditions
     :param precision: precision for numerical calc (default = 1.e-5 * v0)
     :return: dP/dV
+    :note: for validation of the analytical forms.  All volumes are
+        differentiated in one call of scipy.differentiate.derivative.
     """
-    def f_scalar(v, v0, k0, k0p, precision=1.e-5):
-        return derivative(vinet_p, v, args=(v0, k0, k0p), dx=v0 * precision)
-    f_v = np.vectorize(f_scalar, excluded=[1, 2, 3, 4])
-    return f_v(v, v0, k0, k0p, precision=precision)
+    return derivative(vinet_p, np.asarray(v, dtype=float),
+                      args=(v0, k0, k0p), initial_step=v0 * precision).df
 
 
 def vinet_k_num(v, v0, k0, k0p, precision=1.e-5):
@@ -147,6 +222,7 @@ def vinet_k_num(v, v0, k0, k0p, precision=1.e-5):
     :param k0p: pressure derivative of bulk modulus at reference conditions
     :param precision: precision for numerical calc (default = 1.e-5 * v0)
     :return: dP/dV
+    :note: for validation, use cal_k_vinet_from_v for calculation
     """
     return -1. * v * vinet_dPdV(v, v0, k0, k0p, precision=precision)
 
@@ -176,6 +252,40 @@ def cal_k_vinet_from_v(v, v0, k0, k0p):
     x = v / v0
     y = np.power(x, 1. / 3.)
     eta = 1.5 * (k0p - 1.)
-    k = k0 * np.power(y, -2.) * (1. + (eta * y + 1.) * (1. - y)) * \
-        unp.exp((1. - y) * eta)
+    if isuncertainties([v, v0, k0, k0p]):
+        f_exp = unp.exp((1. - y) * eta)
+    else:
+        f_exp = np.exp((1. - y) * eta)
+    k = k0 * np.power(y, -2.) * (1. + (eta * y + 1.) * (1. - y)) * f_exp
     return k
+
+
+def cal_kp_vinet(p, k):
+    """
+    calculate pressure derivative of bulk modulus
+
+    :param p: pressure in GPa
+    :param k: [v0, k0, k0p]
+    :return: pressure derivative of bulk modulus at high pressure
+    """
+    v = cal_v_vinet(p, k)
+    return cal_kp_vinet_from_v(v, k[0], k[1], k[2])
+
+
+def cal_kp_vinet_from_v(v, v0, k0, k0p):
+    """
+    calculate pressure derivative of bulk modulus analytically from volume
+
+    :param v: unit-cell volume in A^3
+    :param v0: unit-cell volume in A^3 at 1 bar
+    :param k0: bulk modulus at reference conditions
+    :param k0p: pressure derivative of bulk modulus at reference conditions
+    :return: pressure derivative of bulk modulus
+    :note: K = k0 g(y) exp(eta (1 - y)) / y^2 with y = (v / v0)^(1/3),
+        so K' = -dln(K)/dln(V) = -y / 3 dln(K)/dy
+    """
+    y = np.power(v / v0, 1. / 3.)
+    eta = 1.5 * (k0p - 1.)
+    g = 2. - y + eta * y * (1. - y)
+    dgdy = -1. + eta - 2. * eta * y
+    return (eta * y + 2.) / 3. - y * dgdy / (3. * g)
@@ -1,8 +1,8 @@
-import lmfit
+from .fit_jacobian import JacobianModel
 from .eqn_anharmonic import zharkov_panh
 
 
-class ZharkovAnhModel(lmfit.Model):
+class ZharkovAnhModel(JacobianModel):
     """
     lmfit Model class for Zharkov anharmonic fitting
     """
@@ -0,0 +1,277 @@
+"""
+Errors-in-variables fit of a PVT EOS against a pressure standard.
+Instead of calculating pressure from the volume of the standard and
+fitting the sample EOS to it, the true volume of the standard, volume of
+the sample, and temperature of each data point are fitted together with
+the EOS parameters.  Each data point adds its own variables, which enter
+only its own residuals, so the Jacobian is block sparse and the cost grows
+linearly with the number of data points.
+"""
+import copy
+import numpy as np
+from scipy.optimize import OptimizeResult
+from uncertainties import unumpy as unp
+from .etc import isuncertainties
+from .fit_jacobian import model_derivatives
+from .fit_global import make_result
+
+
+def errors_in_variables_fit(model, params, scale, v_std, v, temp, p_err=0.01,
+                            scale_covar=True, h=1.e-6, max_iter=200,
+                            ftol=1.e-10, xtol=1.e-10):
+    """
+    fit a PVT EOS model with errors in the volumes of the standard and
+    sample and in temperature
+
+    :param model: lmfit Model of pressure with v and temp as independent
+        variables, such as BM3Model(prefix='st_') +
+        ConstqModel(n, z, prefix='th_')
+    :param params: lmfit Parameters of the model with initial values,
+        bounds, and vary
+    :param scale: pressure scale of the standard, such as
+        pytheos.gold.Fei2007bm3() or its key, 'gold/Fei2007bm3'
+    :param v_std: unit-cell volume of the standard in A^3
+    :param v: unit-cell volume of the sample in A^3
+    :param temp: temperature in K
+    :param p_err: tolerance in GPa for pressures of the standard and the
+        sample model to agree, which stands for the misfit of the model
+    :param scale_covar: if True, scale covariance by reduced chi-square,
+        as in lmfit.  p_err is a tolerance chosen by the user rather than
+        a measured error, so the covariance should be unscaled only if
+        p_err and the errors of the data points are realistic.
+    :param h: step relative to volume and temperature for the derivatives
+        of the scale and the model with respect to them
+    :param max_iter: maximum number of iterations
+    :param ftol: tolerance for relative change of chi-square
+    :param xtol: tolerance for relative change of the parameters
+    :return: lmfit MinimizerResult with fitted v_std, v, temp, and p
+        of the data points
+    :note: v_std, v, and temp with uncertainties are fitted, those without
+        are fixed.  Nominal values of the scale parameters are used.
+        Parameters constrained by expr are not supported.  Parameters are
+        clipped to their bounds.
+    :note: Levenberg-Marquardt iterations, in which the variables of the
+        data points are eliminated from the normal equations point by
+        point, see _solve_step.  Covariance of the EOS parameters is
+        calculated in the same way, which is the same as weighting each
+        pressure by p_err^2 plus the variance propagated from v_std, v,
+        and temp.
+    """
+    if isinstance(scale, str):
+        from .scales.registry import get_scale
+        scale = get_scale(scale)
+    if any(par.expr is not None for par in params.values()):
+        raise ValueError('Parameters constrained by expr are not supported.')
+    obs = {}
+    latent = []
+    for key, value in [('v_std', v_std), ('v', v), ('temp', temp)]:
+        obs[key] = np.asarray(unp.nominal_values(value), dtype=float)
+        if isuncertainties([value]):
+            std = np.asarray(unp.std_devs(value), dtype=float)
+            if np.any(std <= 0.):
+                raise ValueError('Standard deviations of ' + key +
+                                 ' should be positive.')
+            latent.append((key, std))
+    n = obs['v_std'].size
+    for key in obs.keys():
+        obs[key] = np.broadcast_to(obs[key], n)
+    params = copy.deepcopy(params)
+    var_names = [name for name, par in params.items() if par.vary]
+    lower = np.array([-np.inf if params[name].min is None
+                      else params[name].min for name in var_names])
+    upper = np.array([np.inf if params[name].max is None
+                      else params[name].max for name in var_names])
+    theta0 = np.array([params[name].value for name in var_names])
+    # data point variables are fitted as deviations from the observations
+    # in units of the standard deviations, so that they are well scaled
+    u = np.zeros((n, len(latent)))
+
+    def evaluate(theta, u):
+        for name, value in zip(var_names, theta):
+            params[name].value = value
+        values = dict(obs)
+        for k, (key, std) in enumerate(latent):
+            values[key] = obs[key] + std * u[:, k]
+        r_eq = _cal_dp(model, params, scale, values) / p_err
+        return values, r_eq, (u ** 2).sum() + (r_eq ** 2).sum()
+
+    theta = np.clip(theta0, lower, upper)
+    values, r_eq, chisqr = evaluate(theta, u)
+    lam = 1.e-3
+    nfev = 1
+    status = 0
+    message = 'Maximum number of iterations is reached.'
+    for i in range(max_iter):
+        a, b = _cal_jacobian(model, params, scale, values, latent,
+                             var_names, h, p_err)
+        while True:
+            d_theta, d_u = _solve_step(a, b, u, r_eq, lam)
+            theta_new = np.clip(theta + d_theta, lower, upper)
+            u_new = u + d_u
+            values_new, r_eq_new, chisqr_new = evaluate(theta_new, u_new)
+            nfev += 1
+            if np.isfinite(chisqr_new) and (chisqr_new <= chisqr):
+                lam = max(lam / 2., 1.e-12)
+                break
+            lam = lam * 4.
+            if lam > 1.e12:
+                break
+        if lam > 1.e12:
+            evaluate(theta, u)
+            status = -1
+            message = 'Chi-square cannot be reduced further.'
+            break
+        converged_f = (chisqr - chisqr_new) <= ftol * chisqr
+        converged_x = np.all(np.abs(theta_new - theta) <=
+                             xtol * (np.abs(theta) + xtol))
+        theta, u = theta_new, u_new
+        values, r_eq, chisqr = values_new, r_eq_new, chisqr_new
+        if converged_f or converged_x:
+            status = 1
+            message = 'Converged.'
+            break
+    ret = OptimizeResult(x=theta, fun=np.concatenate([np.ravel(u), r_eq]),
+                         nfev=nfev, nit=i + 1, success=status > 0,
+                         status=status, message=message)
+    a, b = _cal_jacobian(model, params, scale, values, latent, var_names,
+                         h, p_err)
+    hess = _cal_reduced_hess(a, b, 0.)
+    result = make_result(params, var_names, theta0, ret, hess,
+                         scale_covar=scale_covar, n_latent=u.size)
+    result.method = 'errors_in_variables'
+    result.v_std = values['v_std']
+    result.v = values['v']
+    result.temp = values['temp']
+    result.p = scale.cal_p(values['v_std'], values['temp'], nominal=True)
+    return result
+
+
+def _solve_step(a, b, u, r_eq, lam):
+    """
+    solve damped normal equations for a step of the parameters and the
+    data point variables
+
+    :param a: derivatives of the pressure residuals with respect to the
+        data point variables, (number of points, number of variables) array
+    :param b: derivatives of the pressure residuals with respect to the
+        parameters, (number of points, number of parameters) array
+    :param u: data point variables
+    :param r_eq: pressure residuals
+    :param lam: damping factor, relative to the diagonal
+    :return: steps of the parameters and the data point variables
+    :note: internal function.  The variables of each point appear only in
+        its own residuals, so they are eliminated with small solves for
+        each point and the remaining system has only the parameters.
+    """
+    u_inv, w, g_u = _cal_point_blocks(a, b, u, r_eq, lam)
+    u_inv_w = np.einsum('imk,ikp->imp', u_inv, w)
+    u_inv_g = np.einsum('imk,ik->im', u_inv, g_u)
+    hess = _cal_reduced_hess(a, b, lam, u_inv=u_inv, w=w)
+    g_theta = np.einsum('ip,i->p', b, r_eq)
+    rhs = -(g_theta - np.einsum('imp,im->p', w, u_inv_g))
+    d_theta = np.linalg.lstsq(hess, rhs, rcond=None)[0]
+    d_u = -(u_inv_g + np.einsum('imp,p->im', u_inv_w, d_theta))
+    return d_theta, d_u
+
+
+def _cal_point_blocks(a, b, u, r_eq, lam):
+    """
+    calculate blocks of the damped normal equations for each point
+
+    :param a: see _solve_step
+    :param b: see _solve_step
+    :param u: data point variables
+    :param r_eq: pressure residuals
+    :param lam: damping factor
+    :return: inverse of the block for the point variables, block between
+        the point variables and the parameters, and gradient for the point
+        variables
+    :note: internal function
+    """
+    n, m = a.shape
+    blocks = np.eye(m)[None] + a[:, :, None] * a[:, None, :]
+    diag = np.einsum('imm->im', blocks).copy()
+    blocks[:, np.arange(m), np.arange(m)] += lam * diag
+    u_inv = np.linalg.inv(blocks) if m != 0 else np.zeros((n, 0, 0))
+    w = a[:, :, None] * b[:, None, :]
+    g_u = u + a * r_eq[:, None]
+    return u_inv, w, g_u
+
+
+def _cal_reduced_hess(a, b, lam, u_inv=None, w=None):
+    """
+    calculate J^T J for the parameters with the data point variables
+    eliminated
+
+    :param a: see _solve_step
+    :param b: see _solve_step
+    :param lam: damping factor
+    :param u_inv: inverse of the point blocks, see _cal_point_blocks
+    :param w: blocks between the point variables and the parameters
+    :return: (number of parameters, number of parameters) array
+    :note: internal function
+    """
+    if u_inv is None:
+        u_inv, w, g_u = _cal_point_blocks(a, b, np.zeros(a.shape),
+                                          np.zeros(a.shape[0]), lam)
+    hess = np.einsum('ip,iq->pq', b, b)
+    hess[np.diag_indices_from(hess)] *= 1. + lam
+    return hess - np.einsum('imp,imk,ikq->pq', w, u_inv, w)
+
+
+def _cal_dp(model, params, scale, values):
+    """
+    calculate pressure of the standard minus pressure of the model
+
+    :param model: lmfit Model
+    :param params: lmfit Parameters
+    :param scale: pressure scale
+    :param values: dictionary of v_std, v, and temp arrays
+    :return: pressure difference in GPa
+    :note: internal function
+    """
+    return scale.cal_p(values['v_std'], values['temp'], nominal=True) - \
+        model.eval(params, v=values['v'], temp=values['temp'])
+
+
+def _cal_jacobian(model, params, scale, values, latent, var_names, h, p_err):
+    """
+    calculate derivatives of the pressure residuals, pressure difference
+    divided by p_err
+
+    :param model: lmfit Model
+    :param params: lmfit Parameters
+    :param scale: pressure scale
+    :param values: dictionary of v_std, v, and temp arrays
+    :param latent: list of (key, std) for the fitted data point variables
+    :param var_names: names of the varying parameters
+    :param h: step relative to volume and temperature
+    :param p_err: tolerance for the pressure difference
+    :return: derivatives with respect to the data point variables in
+        (number of points, len(latent)) array and with respect to the
+        parameters in (number of points, len(var_names)) array
+    :note: internal function.  Derivatives for volume and temperature are
+        central differences, those for the parameters come from
+        fit_jacobian.model_derivatives.
+    """
+    from .scales.convert import cal_dpdv_dpdt
+    n = values['v_std'].size
+    dpdv_std, dpdt_std = cal_dpdv_dpdt(scale, values['v_std'],
+                                       values['temp'], h=h)
+    dv, dt = h * values['v'], h * values['temp']
+    dpdv = (model.eval(params, v=values['v'] + dv, temp=values['temp']) -
+            model.eval(params, v=values['v'] - dv, temp=values['temp'])) / \
+        (2. * dv)
+    dpdt = (model.eval(params, v=values['v'], temp=values['temp'] + dt) -
+            model.eval(params, v=values['v'], temp=values['temp'] - dt)) / \
+        (2. * dt)
+    d = {'v_std': dpdv_std, 'v': -dpdv, 'temp': dpdt_std - dpdt}
+    a = np.column_stack([np.broadcast_to(d[key], n) * std
+                         for key, std in latent]) / p_err \
+        if len(latent) != 0 else np.zeros((n, 0))
+    d_par = model_derivatives(model, params, var_names, v=values['v'],
+                              temp=values['temp'])
+    b = -np.column_stack([np.broadcast_to(d_par[name], n)
+                          for name in var_names]) / p_err \
+        if len(var_names) != 0 else np.zeros((n, 0))
+    return a, b
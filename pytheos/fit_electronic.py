@@ -1,8 +1,8 @@
-import lmfit
+from .fit_jacobian import JacobianModel
 from .eqn_electronic import zharkov_pel
 
 
-class ZharkovElecModel(lmfit.Model):
+class ZharkovElecModel(JacobianModel):
     """
     lmfit Model class for Zharkov electronic contribution fitting
     """
@@ -0,0 +1,368 @@
+"""
+Fit of several datasets at once with the lmfit models in pytheos.
+Datasets can share parameters, such as q or theta0 of the same phase
+measured against different pressure scales.  Residuals of all datasets are
+stacked in one least-squares problem.  Each dataset depends only on its
+own and the shared parameters, so the Jacobian is block sparse.  It is
+assembled from derivatives of the models, or calculated by finite
+difference for many parameters at once through jac_sparsity of
+scipy.optimize.least_squares.
+"""
+import copy
+from collections import OrderedDict
+import numpy as np
+from scipy.optimize import least_squares
+from scipy.sparse import lil_matrix, csr_matrix, issparse
+import lmfit
+from lmfit.minimizer import MinimizerResult
+from .fit_jacobian import model_derivatives
+
+
+class GlobalFit(object):
+    """
+    Global fit of lmfit models to several datasets with shared parameters
+    """
+
+    def __init__(self):
+        self.datasets = OrderedDict()
+        # (dataset name, parameter name) to global name, see _read_names
+        self._global_names = {}
+
+    def add_dataset(self, name, model, data, params, weights=None,
+                    **kwargs):
+        """
+        add a dataset to fit
+
+        :param name: name of the dataset, such as 'sic3c_fei2007'.
+            Parameters of the dataset are named name + '_' + parameter name
+            in the global parameters, so name has to be a valid python
+            identifier.
+        :param model: lmfit Model, such as BM3Model(prefix='st_') +
+            ConstqModel(n, z, prefix='th_')
+        :param data: data to be fit, such as pressure
+        :param params: lmfit Parameters of the model with initial values,
+            bounds, and vary
+        :param weights: weights for the residual
+        :param kwargs: independent variables, such as v and temp
+        :note: parameters constrained by expr are not supported, use
+            shared parameters in make_params instead
+        """
+        if not name.isidentifier():
+            raise ValueError('Dataset name should be a valid python '
+                             'identifier, such as sic3c_fei2007.')
+        if any(par.expr is not None for par in params.values()):
+            raise ValueError('Parameters constrained by expr are not '
+                             'supported.  Use shared parameters instead.')
+        # work holds the parameter values during fitting
+        self.datasets[name] = {
+            'model': model, 'data': np.asarray(data, dtype=float),
+            'params': copy.deepcopy(params), 'work': copy.deepcopy(params),
+            'weights': None if weights is None else
+            np.asarray(weights, dtype=float),
+            'kwargs': kwargs}
+
+    def make_params(self, shared=None):
+        """
+        make global parameters for all datasets
+
+        :param shared: parameters shared between datasets.  A list of
+            parameter names, such as ['th_q', 'th_theta0'], shares each
+            parameter between all datasets which have it, under the same
+            name.  A dictionary of global name and list of
+            (dataset name, parameter name) shares parameters between the
+            listed datasets only.
+        :return: lmfit Parameters.  user_data of each parameter lists the
+            (dataset name, parameter name) it stands for.
+        :note: settings of a shared parameter are taken from the first
+            dataset in the list
+        """
+        global_names = {}
+        if shared is None:
+            shared = []
+        if not isinstance(shared, dict):
+            shared = OrderedDict(
+                (par_name, [(name, par_name)
+                            for name, dataset in self.datasets.items()
+                            if par_name in dataset['params']])
+                for par_name in shared)
+        for global_name, members in shared.items():
+            for name, par_name in members:
+                if par_name not in self.datasets[name]['params']:
+                    raise ValueError('No parameter ' + par_name +
+                                     ' in dataset ' + name + '.')
+                global_names[(name, par_name)] = global_name
+        params = lmfit.Parameters()
+        for name, dataset in self.datasets.items():
+            for par_name, par in dataset['params'].items():
+                global_name = global_names.get((name, par_name),
+                                               name + '_' + par_name)
+                if global_name in params:
+                    params[global_name].user_data.append((name, par_name))
+                    continue
+                params.add(lmfit.Parameter(
+                    global_name, value=par.value, vary=par.vary,
+                    min=par.min, max=par.max,
+                    user_data=[(name, par_name)]))
+        return params
+
+    def fit(self, params, jacobian=True, scale_covar=True, **kwargs):
+        """
+        fit all datasets at once with scipy.optimize.least_squares
+
+        :param params: global lmfit Parameters, see make_params
+        :param jacobian: if True, the sparse Jacobian is assembled from
+            derivatives of the models, see fit_jacobian.model_derivatives.
+            If False, it is calculated by finite difference with
+            jac_sparsity.
+        :param scale_covar: if True, scale covariance by reduced chi-square
+            as lmfit does
+        :param kwargs: options for scipy.optimize.least_squares, such as
+            ftol, xtol, loss, and max_nfev
+        :return: lmfit MinimizerResult.  Its covar and correl include
+            correlations between parameters of different datasets.
+        :note: bounds of the parameters are given to least_squares as they
+            are
+        """
+        if any(par.expr is not None for par in params.values()):
+            raise ValueError('Parameters constrained by expr are not '
+                             'supported.  Use shared parameters instead.')
+        self._read_names(params)
+        var_names = [name for name, par in params.items() if par.vary]
+        params = copy.deepcopy(params)
+        x0 = np.array([params[name].value for name in var_names])
+        lower = [-np.inf if params[name].min is None else params[name].min
+                 for name in var_names]
+        upper = [np.inf if params[name].max is None else params[name].max
+                 for name in var_names]
+
+        def fun(x):
+            self._set_values(params, var_names, x)
+            return self._residual()
+
+        def jac(x):
+            self._set_values(params, var_names, x)
+            return self._jacobian(var_names)
+
+        if jacobian:
+            kwargs['jac'] = jac
+        else:
+            kwargs['jac_sparsity'] = self.cal_jac_sparsity(params)
+        ret = least_squares(fun, x0, bounds=(lower, upper), **kwargs)
+        self._set_values(params, var_names, ret.x)
+        hess = ret.jac.T @ ret.jac
+        if issparse(hess):
+            hess = hess.toarray()
+        return make_result(params, var_names, x0, ret, hess,
+                           scale_covar=scale_covar)
+
+    def eval(self, params, name, **kwargs):
+        """
+        evaluate the model of a dataset
+
+        :param params: global lmfit Parameters
+        :param name: name of the dataset
+        :param kwargs: independent variables.  If not given, those of the
+            dataset are used.
+        :return: model values
+        """
+        dataset = self.datasets[name]
+        if len(kwargs) == 0:
+            kwargs = dataset['kwargs']
+        return dataset['model'].eval(self.get_params(params, name),
+                                     **kwargs)
+
+    def get_params(self, params, name):
+        """
+        get parameters of a dataset from the global parameters
+
+        :param params: global lmfit Parameters, such as result.params
+        :param name: name of the dataset
+        :return: lmfit Parameters of the dataset with values and standard
+            errors of the global parameters
+        """
+        self._read_names(params)
+        ds_params = copy.deepcopy(self.datasets[name]['params'])
+        for par_name, par in ds_params.items():
+            global_par = params[self._get_global_name(name, par_name)]
+            par.value = global_par.value
+            par.stderr = global_par.stderr
+        return ds_params
+
+    def cal_jac_sparsity(self, params):
+        """
+        calculate sparsity structure of the Jacobian
+
+        :param params: global lmfit Parameters
+        :return: sparse matrix of (number of data, number of varying
+            parameters), nonzero where a dataset depends on a parameter
+        """
+        self._read_names(params)
+        var_names = [name for name, par in params.items()
+                     if par.vary and (par.expr is None)]
+        columns = dict((name, i) for i, name in enumerate(var_names))
+        n_data = sum(dataset['data'].size
+                     for dataset in self.datasets.values())
+        sparsity = lil_matrix((n_data, len(var_names)), dtype=int)
+        start = 0
+        for name, dataset in self.datasets.items():
+            stop = start + dataset['data'].size
+            for par_name in dataset['params'].keys():
+                global_name = self._get_global_name(name, par_name)
+                if global_name in columns:
+                    sparsity[start:stop, columns[global_name]] = 1
+            start = stop
+        return sparsity.tocsr()
+
+    def _get_global_name(self, name, par_name):
+        """
+        get global name of a dataset parameter
+
+        :param name: name of the dataset
+        :param par_name: name of the parameter in the dataset
+        :return: name in the global parameters
+        :note: internal function
+        """
+        return self._global_names[(name, par_name)]
+
+    def _read_names(self, params):
+        """
+        read global names of the dataset parameters from user_data of the
+        global parameters
+
+        :param params: global lmfit Parameters made by make_params
+        :note: internal function
+        """
+        self._global_names = dict(
+            (member, global_name) for global_name, par in params.items()
+            for member in (par.user_data or []))
+        for name, dataset in self.datasets.items():
+            for par_name in dataset['params'].keys():
+                if (name, par_name) not in self._global_names:
+                    raise ValueError('No global parameter for ' + par_name +
+                                     ' of ' + name + '.  Make parameters '
+                                     'with make_params.')
+
+    def _set_values(self, params, var_names, x):
+        """
+        set values of the global and dataset parameters
+
+        :param params: global lmfit Parameters
+        :param var_names: names of the varying parameters
+        :param x: values of the varying parameters
+        :note: internal function
+        """
+        for name, value in zip(var_names, x):
+            params[name].value = value
+        for name, dataset in self.datasets.items():
+            for par_name, par in dataset['work'].items():
+                par.value = params[self._get_global_name(name,
+                                                         par_name)].value
+
+    def _residual(self):
+        """
+        calculate stacked residuals of all datasets
+
+        :return: 1D array of weighted residuals
+        :note: internal function
+        """
+        residuals = []
+        for dataset in self.datasets.values():
+            diff = dataset['model'].eval(dataset['work'],
+                                         **dataset['kwargs']) - \
+                dataset['data']
+            if dataset['weights'] is not None:
+                diff = diff * dataset['weights']
+            residuals.append(np.ravel(diff))
+        return np.concatenate(residuals)
+
+    def _jacobian(self, var_names):
+        """
+        assemble sparse Jacobian of the stacked residuals from derivatives
+        of the models
+
+        :param var_names: names of the varying global parameters
+        :return: sparse matrix of (number of data, number of varying
+            parameters)
+        :note: internal function
+        """
+        columns = dict((name, i) for i, name in enumerate(var_names))
+        rows, cols, values = [], [], []
+        start = 0
+        for name, dataset in self.datasets.items():
+            shape = dataset['data'].shape
+            size = dataset['data'].size
+            local = [(par_name, columns[self._get_global_name(name,
+                                                              par_name)])
+                     for par_name in dataset['params'].keys()
+                     if self._get_global_name(name, par_name) in columns]
+            d = model_derivatives(dataset['model'], dataset['work'],
+                                  [par_name for par_name, i in local],
+                                  **dataset['kwargs'])
+            for par_name, i in local:
+                d_i = np.broadcast_to(d[par_name], shape)
+                if dataset['weights'] is not None:
+                    d_i = d_i * dataset['weights']
+                rows.append(np.arange(start, start + size))
+                cols.append(np.full(size, i))
+                values.append(np.ravel(d_i))
+            start += size
+        return csr_matrix(
+            (np.concatenate(values), (np.concatenate(rows),
+                                      np.concatenate(cols))),
+            shape=(start, len(var_names)))
+
+
+def make_result(params, var_names, init_vals, ret, hess, scale_covar=True,
+                n_latent=0):
+    """
+    make lmfit MinimizerResult from the result of
+    scipy.optimize.least_squares
+
+    :param params: lmfit Parameters with the fitted values
+    :param var_names: names of the varying parameters
+    :param init_vals: initial values of the varying parameters
+    :param ret: OptimizeResult from least_squares, or with fun, nfev,
+        success, status, and message
+    :param hess: J^T J for the varying parameters, in (number of varying
+        parameters, number of varying parameters) array
+    :param scale_covar: if True, scale covariance by reduced chi-square
+    :param n_latent: number of fitted variables other than the parameters,
+        counted for degrees of freedom
+    :return: lmfit MinimizerResult, which works with lmfit.fit_report
+    :note: internal function
+    """
+    result = MinimizerResult()
+    result.method = 'least_squares'
+    result.params = params
+    result.var_names = var_names
+    result.init_vals = list(init_vals)
+    result.residual = ret.fun
+    result.nfev = ret.nfev
+    result.success = ret.success
+    result.status = ret.status
+    result.message = ret.message
+    result.errorbars = False
+    result.covar = None
+    # statistics as lmfit calculates them
+    result.nvarys = len(var_names) + n_latent
+    result.ndata = ret.fun.size
+    result.nfree = result.ndata - result.nvarys
+    result.chisqr = max((ret.fun ** 2).sum(), 1.e-250 * result.ndata)
+    result.redchi = result.chisqr / max(1, result.nfree)
+    neg2_log_likel = result.ndata * np.log(result.chisqr / result.ndata)
+    result.aic = neg2_log_likel + 2 * result.nvarys
+    result.bic = neg2_log_likel + np.log(result.ndata) * result.nvarys
+    try:
+        result.covar = np.linalg.inv(hess)
+    except np.linalg.LinAlgError:
+        return result
+    if scale_covar:
+        result.covar = result.covar * result.redchi
+    std = np.sqrt(np.diag(result.covar))
+    result.errorbars = bool(np.all(std > 0.))
+    for i, name in enumerate(var_names):
+        params[name].stderr = float(std[i])
+        params[name].correl = dict(
+            (name2, float(result.covar[i, j] / (std[i] * std[j])))
+            for j, name2 in enumerate(var_names) if j != i)
+    return result
@@ -0,0 +1,186 @@
+"""
+Jacobians of the lmfit models in pytheos with respect to their parameters.
+Models derived from JacobianModel hand the Jacobian to the least-squares
+backend of lmfit (Dfun for leastsq and jac for least_squares), so that
+lmfit does not difference the model numerically for every parameter.
+"""
+import operator
+from collections import OrderedDict
+import numpy as np
+import lmfit
+
+
+def model_derivatives(model, params, names, **kwargs):
+    """
+    calculate derivatives of an lmfit model with respect to parameters.
+    Composite models made with +, -, *, / are supported.
+
+    :param model: lmfit Model or CompositeModel
+    :param params: lmfit Parameters
+    :param names: list of parameter names with prefix
+    :param kwargs: independent variables and other keywords for the model
+    :return: OrderedDict of parameter names and derivatives of the model
+    :note: derivatives come from model.cal_derivatives if the model has it,
+        otherwise from complex-step differentiation of the model function
+    """
+    if isinstance(model, lmfit.CompositeModel):
+        d_l = model_derivatives(model.left, params, names, **kwargs)
+        d_r = model_derivatives(model.right, params, names, **kwargs)
+        if model.op in (operator.add, operator.sub):
+            return OrderedDict(
+                (name, model.op(d_l[name], d_r[name])) for name in names)
+        f_l = model.left.eval(params=params, **kwargs)
+        f_r = model.right.eval(params=params, **kwargs)
+        if model.op is operator.mul:
+            return OrderedDict(
+                (name, d_l[name] * f_r + f_l * d_r[name]) for name in names)
+        if model.op is operator.truediv:
+            return OrderedDict(
+                (name, (d_l[name] - f_l / f_r * d_r[name]) / f_r)
+                for name in names)
+        raise ValueError('Cannot calculate derivatives for operator ' +
+                         str(model.op))
+    args = model.make_funcargs(params, kwargs)
+    own = [name for name in names if name in model.param_names]
+    if hasattr(model, 'cal_derivatives'):
+        d_own = model.cal_derivatives(
+            args, [model._strip_prefix(name) for name in own])
+    else:
+        d_own = cal_complex_step(model.func, args,
+                                 [model._strip_prefix(name) for name in own])
+    result = OrderedDict()
+    for name in names:
+        if name in own:
+            result[name] = d_own[model._strip_prefix(name)]
+        else:
+            result[name] = 0.
+    return result
+
+
+def cal_complex_step(func, args, names, h=1.e-20):
+    """
+    calculate derivatives of a function using complex-step
+    differentiation, which is accurate to machine precision
+
+    :param func: function to differentiate
+    :param args: dictionary of keyword arguments for func
+    :param names: names of arguments to differentiate for
+    :param h: step size relative to the argument value
+    :return: dictionary of argument names and derivatives
+    :note: internal function, func has to support complex numbers
+    """
+    result = {}
+    for name in names:
+        step = h * max(abs(args[name]), 1.)
+        args_c = dict(args)
+        args_c[name] = args[name] + 1.j * step
+        result[name] = np.imag(func(**args_c)) / step
+    return result
+
+
+def make_dfun(model):
+    """
+    make a Jacobian function of the residual for lmfit fitting,
+    which can be given to model.fit through fit_kws={'Dfun': make_dfun(model)}
+
+    :param model: lmfit Model or CompositeModel
+    :return: function of (params, data, weights, **kwargs) returning
+        Jacobian in (number of data, number of varying parameters) array
+    :note: parameters constrained by expr are not supported
+    """
+    def dfun(params, data, weights, **kwargs):
+        names = [name for name, par in params.items()
+                 if par.vary and par.expr is None]
+        d = model_derivatives(model, params, names, **kwargs)
+        shape = np.shape(data)
+        jac = np.column_stack([np.broadcast_to(d[name], shape).ravel()
+                               for name in names])
+        if weights is None:
+            return -jac
+        return -np.broadcast_to(weights, shape).reshape(-1, 1) * jac
+    return dfun
+
+
+class JacobianModel(lmfit.Model):
+    """
+    lmfit Model class which provides Jacobian to the least-squares fitting.
+    Combining two JacobianModels with +, -, *, / gives
+    JacobianCompositeModel.
+    """
+
+    def cal_derivatives(self, args, names):
+        """
+        calculate derivatives of the model function
+
+        :param args: dictionary of arguments for the model function,
+            see lmfit.Model.make_funcargs
+        :param names: parameter names without prefix
+        :return: dictionary of parameter names and derivatives
+        :note: complex-step differentiation by default, override for
+            analytical derivatives
+        """
+        return cal_complex_step(self.func, args, names)
+
+    def fit(self, data, params=None, weights=None, method='leastsq',
+            fit_kws=None, jacobian=True, **kwargs):
+        """
+        fit the model to the data, see lmfit.Model.fit
+
+        :param data: array of data to be fit
+        :param params: lmfit Parameters
+        :param weights: weights for the residual
+        :param method: fitting method, see lmfit
+        :param fit_kws: options to pass to the minimizer
+        :param jacobian: if True, give Jacobian to leastsq and least_squares
+        :param kwargs: independent variables and other options for lmfit
+        :return: lmfit ModelResult
+        :note: numerical differentiation of lmfit is used if any parameter
+            is constrained by expr or nan_policy is omit
+        """
+        fit_kws = {} if fit_kws is None else dict(fit_kws)
+        use_jac = jacobian and (params is not None) and \
+            (method in ('leastsq', 'least_squares')) and \
+            ('Dfun' not in fit_kws) and ('jac' not in fit_kws) and \
+            (kwargs.get('nan_policy', self.nan_policy) != 'omit') and \
+            all(par.expr is None for par in params.values()) and \
+            not (set(kwargs.keys()) & set(self.param_names))
+        if use_jac:
+            fit_kws['Dfun'] = make_dfun(self)
+        return super(JacobianModel, self).fit(
+            data, params=params, weights=weights, method=method,
+            fit_kws=fit_kws, **kwargs)
+
+    def __add__(self, other):
+        return JacobianCompositeModel(self, other, operator.add)
+
+    def __sub__(self, other):
+        return JacobianCompositeModel(self, other, operator.sub)
+
+    def __mul__(self, other):
+        return JacobianCompositeModel(self, other, operator.mul)
+
+    def __truediv__(self, other):
+        return JacobianCompositeModel(self, other, operator.truediv)
+
+
+class JacobianCompositeModel(JacobianModel, lmfit.CompositeModel):
+    """
+    lmfit CompositeModel class which provides Jacobian to the least-squares
+    fitting
+    """
+
+    def __init__(self, left, right, op, **kwargs):
+        """
+        :param left: left-hand model
+        :param right: right-hand model
+        :param op: binary operator to combine left and right
+        :param kwargs: see lmfit
+        """
+        lmfit.CompositeModel.__init__(self, left, right, op, **kwargs)
+
+    def __reduce__(self):
+        """
+        pickle the composite model through its left and right models,
+        so that it can be sent to worker processes, see fit_resample
+        """
+        return (self.__class__, (self.left, self.right, self.op))
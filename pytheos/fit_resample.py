@@ -0,0 +1,278 @@
+"""
+Bootstrap and jackknife estimates of the uncertainties and correlations of
+fitted parameters.  The model is refit to resamples of the data in a pool
+of processes.  Data, weights, and independent variables are placed in
+shared memory once, so that the workers read them without copying.  Only
+the indices of the resamples are sent to the workers.
+"""
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+# model, parameters, and data views of a worker process, see _init_worker
+_worker = {}
+
+
+def bootstrap_fit(model, data, params, n_resamples=500, weights=None,
+                  max_workers=None, chunk_size=None, seed=None,
+                  percentiles=(2.275, 15.865, 50., 84.135, 97.725),
+                  **kwargs):
+    """
+    refit a model to bootstrap resamples of the data, drawn with
+    replacement
+
+    :param model: lmfit Model, such as BM3Model(prefix='st_') +
+        ConstqModel(n, z, prefix='th_').  It has to be picklable, which
+        pytheos models and their combinations are.
+    :param data: data to be fit, such as pressure, 1D array of N points
+    :param params: lmfit Parameters with initial values
+    :param n_resamples: number of resamples
+    :param weights: weights for the residual, 1D array of N points
+    :param max_workers: number of worker processes.  If None, number of
+        CPUs.  If 1, fits run in this process.
+    :param chunk_size: number of resamples sent to a worker at once
+    :param seed: seed for random number generator
+    :param percentiles: percentiles to calculate, in %
+    :param kwargs: independent variables, such as v and temp, and options
+        for model.fit.  Arrays and lists of N points are resampled with
+        the data.
+    :return: OrderedDict of names of the parameters, samples in
+        (n_resamples, number of parameters) array, n_valid for the number
+        of successful fits, mean, std, percentiles, cov, and corr
+    :note: parameters which vary or are constrained by expr are reported.
+        Failed fits give nan in samples and are excluded from statistics.
+    """
+    n = np.size(data)
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, n, size=(n_resamples, n))
+    names = _get_names(params)
+    samples = resample_fit(model, data, params, indices, weights=weights,
+                           max_workers=max_workers, chunk_size=chunk_size,
+                           **kwargs)
+    result = cal_statistics(names, samples)
+    valid = samples[np.isfinite(samples).all(axis=1)]
+    result['percentiles'] = np.percentile(valid, percentiles, axis=0) \
+        if valid.shape[0] != 0 else \
+        np.full((len(percentiles), len(names)), np.nan)
+    return result
+
+
+def jackknife_fit(model, data, params, weights=None, max_workers=None,
+                  chunk_size=None, **kwargs):
+    """
+    refit a model to jackknife resamples of the data, each leaving out
+    one data point
+
+    :param model: lmfit Model, see bootstrap_fit
+    :param data: data to be fit, 1D array of N points
+    :param params: lmfit Parameters with initial values
+    :param weights: weights for the residual, 1D array of N points
+    :param max_workers: number of worker processes, see bootstrap_fit
+    :param chunk_size: number of resamples sent to a worker at once
+    :param kwargs: independent variables and options for model.fit
+    :return: OrderedDict of names, samples in (N, number of parameters)
+        array, n_valid, mean, std, cov, corr, and bias
+    :note: std, cov, and bias are jackknife estimates, scaled by (N - 1)
+        from the spread of the samples.  bias is the jackknife mean
+        minus the fit to all data.
+    """
+    n = np.size(data)
+    indices = np.array([np.delete(np.arange(n), i) for i in range(n)])
+    names = _get_names(params)
+    samples = resample_fit(model, data, params, indices, weights=weights,
+                           max_workers=max_workers, chunk_size=chunk_size,
+                           **kwargs)
+    result = cal_statistics(names, samples)
+    n_valid = result['n_valid']
+    result['std'] = result['std'] * (n_valid - 1.) / np.sqrt(n_valid)
+    result['cov'] = result['cov'] * (n_valid - 1.) ** 2 / n_valid
+    fit_all = _fit_one(model, data, params, weights, kwargs, names)
+    result['bias'] = (n_valid - 1.) * (result['mean'] - fit_all)
+    return result
+
+
+def resample_fit(model, data, params, indices, weights=None,
+                 max_workers=None, chunk_size=None, **kwargs):
+    """
+    refit a model to resamples of the data given by indices
+
+    :param model: lmfit Model, see bootstrap_fit
+    :param data: data to be fit, 1D array of N points
+    :param params: lmfit Parameters with initial values
+    :param indices: indices of the data points in each resample,
+        (number of resamples, number of points in a resample) int array
+    :param weights: weights for the residual, 1D array of N points
+    :param max_workers: number of worker processes, see bootstrap_fit
+    :param chunk_size: number of resamples sent to a worker at once.
+        If None, resamples are split to four chunks per worker.
+    :param kwargs: independent variables and options for model.fit
+    :return: fitted parameters in (number of resamples, number of
+        parameters) array, in the order of _get_names(params)
+    """
+    data = np.asarray(data, dtype=float)
+    n = data.size
+    indices = np.asarray(indices, dtype=np.intp)
+    # rows of the shared block: data, weights, and independent variables
+    rows = [data]
+    if weights is not None:
+        rows.append(np.broadcast_to(np.asarray(weights, dtype=float), n))
+    keys = []
+    options = {}
+    for key, value in kwargs.items():
+        # lists of N points are resampled as well as arrays
+        if (not isinstance(value, np.ndarray)) and (np.ndim(value) == 1) \
+                and (np.size(value) == n):
+            value = np.asarray(value)
+        if isinstance(value, np.ndarray) and (value.shape == (n,)):
+            keys.append(key)
+            rows.append(value.astype(float))
+        else:
+            options[key] = value
+    names = _get_names(params)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers == 1:
+        _worker.update(_make_worker(np.stack(rows), model, params, names,
+                                    weights is not None, keys, options))
+        try:
+            return _fit_chunk(indices)
+        finally:
+            _worker.clear()
+    if chunk_size is None:
+        chunk_size = max(1, -(-indices.shape[0] // (4 * max_workers)))
+    shm = shared_memory.SharedMemory(create=True,
+                                     size=len(rows) * n * data.itemsize)
+    try:
+        np.ndarray((len(rows), n), dtype=float, buffer=shm.buf)[:] = rows
+        with ProcessPoolExecutor(
+                max_workers=max_workers, initializer=_init_worker,
+                initargs=(shm.name, (len(rows), n), model, params, names,
+                          weights is not None, keys, options)) as executor:
+            chunks = [indices[i:i + chunk_size]
+                      for i in range(0, indices.shape[0], chunk_size)]
+            results = list(executor.map(_fit_chunk, chunks))
+    finally:
+        shm.close()
+        shm.unlink()
+    return np.concatenate(results, axis=0)
+
+
+def cal_statistics(names, samples):
+    """
+    calculate statistics of fitted parameters from resamples
+
+    :param names: names of the parameters
+    :param samples: (number of resamples, number of parameters) array
+    :return: OrderedDict of names, samples, n_valid, mean, std, cov, and
+        corr
+    :note: internal function.  Only resamples with all parameters finite
+        are used.
+    """
+    valid = samples[np.isfinite(samples).all(axis=1)]
+    n_params = len(names)
+    result = OrderedDict()
+    result['names'] = list(names)
+    result['samples'] = samples
+    result['n_valid'] = valid.shape[0]
+    if valid.shape[0] < 2:
+        result['mean'] = np.full(n_params, np.nan)
+        result['std'] = np.full(n_params, np.nan)
+        result['cov'] = np.full((n_params, n_params), np.nan)
+        result['corr'] = np.full((n_params, n_params), np.nan)
+        return result
+    result['mean'] = valid.mean(axis=0)
+    result['std'] = valid.std(axis=0, ddof=1)
+    result['cov'] = np.atleast_2d(np.cov(valid, rowvar=False))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['corr'] = result['cov'] / \
+            np.outer(result['std'], result['std'])
+    return result
+
+
+def _get_names(params):
+    """
+    get names of the parameters to report
+
+    :param params: lmfit Parameters
+    :return: list of names of parameters which vary or have expr
+    :note: internal function
+    """
+    return [name for name, par in params.items()
+            if par.vary or (par.expr is not None)]
+
+
+def _fit_one(model, data, params, weights, kwargs, names):
+    """
+    fit a model and get values of the parameters
+
+    :param model: lmfit Model
+    :param data: data to be fit
+    :param params: lmfit Parameters
+    :param weights: weights or None
+    :param kwargs: independent variables and options for model.fit
+    :param names: names of the parameters to get
+    :return: array of parameter values, nan if the fit failed
+    :note: internal function
+    """
+    try:
+        fit = model.fit(data, params, weights=weights, **kwargs)
+    except Exception:
+        return np.full(len(names), np.nan)
+    if not fit.success:
+        return np.full(len(names), np.nan)
+    return np.array([fit.params[name].value for name in names])
+
+
+def _make_worker(block, model, params, names, weighted, keys, options):
+    """
+    collect what a worker needs to fit resamples
+
+    :param block: data, weights, and independent variables in rows
+    :return: dictionary for _worker
+    :note: internal function, see resample_fit for the other parameters
+    """
+    return {'block': block, 'model': model, 'params': params,
+            'names': names, 'weighted': weighted, 'keys': keys,
+            'options': options}
+
+
+def _init_worker(shm_name, shape, model, params, names, weighted, keys,
+                 options):
+    """
+    attach a worker process to the shared data
+
+    :param shm_name: name of the shared memory block
+    :param shape: shape of the block
+    :note: internal function, see resample_fit for the other parameters
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    _worker.update(_make_worker(block, model, params, names, weighted,
+                                keys, options))
+    # keep the block mapped as long as the worker lives
+    _worker['shm'] = shm
+
+
+def _fit_chunk(indices):
+    """
+    fit resamples in a worker
+
+    :param indices: (number of resamples, number of points) int array
+    :return: fitted parameters in (number of resamples, number of
+        parameters) array
+    :note: internal function
+    """
+    block = _worker['block']
+    weighted = _worker['weighted']
+    names = _worker['names']
+    result = np.empty((indices.shape[0], len(names)))
+    for i, idx in enumerate(indices):
+        kwargs = dict(_worker['options'])
+        for j, key in enumerate(_worker['keys']):
+            kwargs[key] = block[j + 1 + weighted, idx]
+        weights = block[1, idx] if weighted else None
+        result[i] = _fit_one(_worker['model'], block[0, idx],
+                             _worker['params'], weights, kwargs, names)
+    return result
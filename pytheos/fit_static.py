@@ -1,10 +1,11 @@
-import lmfit
-from .eqn_bm3 import bm3_p
-from .eqn_vinet import vinet_p
-from .eqn_kunc import kunc_p
+import numpy as np
+from .eqn_bm3 import bm3_p, cal_dpdv_bm3
+from .eqn_vinet import vinet_p, cal_p_vinet, cal_dpdv_vinet
+from .eqn_kunc import kunc_p, cal_p_kunc, cal_dpdv_kunc
+from .fit_jacobian import JacobianModel
 
 
-class BM3Model(lmfit.Model):
+class BM3Model(JacobianModel):
     """
     lmfit Model class for BM3 fitting
     """
@@ -28,6 +29,24 @@ class BM3Model(lmfit.Model):
         self.set_param_hint('k0', min=0.)
         self.set_param_hint('k0p', min=0.)
 
+    def cal_derivatives(self, args, names):
+        """
+        calculate derivatives of pressure analytically
+
+        :param args: dictionary of arguments for bm3_p
+        :param names: parameter names without prefix
+        :return: dictionary of parameter names and derivatives
+        """
+        v, k = args['v'], [args['v0'], args['k0'], args['k0p']]
+        p_ref = args.get('p_ref', 0.)
+        vvr = v / k[0]
+        f = 1. - vvr**(-2. / 3.)
+        d = {'v0': -vvr * cal_dpdv_bm3(v, k, p_ref=p_ref),
+             'k0': (-1.5 * f + 9. / 8. * (k[2] - 4.) * f**2.) *
+             vvr**(-5. / 3.),
+             'k0p': 9. / 8. * k[1] * f**2. * vvr**(-5. / 3.)}
+        return {name: d[name] for name in names}
+
     # not supported
     # def guess(self, data, x=None, negative=False, **kwargs):
     #    pars = guess_from_peak(self, data, x, negative)
@@ -37,7 +56,7 @@ class BM3Model(lmfit.Model):
 #    guess.__doc__ = COMMON_GUESS_DOC
 
 
-class VinetModel(lmfit.Model):
+class VinetModel(JacobianModel):
     """
     lmfit Model class for Vinet fitting
     """
@@ -61,8 +80,24 @@ class VinetModel(lmfit.Model):
         self.set_param_hint('k0', min=0.)
         self.set_param_hint('k0p', min=0.)
 
+    def cal_derivatives(self, args, names):
+        """
+        calculate derivatives of pressure analytically
+
+        :param args: dictionary of arguments for vinet_p
+        :param names: parameter names without prefix
+        :return: dictionary of parameter names and derivatives
+        """
+        v, k = args['v'], [args['v0'], args['k0'], args['k0p']]
+        p = cal_p_vinet(v, k, uncertainties=False)
+        x = np.power(v / k[0], 1. / 3.)
+        d = {'v0': -v / k[0] * cal_dpdv_vinet(v, k),
+             'k0': p / k[1],
+             'k0p': 1.5 * (1. - x) * p}
+        return {name: d[name] for name in names}
+
 
-class KuncModel(lmfit.Model):
+class KuncModel(JacobianModel):
     """
     lmfit Model class for Kunc fitting
     """
@@ -86,3 +121,20 @@ class KuncModel(lmfit.Model):
         self.set_param_hint('v0', min=0.)
         self.set_param_hint('k0', min=0.)
         self.set_param_hint('k0p', min=0.)
+
+    def cal_derivatives(self, args, names):
+        """
+        calculate derivatives of pressure analytically
+
+        :param args: dictionary of arguments for kunc_p
+        :param names: parameter names without prefix
+        :return: dictionary of parameter names and derivatives
+        """
+        v, k = args['v'], [args['v0'], args['k0'], args['k0p']]
+        order = args.get('order', 5)
+        p = cal_p_kunc(v, k, order=order, uncertainties=False)
+        x = np.power(v / k[0], 1. / 3.)
+        d = {'v0': -v / k[0] * cal_dpdv_kunc(v, k, order=order),
+             'k0': p / k[1],
+             'k0p': 1.5 * (1. - x) * p}
+        return {name: d[name] for name in names}
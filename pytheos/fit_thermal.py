@@ -1,12 +1,12 @@
-import lmfit
 from .eqn_therm_constq import constq_pth
 from .eqn_therm_Speziale import speziale_pth
 from .eqn_therm_Tange import tange_pth
 from .eqn_therm_Dorogokupets2007 import dorogokupets2007_pth
 from .eqn_therm_Dorogokupets2015 import dorogokupets2015_pth
+from .fit_jacobian import JacobianModel
 
 
-class ConstqModel(lmfit.Model):
+class ConstqModel(JacobianModel):
     """
     lmfit Model class for Constant Q model fitting
     """
@@ -35,7 +35,7 @@ class ConstqModel(lmfit.Model):
         self.set_param_hint('theta0', min=0.)
 
 
-class SpezialeModel(lmfit.Model):
+class SpezialeModel(JacobianModel):
     """
     lmfit Model class for Speziale model fitting
     """
@@ -65,7 +65,7 @@ class SpezialeModel(lmfit.Model):
         self.set_param_hint('theta0', min=0.)
 
 
-class TangeModel(lmfit.Model):
+class TangeModel(JacobianModel):
     """
     lmfit Model class for Tange model fitting
     """
@@ -95,7 +95,7 @@ class TangeModel(lmfit.Model):
         self.set_param_hint('theta0', min=0.)
 
 
-class Dorogokupets2007Model(lmfit.Model):
+class Dorogokupets2007Model(JacobianModel):
     """
     lmfit Model class for Dorogokupets2007 model fitting
     """
@@ -127,7 +127,7 @@ class Dorogokupets2007Model(lmfit.Model):
         self.set_param_hint('theta0', min=0.)
 
 
-class Dorogokupets2015Model(lmfit.Model):
+class Dorogokupets2015Model(JacobianModel):
     """
     lmfit Model class for Dorogokupets2015 model fitting
     """
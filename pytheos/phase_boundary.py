@@ -0,0 +1,176 @@
+"""
+Phase boundaries between two phases described by MGEOS, such as B1 and B2
+NaCl.  The boundary is where the Gibbs free energies of the two phases
+are equal.  Free energies of each EOS are relative to its own reference
+state, so the difference at the reference is given as an offset, dg0.
+Pressures for all temperatures are solved together, see
+cal_phase_boundary.
+"""
+from collections import OrderedDict
+import numpy as np
+import uncertainties as uct
+from uncertainties import unumpy as unp
+from .etc import isuncertainties
+from .solver import newton_bracket
+
+
+def cal_phase_boundary(eos1, eos2, temp, dg0, p_range=(0., 100.),
+                       n_scan=64, tables=None, xtol=1.e-8, maxiter=50):
+    """
+    calculate pressure of the boundary between two phases at given
+    temperatures, where G2 - G1 + dg0 = 0
+
+    :param eos1: MGEOS object of the low pressure phase, such as
+        pytheos.sodium_chloride.Dorogokupets2007()
+    :param eos2: MGEOS object of the high pressure phase, such as
+        pytheos.sodium_chloride_b2.Dorogokupets2007()
+    :param temp: temperature in K
+    :param dg0: Gibbs free energy of phase 2 relative to phase 1 at their
+        reference states, in J/mol for a formula unit.  There is no default,
+        because with 0 the free energies are compared at different
+        reference states and the crossing found, often at p_range[0], is
+        not the boundary.  It can be set from a known point on the
+        boundary, dg0 = -cal_delta_g(eos1, eos2, p, temp, 0.).
+    :param p_range: minimum and maximum pressures in GPa to search for
+        the boundary
+    :param n_scan: number of pressures in p_range where the sign of the
+        free energy difference is checked for brackets
+    :param tables: None or a pair of GibbsTable for eos1 and eos2, such as
+        from eos.tabulate_gibbs, which are used instead of the equations
+    :param xtol: relative tolerance for pressure
+    :param maxiter: maximum number of Newton iterations
+    :return: OrderedDict of p (pressure in GPa), dpdt (Clapeyron slope,
+        dS / dV, in GPa/K), dv (V2 - V1 in m^3/mol), and ds (S2 - S1 in
+        J/mol/K), each in the same shape as temp.  nan if the free
+        energies do not cross in p_range.
+    :note: the two EOS should be for the same formula unit.  The lowest
+        crossing in p_range is taken.  The free energy difference is
+        calculated for all temperatures and scan pressures in one pass,
+        then the brackets are refined by Newton steps with
+        dG/dP = V for all temperatures at once.  Nominal values are used.
+    """
+    if isuncertainties([temp, dg0]):
+        temp = unp.nominal_values(temp)
+        dg0 = uct.nominal_value(dg0)
+    temp = np.asarray(temp, dtype=float)
+    tt = temp.ravel()
+    p_scan = np.linspace(p_range[0], p_range[1], n_scan)
+    with np.errstate(invalid='ignore'):
+        dg = cal_delta_g(eos1, eos2, p_scan[None, :], tt[:, None], dg0=dg0,
+                         tables=tables)
+        # first sign change between finite values along pressure
+        cross = np.isfinite(dg[:, :-1]) & np.isfinite(dg[:, 1:]) & \
+            (np.sign(dg[:, :-1]) != np.sign(dg[:, 1:]))
+    found = np.flatnonzero(cross.any(axis=1))
+    i_lo = cross[found].argmax(axis=1)
+    p_lo, p_hi = p_scan[i_lo], p_scan[i_lo + 1]
+    dg_lo, dg_hi = dg[found, i_lo], dg[found, i_lo + 1]
+    p_b = np.full(tt.size, np.nan)
+    ds = np.full(tt.size, np.nan)
+    dv = np.full(tt.size, np.nan)
+
+    def f_df(x, idx):
+        g, g_p, g_t = _cal_delta_g_derivatives(
+            eos1, eos2, x, tt[found[idx]], dg0, tables)
+        return g, g_p
+
+    if found.size != 0:
+        # start from linear interpolation in the brackets
+        x0 = p_lo - dg_lo * (p_hi - p_lo) / (dg_hi - dg_lo)
+        x, converged = newton_bracket(f_df, x0, p_lo, p_hi, xtol=xtol,
+                                      maxiter=maxiter)
+        ok = found[converged]
+        p_b[ok] = x[converged]
+        g, g_p, g_t = _cal_delta_g_derivatives(eos1, eos2, p_b[ok], tt[ok],
+                                               dg0, tables)
+        # dG/dP in J/mol/GPa is molar volume times 1e9
+        dv[ok], ds[ok] = g_p * 1.e-9, -g_t
+    result = OrderedDict()
+    result['p'] = p_b.reshape(temp.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['dpdt'] = (ds / dv * 1.e-9).reshape(temp.shape)
+    result['dv'] = dv.reshape(temp.shape)
+    result['ds'] = ds.reshape(temp.shape)
+    return result
+
+
+def cal_delta_g(eos1, eos2, p, temp, dg0, tables=None):
+    """
+    calculate Gibbs free energy of phase 2 relative to phase 1
+
+    :param eos1: MGEOS object of phase 1
+    :param eos2: MGEOS object of phase 2
+    :param p: pressure in GPa
+    :param temp: temperature in K
+    :param dg0: G2 - G1 at the reference states in J/mol, see
+        cal_phase_boundary
+    :param tables: None or a pair of GibbsTable for eos1 and eos2
+    :return: G2 - G1 + dg0 in J/mol, negative where phase 2 is stable
+    :note: nominal values are used
+    """
+    if isuncertainties([p, temp, dg0]):
+        p, temp = unp.nominal_values(p), unp.nominal_values(temp)
+        dg0 = uct.nominal_value(dg0)
+    p, temp = np.broadcast_arrays(np.asarray(p, dtype=float),
+                                  np.asarray(temp, dtype=float))
+    shape = p.shape
+    g = _cal_delta_g_derivatives(eos1, eos2, p.ravel(), temp.ravel(), dg0,
+                                 tables)[0]
+    return g.reshape(shape)
+
+
+def flag_transition(eos1, eos2, p, temp, dg0, margin=0., tables=None,
+                    **kwargs):
+    """
+    flag data points in the stability field of phase 2 or close to the
+    boundary, for example to exclude data taken across a transition
+
+    :param eos1: MGEOS object of phase 1
+    :param eos2: MGEOS object of phase 2
+    :param p: pressure in GPa
+    :param temp: temperature in K
+    :param dg0: G2 - G1 at the reference states in J/mol, see
+        cal_phase_boundary
+    :param margin: points within this pressure in GPa from the boundary
+        are also flagged
+    :param tables: None or a pair of GibbsTable for eos1 and eos2
+    :param kwargs: p_range, n_scan, xtol, and maxiter for
+        cal_phase_boundary, which is used only if margin is positive
+    :return: boolean array, True where G2 is lower than G1 or the boundary
+        is within margin
+    :note: nominal values are used.  Points where the free energy
+        difference cannot be calculated are not flagged.
+    """
+    if isuncertainties([p, temp]):
+        p, temp = unp.nominal_values(p), unp.nominal_values(temp)
+    p, temp = np.broadcast_arrays(np.asarray(p, dtype=float),
+                                  np.asarray(temp, dtype=float))
+    with np.errstate(invalid='ignore'):
+        flag = cal_delta_g(eos1, eos2, p, temp, dg0=dg0, tables=tables) < 0.
+    if margin <= 0.:
+        return flag
+    t_u, inverse = np.unique(temp, return_inverse=True)
+    p_b = cal_phase_boundary(eos1, eos2, t_u, dg0=dg0, tables=tables,
+                             **kwargs)['p'][inverse.reshape(temp.shape)]
+    with np.errstate(invalid='ignore'):
+        return flag | (np.abs(p - p_b) <= margin)
+
+
+def _cal_delta_g_derivatives(eos1, eos2, p, temp, dg0, tables):
+    """
+    calculate G2 - G1 + dg0 and its derivatives
+
+    :param p: pressure in GPa, float array
+    :param temp: temperature in K, float array
+    :return: free energy difference in J/mol, its pressure derivative in
+        J/mol/GPa, and its temperature derivative in J/mol/K
+    :note: internal function, see cal_delta_g for the other parameters
+    """
+    results = []
+    for i, eos in enumerate([eos1, eos2]):
+        if tables is None:
+            results.append(eos._cal_g_derivatives(p, temp)[:3])
+        else:
+            results.append(tables[i].cal_g(p, temp, derivatives=True))
+    (g1, g1_p, g1_t), (g2, g2_p, g2_t) = results
+    return g2 - g1 + dg0, g2_p - g1_p, g2_t - g1_t
@@ -0,0 +1,241 @@
+"""
+Error propagation with float arrays, as a fast alternative to running
+uncertainties objects through numpy object arrays.  linear_propagation
+calculates values once with nominal values and standard deviations from
+the derivatives of the same functions.  monte_carlo_propagation
+evaluates the functions for many samples of the parameters at once.
+"""
+import warnings
+from collections import OrderedDict
+import numpy as np
+import uncertainties as uct
+from uncertainties import unumpy as unp
+from .etc import isuncertainties
+
+
+def linear_propagation(f, args, kwargs=None, cov=None, method='complex',
+                       h=None):
+    """
+    calculate value and standard deviation of f(*args) through linear
+    error propagation
+
+    :param f: function to calculate, elementwise for array arguments
+    :param args: list of arguments for f.  Each argument can be a float,
+        ufloat, float array, ufloat array, or OrderedDict of ufloats such as
+        the parameters of the scale classes.
+    :param kwargs: dictionary of keyword arguments for f, without
+        uncertainties
+    :param cov: covariance matrix of scalar ufloats in args, including
+        those in OrderedDicts, in the order they appear.
+        If None, calculated from the ufloats.
+    :param method: 'complex' for complex-step derivatives, which requires
+        f to handle complex numbers, or 'central' for central difference
+    :param h: step for derivatives relative to the argument value.
+        Default is 1.e-20 for 'complex' and 1.e-5 for 'central'.
+    :return: value and standard deviation in float arrays
+    :note: elements of array arguments are treated as independent from each
+        other and from the scalar ufloats.  Scalar ufloats without variance
+        are not differentiated.
+    """
+    if kwargs is None:
+        kwargs = {}
+    if h is None:
+        h = 1.e-20 if method == 'complex' else 1.e-5
+    args_n, locs, params, stds = cal_nominal_args(args)
+    if cov is None:
+        cov = np.asarray(uct.covariance_matrix(params)) if len(params) != 0 \
+            else np.zeros((0, 0))
+    cov = np.asarray(cov, dtype=float)
+    value = np.asarray(f(*args_n, **kwargs), dtype=float)
+    var = np.zeros(value.shape)
+    active = [j for j in range(len(locs)) if np.any(cov[j] != 0.)]
+    if len(active) != 0:
+        jac = np.array([np.broadcast_to(
+            cal_derivative(f, args_n, kwargs, locs[j], method, h),
+            value.shape) for j in active])
+        var = var + np.einsum('i...,ij,j...->...', jac,
+                              cov[np.ix_(active, active)], jac)
+    for i, std in stds:
+        d = cal_derivative(f, args_n, kwargs, (i, None), method, h)
+        var = var + np.power(d * std, 2.)
+    return value, np.sqrt(var)
+
+
+def cal_derivative(f, args, kwargs, loc, method='complex', h=1.e-20):
+    """
+    calculate derivative of f(*args) with respect to one argument
+
+    :param f: function to differentiate
+    :param args: list of arguments for f without uncertainties
+    :param kwargs: dictionary of keyword arguments for f
+    :param loc: (index of argument, key of OrderedDict or None)
+    :param method: 'complex' or 'central'
+    :param h: step relative to the argument value
+    :return: derivative, elementwise for an array argument
+    :note: internal function
+    """
+    i, key = loc
+    x = args[i] if key is None else args[i][key]
+    step = h * np.maximum(np.abs(x), 1.)
+
+    def f_shift(dx):
+        args_s = list(args)
+        if key is None:
+            args_s[i] = x + dx
+        else:
+            args_s[i] = OrderedDict(args[i])
+            args_s[i][key] = x + dx
+        return f(*args_s, **kwargs)
+
+    if method == 'complex':
+        return np.imag(f_shift(1.j * step)) / step
+    elif method == 'central':
+        return (f_shift(step) - f_shift(-step)) / (2. * step)
+    raise ValueError('method should be either complex or central.')
+
+
+def monte_carlo_propagation(f, args, kwargs=None, n_samples=1000, cov=None,
+                            correlated=True,
+                            percentiles=(2.275, 15.865, 50., 84.135, 97.725),
+                            chunk_size=None, max_elements=2**22, seed=None,
+                            return_cov=True, return_samples=False):
+    """
+    calculate distribution of f(*args) by Monte Carlo sampling of the
+    arguments with uncertainties.  f is evaluated for a chunk of samples
+    in one call, so it has to broadcast parameters in (k, 1, ...) arrays
+    against array arguments in (k or 1, ...) arrays.
+
+    :param f: function to calculate, elementwise for array arguments
+    :param args: list of arguments for f.  Each argument can be a float,
+        ufloat, float array, ufloat array, or OrderedDict of ufloats such as
+        the parameters of the scale classes.
+    :param kwargs: dictionary of keyword arguments for f, without
+        uncertainties
+    :param n_samples: number of samples, K
+    :param cov: covariance matrix of scalar ufloats in args, including
+        those in OrderedDicts, in the order they appear.
+        If None, calculated from the ufloats.
+    :param correlated: if False, correlations between the scalar ufloats
+        are ignored.  Not used if cov is given.
+    :param percentiles: percentiles to calculate, in %.
+        Default gives median and 1 and 2 sigma ranges.
+    :param chunk_size: number of samples evaluated in one call of f.
+        If None, chosen to keep chunk_size * N below max_elements.
+    :param max_elements: maximum number of elements in a chunk
+    :param seed: seed for random number generator
+    :param return_cov: if True, calculate covariance between all N
+        elements of the result.  This takes N^2 memory.
+    :param return_samples: if True, return all samples in (K, ...) array
+    :return: OrderedDict of mean, std, percentiles in (len(percentiles), ...)
+        array, cov in (N, N) array, n_valid for the number of finite
+        samples, and samples
+    :note: elements of array arguments are sampled independently from each
+        other and from the scalar ufloats.  Non-finite results, such as
+        volumes without a root, are excluded from the statistics.
+        Covariance is calculated only from samples finite for all elements.
+    """
+    if kwargs is None:
+        kwargs = {}
+    rng = np.random.default_rng(seed)
+    args_n, locs, params, stds = cal_nominal_args(args)
+    if cov is None:
+        if len(params) == 0:
+            cov = np.zeros((0, 0))
+        elif correlated:
+            cov = np.asarray(uct.covariance_matrix(params))
+        else:
+            cov = np.diag([uct.std_dev(param) ** 2 for param in params])
+    cov = np.asarray(cov, dtype=float)
+    std_arrays = dict(stds)
+    shape = np.broadcast_shapes(
+        *[np.shape(arg) for arg in args_n
+          if (arg is not None) and not isinstance(arg, dict)])
+    size = int(np.prod(shape))
+    if chunk_size is None:
+        chunk_size = max(1, max_elements // max(size, 1))
+    # all parameter samples are drawn at once, they are small
+    active = [j for j in range(len(locs)) if np.any(cov[j] != 0.)]
+    mean = np.array([uct.nominal_value(params[j]) for j in active])
+    if len(active) != 0:
+        draws = rng.multivariate_normal(
+            mean, cov[np.ix_(active, active)], size=n_samples, method='svd')
+    samples = np.empty((n_samples,) + shape)
+    for start in range(0, n_samples, chunk_size):
+        k = min(chunk_size, n_samples - start)
+        args_s = []
+        for i, arg in enumerate(args_n):
+            if isinstance(arg, dict):
+                args_s.append(OrderedDict(arg))
+            elif arg is None:
+                args_s.append(None)
+            elif i in std_arrays:
+                args_s.append(arg[None] + std_arrays[i][None] *
+                              rng.standard_normal((k,) + np.shape(arg)))
+            else:
+                args_s.append(np.asarray(arg)[None])
+        for n, j in enumerate(active):
+            i, key = locs[j]
+            draw = draws[start:start + k, n].reshape((k,) + (1,) * len(shape))
+            if key is None:
+                args_s[i] = draw
+            else:
+                args_s[i][key] = draw
+        samples[start:start + k] = np.broadcast_to(
+            f(*args_s, **kwargs), (k,) + shape)
+    finite = np.isfinite(samples)
+    result = OrderedDict()
+    with np.errstate(all='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        if finite.all():
+            result['mean'] = samples.mean(axis=0)
+            result['std'] = samples.std(axis=0, ddof=1)
+            result['percentiles'] = np.percentile(samples, percentiles,
+                                                  axis=0)
+        else:
+            result['mean'] = np.nanmean(samples, axis=0)
+            result['std'] = np.nanstd(samples, axis=0, ddof=1)
+            result['percentiles'] = np.nanpercentile(samples, percentiles,
+                                                     axis=0)
+        if return_cov:
+            flat = samples.reshape(n_samples, -1)
+            flat = flat[finite.reshape(n_samples, -1).all(axis=1)]
+            result['cov'] = np.atleast_2d(np.cov(flat, rowvar=False))
+    result['n_valid'] = finite.sum(axis=0)
+    if return_samples:
+        result['samples'] = samples
+    return result
+
+
+def cal_nominal_args(args):
+    """
+    separate nominal values and uncertainties of arguments
+
+    :param args: list of arguments, see linear_propagation
+    :return: list of arguments with nominal values, list of locations of
+        scalar ufloats in (index of argument, key of OrderedDict or None),
+        list of scalar ufloats, and list of (index of argument, standard
+        deviations) for ufloat arrays
+    :note: internal function
+    """
+    args_n = []
+    locs = []
+    params = []
+    stds = []
+    for i, arg in enumerate(args):
+        if isinstance(arg, dict):
+            args_n.append(OrderedDict(
+                (key, uct.nominal_value(value)) for key, value in arg.items()))
+            for key, value in arg.items():
+                if isinstance(value, uct.UFloat):
+                    locs.append((i, key))
+                    params.append(value)
+        elif isinstance(arg, uct.UFloat):
+            args_n.append(arg.nominal_value)
+            locs.append((i, None))
+            params.append(arg)
+        elif isuncertainties([arg]):
+            args_n.append(np.asarray(unp.nominal_values(arg), dtype=float))
+            stds.append((i, np.asarray(unp.std_devs(arg), dtype=float)))
+        else:
+            args_n.append(arg)
+    return args_n, locs, params, stds
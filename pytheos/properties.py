@@ -0,0 +1,416 @@
+"""
+Thermodynamic properties of Mie-Gruneisen EOS, such as bulk moduli,
+thermal expansion, heat capacity, Gruneisen parameter, and free energies.
+Each static, thermal, anharmonic, and electronic component gives its
+pressure, its contribution to the isothermal bulk modulus, dP/dT at
+constant volume, heat capacity, Helmholtz free energy, and entropy
+analytically.  The total properties are combined from them, see
+cal_properties.  Adiabats are integrated
+with these properties, see cal_adiabat.
+"""
+from collections import OrderedDict
+import numpy as np
+import uncertainties as uct
+from scipy.integrate import odeint
+from uncertainties import unumpy as unp
+from .conversion import vol_uc2mol
+from .etc import isuncertainties
+from .eqn_bm3 import cal_p_bm3, cal_dpdv_bm3, cal_e_bm3
+from .eqn_vinet import cal_p_vinet, cal_dpdv_vinet, cal_e_vinet
+from .eqn_kunc import cal_p_kunc, cal_dpdv_kunc, cal_e_kunc
+from .eqn_debye import cal_debye_E, cal_debye_Cv
+from .eqn_therm_constq import constq_grun, constq_debyetemp
+from .eqn_therm_Tange import tange_grun, tange_debyetemp
+from .eqn_therm_Speziale import speziale_grun, speziale_debyetemp
+from .eqn_therm_Dorogokupets2007 import altshuler_grun, altshuler_debyetemp
+
+
+def cal_properties(eos, v, temp):
+    """
+    calculate thermodynamic properties of a Mie-Gruneisen EOS
+
+    :param eos: MGEOS object, such as pytheos.gold.Fei2007bm3()
+    :param v: unit-cell volume in A^3
+    :param temp: temperature in K
+    :return: OrderedDict of p (pressure in GPa), k_t (isothermal bulk
+        modulus in GPa), k_s (adiabatic bulk modulus in GPa), alpha
+        (thermal expansion in K-1), c_v (heat capacity at constant volume
+        in J/mol/K for a formula unit), gamma (thermodynamic Gruneisen
+        parameter, alpha K_T V / C_V), f (Helmholtz free energy in J/mol),
+        s (entropy in J/mol/K), and g (Gibbs free energy in J/mol)
+    :note: nominal values of v, temp, and the parameters are used.
+        c_v is the sum of the thermal, anharmonic, and electronic
+        components which have heat capacity.  The alphakt equation has
+        no heat capacity, so gamma and k_s are not finite if no other
+        component gives heat capacity.
+    :note: free energies are relative to the static energy at v0 and the
+        thermal energies at t_ref, F = E_st(V) + F_th(V, T) -
+        F_th(V, t_ref) + F_anh + F_el.  Entropy is absolute for the
+        quasi-harmonic component, so that free energies of two phases
+        differ only by a constant at the reference.
+    """
+    if isuncertainties([v, temp]):
+        v, temp = unp.nominal_values(v), unp.nominal_values(temp)
+    v, temp = np.broadcast_arrays(np.asarray(v, dtype=float),
+                                  np.asarray(temp, dtype=float))
+    v_mol = vol_uc2mol(v, eos.z)
+    args = (eos.n, eos.z, eos.t_ref, eos.three_r)
+    components = [cal_static_terms(v, eos.eqn_st, _get_values(eos.params_st),
+                                   eos.z)]
+    for funcs, eqn, params in [(func_th, eos.eqn_th, eos.params_th),
+                               (func_anh, eos.eqn_anh, eos.params_anh),
+                               (func_el, eos.eqn_el, eos.params_el)]:
+        if (eqn is not None) and (params is not None):
+            components.append(
+                funcs[eqn](v, temp, _get_values(params), *args))
+    # components without temperature dependence give scalar zeros
+    p, k_t, dpdt, c_v, f, s = [np.zeros(v.shape) + sum(terms)
+                               for terms in zip(*components)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = dpdt / k_t
+        # dP/dT in Pa/K times molar volume gives J/mol/K
+        gamma = dpdt * 1.e9 * v_mol / c_v
+    result = OrderedDict()
+    result['p'] = p
+    result['k_t'] = k_t
+    # K_S = K_T (1 + alpha gamma T), which is K_T without thermal pressure
+    result['k_s'] = np.where(dpdt == 0., k_t,
+                             k_t * (1. + alpha * gamma * temp))
+    result['alpha'] = alpha
+    result['c_v'] = c_v
+    result['gamma'] = gamma
+    result['f'] = f
+    result['s'] = s
+    result['g'] = f + p * 1.e9 * v_mol
+    return result
+
+
+def cal_adiabat(eos, p, temp0, p0=0., rtol=1.e-8, atol=1.e-10):
+    """
+    calculate volume and temperature along adiabats of an MGEOS for many
+    starting temperatures through a single integration
+
+    :param eos: MGEOS object, such as pytheos.periclase.Tange2009()
+    :param p: pressures in GPa to calculate volume and temperature at
+    :param temp0: temperatures in K at p0, such as potential temperatures
+    :param p0: pressure in GPa where the adiabats start
+    :param rtol: relative tolerance for odeint
+    :param atol: absolute tolerance for odeint in ln(V) and ln(T)
+    :return: unit-cell volume in A^3 and temperature in K, each in
+        temp0.shape + p.shape array.  T(V) is given by the pairs.
+    :note: ln(V) and ln(T) of all adiabats are one ODE system in pressure,
+        d ln(V)/dP = -1 / K_S and d ln(T)/dP = gamma / K_S, whose right
+        hand side is cal_properties on all adiabats at once.  Unique
+        pressures are sorted and integrated upward from p0 for
+        compression and downward for decompression.
+        Nominal values are used.
+    """
+    if isuncertainties([p, temp0, p0]):
+        p, temp0 = unp.nominal_values(p), unp.nominal_values(temp0)
+        p0 = uct.nominal_value(p0)
+    p = np.asarray(p, dtype=float)
+    temp0 = np.asarray(temp0, dtype=float)
+    v0 = eos.cal_v(np.full(temp0.shape, p0), temp0)
+    y0 = np.log(np.concatenate([v0.ravel(), temp0.ravel()]))
+    n = temp0.size
+    v = np.full((n,) + p.shape, np.nan)
+    temp = np.full((n,) + p.shape, np.nan)
+    v[:, p == p0], temp[:, p == p0] = v0.reshape(-1, 1), \
+        temp0.reshape(-1, 1)
+
+    def f_dy(y, p):
+        prop = cal_properties(eos, np.exp(y[:n]), np.exp(y[n:]))
+        return np.concatenate([-1. / prop['k_s'],
+                               prop['gamma'] / prop['k_s']])
+
+    for side in [p > p0, p < p0]:
+        if not np.any(side):
+            continue
+        p_u, inverse = np.unique(p[side], return_inverse=True)
+        if p_u[0] < p0:
+            p_u, inverse = p_u[::-1], p_u.size - 1 - inverse
+        y = odeint(f_dy, y0, np.append(p0, p_u), rtol=rtol, atol=atol)[1:]
+        v[:, side] = np.exp(y[:, :n]).T[:, inverse.ravel()]
+        temp[:, side] = np.exp(y[:, n:]).T[:, inverse.ravel()]
+    return v.reshape(temp0.shape + p.shape), \
+        temp.reshape(temp0.shape + p.shape)
+
+
+def cal_static_terms(v, eqn_st, params, z):
+    """
+    calculate static pressure, bulk modulus, and energy
+
+    :param v: unit-cell volume in A^3
+    :param eqn_st: 'bm3', 'vinet', or 'kunc'
+    :param params: [v0, k0, k0p] and order for kunc
+    :param z: number of formula unit in a unit cell
+    :return: pressure, bulk modulus, dP/dT, heat capacity, Helmholtz free
+        energy in J/mol, and entropy.  dP/dT, heat capacity, and entropy
+        are zero.
+    :note: internal function.  Energy is the static pressure integrated
+        from v0 analytically.
+    """
+    if eqn_st == 'bm3':
+        p = cal_p_bm3(v, params)
+        dpdv = cal_dpdv_bm3(v, params)
+        e = cal_e_bm3(v, params)
+    elif eqn_st == 'vinet':
+        p = cal_p_vinet(v, params, uncertainties=False)
+        dpdv = cal_dpdv_vinet(v, params)
+        e = cal_e_vinet(v, params)
+    elif eqn_st == 'kunc':
+        order = params[3] if len(params) > 3 else 5
+        p = cal_p_kunc(v, params, order=order, uncertainties=False)
+        dpdv = cal_dpdv_kunc(v, params, order=order)
+        e = cal_e_kunc(v, params, order=order)
+    else:
+        raise ValueError('Unknown static equation: ' + str(eqn_st))
+    # GPa A^3 in a unit cell to J/mol
+    return p, -v * dpdv, 0., 0., vol_uc2mol(e, z) * 1.e9, 0.
+
+
+def cal_quasiharmonic_terms(v, temp, gamma, q, thetas, weights, n, z,
+                            t_ref, three_r, einstein=False):
+    """
+    calculate thermal pressure, bulk modulus, dP/dT, heat capacity,
+    free energy, and entropy for quasi-harmonic energy of Debye or
+    Einstein oscillators, P_th = gamma / V (E(T) - E(t_ref))
+
+    :param v: unit-cell volume in A^3
+    :param temp: temperature in K
+    :param gamma: Gruneisen parameter at v
+    :param q: logarithmic volume derivative of gamma at v
+    :param thetas: list of characteristic temperatures at v
+    :param weights: list of fractions of oscillators for thetas
+    :param n: number of atoms in a formula unit
+    :param z: number of formula unit in a unit cell
+    :param t_ref: reference temperature
+    :param three_r: 3R in case adjustment is needed
+    :param einstein: if True, Einstein oscillators, otherwise Debye
+    :return: pressure in GPa, bulk modulus in GPa, dP/dT in GPa/K,
+        heat capacity in J/mol/K, Helmholtz free energy in J/mol, and
+        entropy in J/mol/K
+    :note: internal function.  Energy is T f(theta / T) for both, so
+        dE/dV at constant T is -gamma / V (E - T C_V).  Free energy is
+        F(T) - F(t_ref) at the same volume, whose volume derivative gives
+        the thermal pressure.
+    """
+    v_mol = vol_uc2mol(v, z)
+    d_e, d_tc, c_v, d_f, s = 0., 0., 0., 0., 0.
+    for theta, weight in zip(thetas, weights):
+        e, cv, f, st = _cal_thermal(theta, temp, einstein)
+        if t_ref == 0.:
+            e_ref, cv_ref, f_ref = 0., 0., 0.
+        else:
+            e_ref, cv_ref, f_ref = _cal_thermal(theta, t_ref,
+                                                einstein)[:3]
+        d_e = d_e + weight * (e - e_ref)
+        d_tc = d_tc + weight * (temp * cv - t_ref * cv_ref)
+        c_v = c_v + weight * cv
+        d_f = d_f + weight * (f - f_ref)
+        s = s + weight * st
+    d_e, d_tc, c_v, d_f, s = [three_r * n * x
+                              for x in [d_e, d_tc, c_v, d_f, s]]
+    p = gamma / v_mol * d_e * 1.e-9
+    k = gamma / v_mol * ((1. - q) * d_e + gamma * (d_e - d_tc)) * 1.e-9
+    dpdt = gamma / v_mol * c_v * 1.e-9
+    return p, k, dpdt, c_v, d_f, s
+
+
+def _cal_thermal(theta, temp, einstein):
+    """
+    calculate energy, heat capacity, Helmholtz free energy, and entropy
+    of oscillators in the unit of 3nR
+
+    :param theta: characteristic temperature in K
+    :param temp: temperature in K
+    :param einstein: if True, Einstein oscillators, otherwise Debye
+    :return: energy in 3nR K, heat capacity in 3nR, free energy in 3nR K,
+        and entropy in 3nR
+    :note: internal function.  For Debye, debye_E is shared by all.
+        Zero-point energy is not included.
+    """
+    x = theta / temp
+    # with exp(-x), which does not overflow at low temperature
+    emx = np.exp(-x)
+    omx = -np.expm1(-x)
+    log_omx = np.log(omx)
+    if einstein:
+        return theta * emx / omx, x * x * emx / (omx * omx), \
+            temp * log_omx, x * emx / omx - log_omx
+    debye = cal_debye_E(x)
+    return temp * debye, cal_debye_Cv(x, debye=debye), \
+        temp * (log_omx - debye / 3.), 4. / 3. * debye - log_omx
+
+
+def cal_constq_terms(v, temp, params, n, z, t_ref, three_r):
+    """
+    calculate terms for the constq equation, see cal_quasiharmonic_terms
+
+    :param params: [v0, gamma0, q, theta0]
+    :note: internal function
+    """
+    v0, gamma0, q, theta0 = params
+    gamma = constq_grun(v, v0, gamma0, q)
+    theta = constq_debyetemp(v, v0, gamma0, q, theta0)
+    return cal_quasiharmonic_terms(v, temp, gamma, q, [theta], [1.],
+                                   n, z, t_ref, three_r)
+
+
+def cal_tange_terms(v, temp, params, n, z, t_ref, three_r):
+    """
+    calculate terms for the Tange equation, see cal_quasiharmonic_terms
+
+    :param params: [v0, gamma0, a, b, theta0]
+    :note: internal function
+    """
+    v0, gamma0, a, b, theta0 = params
+    gamma = tange_grun(v, v0, gamma0, a, b)
+    theta = tange_debyetemp(v, v0, gamma0, a, b, theta0)
+    q = gamma0 * a * b * np.power(v / v0, b) / gamma
+    return cal_quasiharmonic_terms(v, temp, gamma, q, [theta], [1.],
+                                   n, z, t_ref, three_r)
+
+
+def cal_speziale_terms(v, temp, params, n, z, t_ref, three_r):
+    """
+    calculate terms for the Speziale equation, see cal_quasiharmonic_terms
+
+    :param params: [v0, gamma0, q0, q1, theta0]
+    :note: internal function
+    """
+    v0, gamma0, q0, q1, theta0 = params
+    gamma = speziale_grun(v, v0, gamma0, q0, q1)
+    theta = speziale_debyetemp(v, v0, gamma0, q0, q1, theta0)
+    q = q0 * np.power(v / v0, q1)
+    return cal_quasiharmonic_terms(v, temp, gamma, q, [theta], [1.],
+                                   n, z, t_ref, three_r)
+
+
+def cal_dorogokupets2007_terms(v, temp, params, n, z, t_ref, three_r):
+    """
+    calculate terms for the Dorogokupets 2007 equation,
+    see cal_quasiharmonic_terms
+
+    :param params: [v0, gamma0, gamma_inf, beta, theta0]
+    :note: internal function
+    """
+    v0, gamma0, gamma_inf, beta, theta0 = params
+    gamma = altshuler_grun(v, v0, gamma0, gamma_inf, beta)
+    theta = altshuler_debyetemp(v, v0, gamma0, gamma_inf, beta, theta0)
+    q = _cal_altshuler_q(v, v0, gamma0, gamma_inf, beta, gamma)
+    return cal_quasiharmonic_terms(v, temp, gamma, q, [theta], [1.],
+                                   n, z, t_ref, three_r)
+
+
+def cal_dorogokupets2015_terms(v, temp, params, n, z, t_ref, three_r):
+    """
+    calculate terms for the Dorogokupets 2015 equation with two Einstein
+    temperatures, see cal_quasiharmonic_terms
+
+    :param params: [v0, gamma0, gamma_inf, beta, theta01, m1, theta02, m2]
+    :note: internal function
+    """
+    v0, gamma0, gamma_inf, beta, theta01, m1, theta02, m2 = params
+    gamma = altshuler_grun(v, v0, gamma0, gamma_inf, beta)
+    thetas = [altshuler_debyetemp(v, v0, gamma0, gamma_inf, beta, theta0)
+              for theta0 in [theta01, theta02]]
+    q = _cal_altshuler_q(v, v0, gamma0, gamma_inf, beta, gamma)
+    return cal_quasiharmonic_terms(
+        v, temp, gamma, q, thetas, [m1 / (m1 + m2), m2 / (m1 + m2)],
+        n, z, t_ref, three_r, einstein=True)
+
+
+def _cal_altshuler_q(v, v0, gamma0, gamma_inf, beta, gamma):
+    """
+    calculate logarithmic volume derivative of the Altshuler Gruneisen
+    parameter
+
+    :note: internal function
+    """
+    return beta * (gamma0 - gamma_inf) * np.power(v / v0, beta) / gamma
+
+
+def cal_alphakt_terms(v, temp, params, n, z, t_ref, three_r):
+    """
+    calculate terms for thermal pressure from thermal expansion and bulk
+    modulus, which does not change with volume and has no heat capacity.
+    Free energy is -P_th V.
+
+    :param params: [v0, alpha0, k0]
+    :note: internal function
+    """
+    v0, alpha0, k0 = params
+    dpdt = alpha0 * k0 * np.ones_like(v)
+    return _add_pv_energy(v, z, dpdt * (temp - t_ref), 0., dpdt, 0.)
+
+
+def cal_zharkov_terms(v, temp, params, n, z, t_ref, three_r):
+    """
+    calculate terms for the Zharkov anharmonic and electronic equations.
+    Free energy is -3nR / 2 a0 x^m (T^2 - t_ref^2), so P is proportional
+    to x^m / V, and C_V and S are 3nR a0 x^m T.
+
+    :param params: [v0, a0, m] or [v0, e0, g]
+    :note: internal function
+    """
+    v0, a0, m = params
+    v_mol = vol_uc2mol(v, z)
+    a = a0 * np.power(v / v0, m)
+    c_v = three_r * n * a * temp
+    p = three_r * n / 2. * a * m / v_mol * \
+        (temp * temp - t_ref * t_ref) * 1.e-9
+    dpdt = c_v * m / v_mol * 1.e-9
+    f = -three_r * n / 2. * a * (temp * temp - t_ref * t_ref)
+    return p, (1. - m) * p, dpdt, c_v, f, c_v
+
+
+def cal_tsuchiya_terms(v, temp, params, n, z, t_ref, three_r):
+    """
+    calculate terms for the Tsuchiya electronic equation, which does not
+    change with volume.  Free energy is -P_el V, so S is dP_el/dT V and
+    C_V is T d^2P_el/dT^2 V.
+
+    :param params: [v0, a, b, c, d]
+    :note: internal function
+    """
+    v0, a, b, c, d = params
+    p = b * (temp - t_ref) + c * (temp ** 2 - t_ref ** 2) + \
+        d * (temp ** 3 - t_ref ** 3)
+    dpdt = b + 2. * c * temp + 3. * d * temp ** 2
+    c_v = temp * (2. * c + 6. * d * temp) * vol_uc2mol(v, z) * 1.e9
+    return _add_pv_energy(v, z, p, 0., dpdt, c_v)
+
+
+def _add_pv_energy(v, z, p, k, dpdt, c_v):
+    """
+    add free energy and entropy to terms of a pressure which does not
+    change with volume, F = -P V and S = dP/dT V
+
+    :param v: unit-cell volume in A^3
+    :param z: number of formula unit in a unit cell
+    :return: p, k, dpdt, c_v, free energy in J/mol, and entropy in J/mol/K
+    :note: internal function
+    """
+    v_mol = vol_uc2mol(v, z) * 1.e9
+    return p, k, dpdt, c_v, -p * v_mol, dpdt * v_mol
+
+
+def _get_values(params):
+    """
+    get nominal values of parameters in an OrderedDict
+
+    :param params: parameters in OrderedDict
+    :return: list of nominal values
+    :note: internal function
+    """
+    return [uct.nominal_value(value) for value in params.values()]
+
+
+func_th = {'constq': cal_constq_terms, 'tange': cal_tange_terms,
+           'speziale': cal_speziale_terms,
+           'dorogokupets2007': cal_dorogokupets2007_terms,
+           'dorogokupets2015': cal_dorogokupets2015_terms,
+           'alphakt': cal_alphakt_terms}
+func_anh = {'zharkov': cal_zharkov_terms}
+func_el = {'zharkov': cal_zharkov_terms, 'tsuchiya': cal_tsuchiya_terms}
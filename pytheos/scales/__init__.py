@@ -1,13 +1,35 @@
 """Convenience exports for pressure scale definitions."""
 
-from . import gold, neon, objs, periclase, platinum, sodium_chloride, sodium_chloride_b2
+import importlib
 
 __all__ = [
+    "convert",
     "gold",
     "neon",
     "objs",
     "periclase",
     "platinum",
+    "registry",
     "sodium_chloride",
     "sodium_chloride_b2",
+    "table",
+    "get_scale",
+    "list_scales",
 ]
+
+
+def __getattr__(name):
+    """Import scale modules on the first access."""
+    if name in ("get_scale", "list_scales"):
+        value = getattr(importlib.import_module(".registry", __name__), name)
+    elif name in __all__:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError(
+            "module 'pytheos.scales' has no attribute '" + name + "'")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + __all__)
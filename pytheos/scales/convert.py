@@ -0,0 +1,172 @@
+"""
+Conversion of pressure between scales.  Volume of the standard is
+calculated from pressure in one scale and then pressure in another
+scale is calculated from the volume, for all data points at once.
+"""
+import numpy as np
+from scipy.interpolate import RectBivariateSpline
+import uncertainties as uct
+from uncertainties import unumpy as unp
+from ..etc import isuncertainties
+from .objs import JHEOS
+from .registry import get_scale
+
+
+def convert_pressure(p, temp, from_scale, to_scale, min_strain=None,
+                     max_strain=None, table=None):
+    """
+    convert pressure from one scale to another scale of the same standard
+
+    :param p: pressure in GPa in from_scale
+    :param temp: temperature in K
+    :param from_scale: scale object in which p is, such as
+        pytheos.gold.Tsuchiya2003(), or its key such as 'gold/Tsuchiya2003'
+    :param to_scale: scale object or key to convert p to
+    :param min_strain: minimum strain searched for volume root.
+        If None, default of from_scale.cal_v is used.
+    :param max_strain: maximum strain searched for volume root.
+        If None, default of from_scale.cal_v is used.
+    :param table: PVTTable of from_scale, see MGEOS.tabulate.  If given,
+        volume is interpolated from the table instead of root finding.
+    :return: pressure in GPa in to_scale
+    :note: nominal values of the scale parameters are used.  If p or temp
+        has uncertainties, they are propagated linearly, through the
+        slopes of the isochore of the standard.
+    :note: ValueError is raised if the scales are not for the same
+        standard, see check_standard.
+    """
+    if isinstance(from_scale, str):
+        from_scale = get_scale(from_scale)
+    if isinstance(to_scale, str):
+        to_scale = get_scale(to_scale)
+    check_standard(from_scale, to_scale)
+    p_n = np.asarray(unp.nominal_values(p), dtype=float)
+    t_n = np.asarray(unp.nominal_values(temp), dtype=float)
+    kwargs = {}
+    if min_strain is not None:
+        kwargs['min_strain'] = min_strain
+    if max_strain is not None:
+        kwargs['max_strain'] = max_strain
+    if table is None:
+        v = from_scale.cal_v(p_n, t_n, **kwargs)
+    else:
+        v = table.cal_v(p_n, t_n)
+    p_new = to_scale.cal_p(v, np.broadcast_to(t_n, v.shape), nominal=True)
+    if not isuncertainties([p, temp]):
+        return p_new
+    dpdv_from, dpdt_from = cal_dpdv_dpdt(from_scale, v, t_n)
+    dpdv_to, dpdt_to = cal_dpdv_dpdt(to_scale, v, t_n)
+    # dP_to/dP_from at constant T and dP_to/dT at constant P_from
+    k_p = dpdv_to / dpdv_from
+    k_t = dpdt_to - k_p * dpdt_from
+    return p_new + k_p * (p - p_n) + k_t * (temp - t_n)
+
+
+def check_standard(from_scale, to_scale, rtol=1.e-3):
+    """
+    check if two scales are for the same standard
+
+    :param from_scale: scale object
+    :param to_scale: scale object
+    :param rtol: relative tolerance for v0.  v0 of some scales differs by
+        less than 0.1 % because it is calculated from the density in the
+        reference.
+    :return: None
+    :note: ValueError is raised if the scale classes are from different
+        material modules or their v0 differ
+    """
+    module_from = type(from_scale).__module__
+    module_to = type(to_scale).__module__
+    if module_from != module_to:
+        raise ValueError('Scales are for different standards, ' +
+                         module_from.split('.')[-1] + ' and ' +
+                         module_to.split('.')[-1] + '.')
+    v0_from, v0_to = _get_v0(from_scale), _get_v0(to_scale)
+    if not np.isclose(v0_from, v0_to, rtol=rtol, atol=0.):
+        raise ValueError('v0 of the scales differ, {0:.5g} and {1:.5g} '
+                         'A^3.'.format(v0_from, v0_to))
+
+
+def _get_v0(scale):
+    """
+    get nominal v0 of a scale
+
+    :param scale: MGEOS or JHEOS object
+    :return: unit-cell volume in A^3 at 1 bar
+    :note: internal function
+    """
+    if isinstance(scale, JHEOS):
+        return uct.nominal_value(scale.params_therm['v0'])
+    return uct.nominal_value(scale.params_st['v0'])
+
+
+def cal_dpdv_dpdt(scale, v, temp, h=1.e-6):
+    """
+    calculate dP/dV and dP/dT of a scale using central difference
+
+    :param scale: scale object
+    :param v: unit-cell volume in A^3, float array
+    :param temp: temperature in K, float array
+    :param h: step relative to volume and temperature
+    :return: dP/dV in GPa/A^3 and dP/dT in GPa/K
+    :note: internal function
+    """
+    v, temp = np.broadcast_arrays(v, temp)
+    dv, dt = h * v, h * temp
+    dpdv = (scale.cal_p(v + dv, temp, nominal=True) -
+            scale.cal_p(v - dv, temp, nominal=True)) / (2. * dv)
+    dpdt = (scale.cal_p(v, temp + dt, nominal=True) -
+            scale.cal_p(v, temp - dt, nominal=True)) / (2. * dt)
+    return dpdv, dpdt
+
+
+class ConversionMap(object):
+    """
+    Pressure conversion precomputed on a regular grid of pressure and
+    temperature and interpolated with bicubic splines
+    """
+
+    def __init__(self, from_scale, to_scale, p_range, t_range, n_p=256,
+                 n_t=64, **kwargs):
+        """
+        :param from_scale: scale object or key in which pressures are given
+        :param to_scale: scale object or key to convert pressures to
+        :param p_range: minimum and maximum pressures in GPa in from_scale
+        :param t_range: minimum and maximum temperatures in K
+        :param n_p: number of grid pressures
+        :param n_t: number of grid temperatures
+        :param kwargs: options for convert_pressure
+        :note: ValueError is raised if the scales are not for the same
+            standard, see check_standard
+        :note: max_error gives the error estimated at the centers of the
+            grid cells
+        """
+        self.p = np.linspace(p_range[0], p_range[1], n_p)
+        self.temp = np.linspace(t_range[0], t_range[1], n_t)
+        pp, tt = np.meshgrid(self.p, self.temp, indexing='ij')
+        self.p_new = convert_pressure(pp, tt, from_scale, to_scale, **kwargs)
+        if not np.all(np.isfinite(self.p_new)):
+            raise ValueError('Conversion failed in the map.  Narrow the '
+                             'pressure and temperature ranges.')
+        self.spline = RectBivariateSpline(self.p, self.temp, self.p_new)
+        p_c = 0.5 * (pp[1:, 1:] + pp[:-1, :-1])
+        t_c = 0.5 * (tt[1:, 1:] + tt[:-1, :-1])
+        self.max_error = np.abs(
+            self.cal_p(p_c, t_c) -
+            convert_pressure(p_c, t_c, from_scale, to_scale, **kwargs)).max()
+
+    def cal_p(self, p, temp):
+        """
+        convert pressure using the map
+
+        :param p: pressure in GPa in from_scale
+        :param temp: temperature in K
+        :return: pressure in GPa in to_scale, nan out of the map
+        :note: cannot handle uncertainties
+        """
+        p, temp = np.broadcast_arrays(np.asarray(p, dtype=float),
+                                      np.asarray(temp, dtype=float))
+        p_new = self.spline.ev(p, temp)
+        inside = (p >= self.p[0]) & (p <= self.p[-1]) & \
+            (temp >= self.temp[0]) & (temp <= self.temp[-1])
+        return np.where(inside, p_new, np.nan)
@@ -21,6 +21,9 @@ class Jamieson1982L(JHEOS):
     Fit C in table 2.
     """
 
+    reference = ('Jamieson et al. 1982. High pressure research in '
+                 'geophysics. Fit C in table 2.')
+
     def __init__(self, v0=v_ref):
         mass_shock = mass * 1.e3  # to mass in g
         three_r = 0.12500 / (3. * n * constants.R / mass_shock) *\
@@ -35,9 +38,8 @@ class Jamieson1982L(JHEOS):
                                     ('gamma0', uct.ufloat(3.215, 0.0)),
                                     ('q', uct.ufloat(1.0, 0.0)),
                                     ('theta0', uct.ufloat(170., 0.0))])
-        reference = 'Jamieson et al. 1982. High pressure research in geophysics. Fit C in table 2.'
         JHEOS.__init__(self, n, z, mass_shock, params_hugoniot, params_therm,
-                       three_r=three_r, reference=reference, nonlinear=True)
+                       three_r=three_r, nonlinear=True)
 
 
 class Jamieson1982H(JHEOS):
@@ -46,6 +48,9 @@ class Jamieson1982H(JHEOS):
     Fit A in table 2.
     """
 
+    reference = ('Jamieson et al. 1982. High pressure research in '
+                 'geophysics. Fit A in table 2.')
+
     def __init__(self, v0=v_ref):
         mass_shock = mass * 1.e3  # to mass in g
         three_r = 0.12500 / (3. * n * constants.R / mass_shock) *\
@@ -59,9 +64,8 @@ class Jamieson1982H(JHEOS):
                                     ('gamma0', uct.ufloat(3.215, 0.0)),
                                     ('q', uct.ufloat(1.0, 0.0)),
                                     ('theta0', uct.ufloat(170., 0.0))])
-        reference = 'Jamieson et al. 1982. High pressure research in geophysics. Fit A in table 2.'
         JHEOS.__init__(self, n, z, mass_shock, params_hugoniot, params_therm,
-                       three_r=three_r, reference=reference)
+                       three_r=three_r)
 
 
 class Heinz1984(MGEOS):
@@ -69,6 +73,10 @@ class Heinz1984(MGEOS):
     Heinz and Jeanloz. 1984. JAP 55, 885+
     """
 
+    reference = 'Heinz and Jeanloz. 1984. JAP 55, 885+'
+    eqn_st = 'bm3'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(166.65, 5.0)),
@@ -77,9 +85,7 @@ class Heinz1984(MGEOS):
                                  ('gamma0', uct.ufloat(2.95, 0.43)),
                                  ('q', uct.ufloat(1.7, 0.7)),
                                  ('theta0', uct.ufloat(170., 0.0))])
-        reference = 'Heinz and Jeanloz. 1984. JAP 55, 885+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='bm3', eqn_th='constq', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Tsuchiya2003(MGEOS):
@@ -93,6 +99,10 @@ class Tsuchiya2003(MGEOS):
     the table value down to the first number after decimal point.
     """
 
+    reference = 'Tsuchiya 2003 JGR 108. 2462+'
+    eqn_st = 'vinet'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref, reproduce_table=False):
         if reproduce_table:
             k0 = 166.1
@@ -107,9 +117,7 @@ class Tsuchiya2003(MGEOS):
                                  ('gamma0', uct.ufloat(3.16, 0.0)),
                                  ('q', uct.ufloat(2.15, 0.0)),
                                  ('theta0', uct.ufloat(180., 0.0))])
-        reference = 'Tsuchiya 2003 JGR 108. 2462+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='vinet', eqn_th='constq', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Fei2007vinet(MGEOS):
@@ -117,6 +125,10 @@ class Fei2007vinet(MGEOS):
     Fei et al. 2007 PNAS 104, 9182+
     """
 
+    reference = 'Fei et al. 2007 PNAS 104, 9182+'
+    eqn_st = 'vinet'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(167., 0.0)),
@@ -125,9 +137,7 @@ class Fei2007vinet(MGEOS):
                                  ('gamma0', uct.ufloat(2.97, 0.03)),
                                  ('q', uct.ufloat(0.6, 0.3)),
                                  ('theta0', uct.ufloat(170., 0.0))])
-        reference = 'Fei et al. 2007 PNAS 104, 9182+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='vinet', eqn_th='constq', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Fei2007bm3(MGEOS):
@@ -135,6 +145,10 @@ class Fei2007bm3(MGEOS):
     Fei et al. 2007 PNAS 104, 9182+
     """
 
+    reference = 'Fei et al. 2007 PNAS 104, 9182+'
+    eqn_st = 'bm3'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(167., 0.0)),
@@ -143,9 +157,7 @@ class Fei2007bm3(MGEOS):
                                  ('gamma0', uct.ufloat(2.97, 0.03)),
                                  ('q', uct.ufloat(0.6, 0.3)),
                                  ('theta0', uct.ufloat(170., 0.0))])
-        reference = 'Fei et al. 2007 PNAS 104, 9182+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='bm3', eqn_th='constq', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Fei2004(MGEOS):
@@ -153,6 +165,10 @@ class Fei2004(MGEOS):
     Fei et al. 2004 PEPI 143-144, 515+
     """
 
+    reference = 'Fei et al. 2004 PEPI 143-144, 515+'
+    eqn_st = 'bm3'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(167., 3.0)),
@@ -161,11 +177,9 @@ class Fei2004(MGEOS):
                                  ('gamma0', uct.ufloat(2.97, 0.03)),
                                  ('q', uct.ufloat(0.7, 0.3)),
                                  ('theta0', uct.ufloat(170., 0.0))])
-        reference = 'Fei et al. 2004 PEPI 143-144, 515+'
         three_r = 0.125 / 0.12664 * 3. * constants.R
 
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='bm3', eqn_th='constq', reference=reference,
                        three_r=three_r)
 
 
@@ -174,6 +188,10 @@ class Shim2002(MGEOS):
     Shim et al 2002 EPSL 203, 729+
     """
 
+    reference = 'Shim et al 2002 EPSL 203, 729+'
+    eqn_st = 'bm3'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(167., 3.0)),
@@ -182,10 +200,8 @@ class Shim2002(MGEOS):
                                  ('gamma0', uct.ufloat(2.97, 0.05)),
                                  ('q', uct.ufloat(1.0, 0.1)),
                                  ('theta0', uct.ufloat(170., 0.0))])
-        reference = 'Shim et al 2002 EPSL 203, 729+'
         three_r = 0.125 / 0.12664 * 3. * constants.R
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='bm3', eqn_th='constq', reference=reference,
                        three_r=three_r)
 
 
@@ -194,13 +210,16 @@ class Dorfman2012(MGEOS):
     Dorfman et al. 2012, JGR 117, B08210
     """
 
+    reference = 'Dorfman et al. 2012, JGR 117, B08210'
+    eqn_st = 'vinet'
+    p_range = (0., 250.)
+    t_range = (300., 300.)
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(167., 0.0)),
                                  ('k0p', uct.ufloat(5.88, 0.02))])
-        reference = 'Dorfman et al. 2012, JGR 117, B08210'
-        MGEOS.__init__(self, n, z, params_st=params_st,
-                       eqn_st='vinet', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st)
 
 
 class Ye2017(MGEOS):
@@ -208,13 +227,16 @@ class Ye2017(MGEOS):
     Ye et al. 2017. JGR 10.1002/2016JB013811
     """
 
+    reference = 'Ye et al. 2017. JGR 10.1002/2016JB013811'
+    eqn_st = 'vinet'
+    p_range = (0., 140.)
+    t_range = (300., 300.)
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(167., 0.0)),
                                  ('k0p', uct.ufloat(5.897, 0.022))])
-        reference = 'Ye et al. 2017. JGR 10.1002/2016JB013811'
-        MGEOS.__init__(self, n, z, params_st=params_st,
-                       eqn_st='vinet', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st)
 
 
 class Yokoo2009(MGEOS):
@@ -224,6 +246,11 @@ class Yokoo2009(MGEOS):
     I use k0p=5.749.
     """
 
+    reference = 'Yokoo et al. 2009. PRB 80, 104114'
+    eqn_st = 'bm3'
+    eqn_th = 'tange'
+    eqn_el = 'tsuchiya'
+
     def __init__(self, v0=v_ref, reproduce_table=False):
         if reproduce_table:
             k0p = 5.749
@@ -242,11 +269,8 @@ class Yokoo2009(MGEOS):
                                  ('b', uct.ufloat(-4.3795e-6, 0.0)),
                                  ('c', uct.ufloat(1.4526e-8, 0.0)),
                                  ('d', uct.ufloat(7.8072e-14, 0.0))])
-        reference = 'Yokoo et al. 2009. PRB 80, 104114'
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       params_el=params_el,
-                       eqn_st='bm3', eqn_th='tange', eqn_el='tsuchiya',
-                       reference=reference)
+                       params_el=params_el)
 
 
 class Dorogokupets2007(MGEOS):
@@ -254,6 +278,12 @@ class Dorogokupets2007(MGEOS):
     Dorogokupets and Dewaele. 2007. HPR 27, 431+
     """
 
+    reference = 'Dorogokupets and Dewaele. 2007. HPR 27, 431+'
+    eqn_st = 'vinet'
+    eqn_th = 'dorogokupets2007'
+    eqn_anh = 'zharkov'
+    eqn_el = 'zharkov'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(167.0, 0.0)),
@@ -269,12 +299,8 @@ class Dorogokupets2007(MGEOS):
         params_el = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('e0', uct.ufloat(0.e-6, 0.0)),
                                  ('g', uct.ufloat(0.0, 0.0))])
-        reference = 'Dorogokupets and Dewaele. 2007. HPR 27, 431+'
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       params_anh=params_anh, params_el=params_el,
-                       eqn_st='vinet', eqn_th='dorogokupets2007',
-                       eqn_anh='zharkov', eqn_el='zharkov',
-                       reference=reference)
+                       params_anh=params_anh, params_el=params_el)
 
 
 class Dorogokupets2015(MGEOS):
@@ -282,6 +308,12 @@ class Dorogokupets2015(MGEOS):
     Dorogokupets et al. 2015. RGG 56, 172+
     """
 
+    reference = 'Dorogokupets et al. 2015. RGG 56, 172+'
+    eqn_st = 'vinet'
+    eqn_th = 'dorogokupets2015'
+    eqn_anh = 'zharkov'
+    eqn_el = 'zharkov'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(167.0, 0.0)),
@@ -300,9 +332,5 @@ class Dorogokupets2015(MGEOS):
         params_el = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('e0', uct.ufloat(6.1e-6, 0.0)),
                                  ('g', uct.ufloat(0.66, 0.0))])
-        reference = 'Dorogokupets et al. 2015. RGG 56, 172+'
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       params_anh=params_anh, params_el=params_el,
-                       eqn_st='vinet', eqn_th='dorogokupets2015',
-                       eqn_anh='zharkov', eqn_el='zharkov',
-                       reference=reference)
+                       params_anh=params_anh, params_el=params_el)
@@ -19,6 +19,10 @@ class Fei2007vinet(MGEOS):
     Fei et al. 2007 PNAS 104, 9182+
     """
 
+    reference = 'Fei et al. 2007 PNAS 104, 9182+'
+    eqn_st = 'vinet'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(1.16, 0.14)),
@@ -27,9 +31,7 @@ class Fei2007vinet(MGEOS):
                                  ('gamma0', uct.ufloat(2.05, 0.0)),
                                  ('q', uct.ufloat(0.6, 0.3)),
                                  ('theta0', uct.ufloat(75.1, 0.0))])
-        reference = 'Fei et al. 2007 PNAS 104, 9182+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='vinet', eqn_th='constq', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Fei2007bm3(MGEOS):
@@ -37,6 +39,10 @@ class Fei2007bm3(MGEOS):
     Fei et al. 2007 PNAS 104, 9182+
     """
 
+    reference = 'Fei et al. 2007 PNAS 104, 9182+'
+    eqn_st = 'bm3'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(1.43, 0.14)),
@@ -45,6 +51,4 @@ class Fei2007bm3(MGEOS):
                                  ('gamma0', uct.ufloat(2.05, 0.0)),
                                  ('q', uct.ufloat(0.6, 0.3)),
                                  ('theta0', uct.ufloat(75.1, 0.0))])
-        reference = 'Fei et al. 2007 PNAS 104, 9182+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='bm3', eqn_th='constq', reference=reference)
\ No newline at end of file
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
@@ -1,10 +1,14 @@
 """
 Todo's
 """
+import copy
+import warnings
+from collections import OrderedDict
 from scipy import constants
 import numpy as np
-from scipy.optimize import brenth
+import uncertainties as uct
 from uncertainties import unumpy as unp
+from ..etc import isuncertainties
 from ..eqn_bm3 import bm3_p
 from ..eqn_vinet import vinet_p
 from ..eqn_kunc import kunc_p
@@ -19,7 +23,12 @@ from ..eqn_therm_Dorogokupets2015 import dorogokupets2015_pth
 from ..eqn_anharmonic import zharkov_panh
 from ..eqn_electronic import zharkov_pel, tsuchiya_pel
 from ..conversion import vol_uc2mol, vol_mol2uc
-from scipy.interpolate import CubicSpline
+from scipy.interpolate import PchipInterpolator
+from ..solver import illinois
+from ..propagation import linear_propagation, monte_carlo_propagation, \
+    cal_derivative
+from ..properties import cal_properties, cal_adiabat
+from .table import make_table, cached_table, make_gibbs_table
 
 
 func_st = {'bm3': bm3_p, 'vinet': vinet_p, 'kunc': kunc_p}
@@ -35,10 +44,19 @@ class MGEOS(object):
     All EOS following the Mie-Gruneisen fomulation
     """
 
+    reference = None
+    eqn_st = 'bm3'
+    eqn_th = None
+    eqn_anh = None
+    eqn_el = None
+    p_range = None
+    t_range = None
+
     def __init__(self, n, z, params_st=None, params_th=None, params_anh=None,
-                 params_el=None, eqn_st='bm3', eqn_th=None,
+                 params_el=None, eqn_st=None, eqn_th=None,
                  eqn_anh=None, eqn_el=None, t_ref=300.,
-                 three_r=3. * constants.R, reference=None):
+                 three_r=3. * constants.R, reference=None, p_range=None,
+                 t_range=None):
         """
         :param params_st: elastic parameters for static EOS in an OrderedDict
             [v0 in A^3, k0 in GPa, k0p]
@@ -61,21 +79,35 @@ class MGEOS(object):
         :param three_r: 3 times gas constant.
             Jamieson modified this value to compensate for mismatches
         :param reference: reference for the EOS
+        :param p_range: valid pressure range in GPa given in the reference
+        :param t_range: valid temperature range in K given in the reference
+        :note: equations, reference, p_range, and t_range which are None
+            are taken from the class attributes, so that scale classes can
+            give them without construction
         """
         self.params_st = params_st
         self.params_th = params_th
         self.params_anh = params_anh
         self.params_el = params_el
-        self.eqn_st = eqn_st
-        self.eqn_th = eqn_th
-        self.eqn_el = eqn_el
-        self.eqn_anh = eqn_anh
+        if eqn_st is not None:
+            self.eqn_st = eqn_st
+        if eqn_th is not None:
+            self.eqn_th = eqn_th
+        if eqn_el is not None:
+            self.eqn_el = eqn_el
+        if eqn_anh is not None:
+            self.eqn_anh = eqn_anh
         self.n = n
         self.z = z
         self.three_r = three_r
         self.t_ref = t_ref
-        self.reference = reference
-        self.force_norm = False
+        if reference is not None:
+            self.reference = reference
+        if p_range is not None:
+            self.p_range = p_range
+        if t_range is not None:
+            self.t_range = t_range
+        self._gibbs_cache = None
 
     def print_reference(self):
         """
@@ -101,81 +133,87 @@ class MGEOS(object):
         print("Anharmonic: ", self.params_anh)
         print("Electronic: ", self.params_el)
 
-    def _set_params(self, p):
+    def _set_params(self, p, nominal=False):
         """
         change parameters in OrderedDict to list with or without uncertainties
 
         :param p: parameters in OrderedDict
-        :return: parameters in list
+        :param nominal: if True, return nominal values without uncertainties
+        :return: parameters in list, a new list for each call
         :note: internal function
         """
-        if self.force_norm:
-            params = [value.n for key, value in p.items()]
+        if nominal:
+            params = [uct.nominal_value(value) for key, value in p.items()]
         else:
             params = [value for key, value in p.items()]
         return params
 
-    def cal_pst(self, v):
+    def cal_pst(self, v, nominal=False):
         """
         calculate static pressure at 300 K.
 
         :param v: unit-cell volume in A^3
+        :param nominal: if True, use nominal values of the parameters
         :return: static pressure at t_ref (=300 K) in GPa
         """
-        params = self._set_params(self.params_st)
+        params = self._set_params(self.params_st, nominal=nominal)
         return func_st[self.eqn_st](v, *params)
 
-    def cal_pth(self, v, temp):
+    def cal_pth(self, v, temp, nominal=False):
         """
         calculate thermal pressure
 
         :param v: unit-cell volume in A^3
         :param temp: temperature in K
+        :param nominal: if True, use nominal values of the parameters
         :return: thermal pressure in GPa
         """
         if (self.eqn_th is None) or (self.params_th is None):
             return np.zeros_like(v)
-        params = self._set_params(self.params_th)
+        params = self._set_params(self.params_th, nominal=nominal)
         return func_th[self.eqn_th](v, temp, *params,
                                     self.n, self.z, t_ref=self.t_ref,
                                     three_r=self.three_r)
 
-    def cal_pel(self, v, temp):
+    def cal_pel(self, v, temp, nominal=False):
         """
         calculate pressure from electronic contributions
 
         :param v: unit-cell volume in A^3
         :param temp: temperature in K
+        :param nominal: if True, use nominal values of the parameters
         :return: pressure in GPa
         """
         if (self.eqn_el is None) or (self.params_el is None):
             return np.zeros_like(v)
-        params = self._set_params(self.params_el)
+        params = self._set_params(self.params_el, nominal=nominal)
         return func_el[self.eqn_el](v, temp, *params,
                                     self.n, self.z, t_ref=self.t_ref,
                                     three_r=self.three_r)
 
-    def cal_panh(self, v, temp):
+    def cal_panh(self, v, temp, nominal=False):
         """
         calculate pressure from anharmonic contributions
 
         :param v: unit-cell volume in A^3
         :param temp: temperature in K
+        :param nominal: if True, use nominal values of the parameters
         :return: pressure in GPa
         """
         if (self.eqn_anh is None) or (self.params_anh is None):
             return np.zeros_like(v)
-        params = self._set_params(self.params_anh)
+        params = self._set_params(self.params_anh, nominal=nominal)
         return func_anh[self.eqn_anh](v, temp, *params,
                                       self.n, self.z, t_ref=self.t_ref,
                                       three_r=self.three_r)
 
-    def cal_p(self, v, temp):
+    def cal_p(self, v, temp, nominal=False):
         """
         calculate total pressure at given volume and temperature
 
         :param v: unit-cell volume in A^3
         :param temp: temperature in K
+        :param nominal: if True, use nominal values of the parameters
         :return: pressure in GPa
         :note: 2017/05/10 temp must be numpy array.  If not, such as list,
             create an error.
@@ -184,8 +222,252 @@ class MGEOS(object):
             temp = np.asarray(temp)
         if not isinstance(v, np.ndarray):
             v = np.asarray(v)
-        return self.cal_pst(v) + self.cal_pth(v, temp) + \
-            self.cal_pel(v, temp) + self.cal_panh(v, temp)
+        return self.cal_pst(v, nominal=nominal) + \
+            self.cal_pth(v, temp, nominal=nominal) + \
+            self.cal_pel(v, temp, nominal=nominal) + \
+            self.cal_panh(v, temp, nominal=nominal)
+
+    def cal_properties(self, v, temp):
+        """
+        calculate thermodynamic properties at given volume and temperature
+        analytically from all components of the EOS
+
+        :param v: unit-cell volume in A^3
+        :param temp: temperature in K
+        :return: OrderedDict of p, k_t, k_s, alpha, c_v, and gamma,
+            see pytheos.properties.cal_properties
+        :note: nominal values are used
+        """
+        return cal_properties(self, v, temp)
+
+    def cal_adiabat(self, p, temp0, p0=0., **kwargs):
+        """
+        calculate volume and temperature along adiabats
+
+        :param p: pressures in GPa to calculate volume and temperature at
+        :param temp0: temperatures in K at p0, such as potential
+            temperatures
+        :param p0: pressure in GPa where the adiabats start
+        :param kwargs: rtol and atol for odeint
+        :return: unit-cell volume in A^3 and temperature in K, each in
+            temp0.shape + p.shape array
+        :note: all adiabats are integrated together, see
+            pytheos.properties.cal_adiabat
+        """
+        return cal_adiabat(self, p, temp0, p0=p0, **kwargs)
+
+    def cal_f(self, v, temp):
+        """
+        calculate Helmholtz free energy at given volume and temperature
+
+        :param v: unit-cell volume in A^3
+        :param temp: temperature in K
+        :return: Helmholtz free energy in J/mol for a formula unit,
+            relative to v0 at t_ref
+        :note: nominal values are used, see pytheos.properties.cal_properties
+        """
+        return cal_properties(self, v, temp)['f']
+
+    def cal_g(self, p, temp, min_strain=0.2, max_strain=1.0):
+        """
+        calculate Gibbs free energy at given pressure and temperature
+
+        :param p: pressure in GPa
+        :param temp: temperature in K
+        :param min_strain: minimum strain searched for volume root
+        :param max_strain: maximum strain searched for volume root
+        :return: Gibbs free energy in J/mol for a formula unit,
+            relative to v0 at t_ref
+        :note: nominal values are used.  Volume is solved for all (p, temp)
+            pairs at once, see cal_v.
+        """
+        return self._cal_g_derivatives(p, temp, min_strain=min_strain,
+                                       max_strain=max_strain)[0]
+
+    def tabulate_gibbs(self, p_range, t_range, n_p=1000, n_t=1000,
+                       error=True):
+        """
+        make a table of Gibbs free energy for fast calculation of the free
+        energy and its derivatives with nominal values of the parameters.
+        The last table is kept in memory and returned again until the
+        parameters or the grid change.
+
+        :param p_range: minimum and maximum pressures in GPa
+        :param t_range: minimum and maximum temperatures in K
+        :param n_p: number of grid pressures
+        :param n_t: number of grid temperatures
+        :param error: if True, estimate error of the table
+        :return: GibbsTable, see make_gibbs_table
+        :note: volume and the properties are calculated for the whole grid
+            in one pass.  G outside the range of the volume solver is nan.
+        """
+        key = (tuple(tuple(uct.nominal_value(value) for value in p.values())
+                     if p is not None else None
+                     for p in self._get_params_list()),
+               self.eqn_st, self.eqn_th, self.eqn_anh, self.eqn_el, self.n,
+               self.z, self.t_ref, self.three_r, tuple(p_range),
+               tuple(t_range), n_p, n_t)
+        if (self._gibbs_cache is not None) and \
+                (self._gibbs_cache[0] == key) and \
+                ((not error) or (self._gibbs_cache[1].max_error is not None)):
+            return self._gibbs_cache[1]
+        table = make_gibbs_table(self._cal_g_derivatives, p_range, t_range,
+                                 n_p=n_p, n_t=n_t, error=error)
+        self._gibbs_cache = (key, table)
+        return table
+
+    def _cal_g_derivatives(self, p, temp, **kwargs):
+        """
+        calculate Gibbs free energy and its derivatives
+
+        :param p: pressure in GPa
+        :param temp: temperature in K
+        :param kwargs: min_strain and max_strain for cal_v
+        :return: G in J/mol, dG/dP in J/mol/GPa, dG/dT in J/mol/K, and
+            d^2G/dPdT
+        :note: internal function
+        """
+        if isuncertainties([p, temp]):
+            p, temp = unp.nominal_values(p), unp.nominal_values(temp)
+        p, temp = np.broadcast_arrays(np.asarray(p, dtype=float),
+                                      np.asarray(temp, dtype=float))
+        v = self.cal_v(p, temp, **kwargs)
+        prop = cal_properties(self, v, temp)
+        # molar volume in J/mol/GPa
+        g_p = vol_uc2mol(v, self.z) * 1.e9
+        return prop['f'] + p * g_p, g_p, -prop['s'], prop['alpha'] * g_p
+
+    def cal_p_linear(self, v, temp, cov=None):
+        """
+        calculate total pressure and its standard deviation using linear
+        error propagation with float arrays, which is much faster than
+        cal_p with uncertainties
+
+        :param v: unit-cell volume in A^3, float or ufloat array
+        :param temp: temperature in K, float or ufloat array
+        :param cov: covariance matrix of parameters in params_st, params_th,
+            params_anh, and params_el in this order.  If None, calculated
+            from the ufloats of the parameters.
+        :return: pressure and its standard deviation in GPa
+        :note: see linear_propagation for detail
+        """
+        return linear_propagation(
+            self._cal_p_params, [v, temp] + self._get_params_list(), cov=cov)
+
+    def cal_p_mc(self, v, temp, n_samples=1000, **kwargs):
+        """
+        calculate distribution of total pressure by Monte Carlo sampling of
+        the parameters.  All samples in a chunk are calculated in one
+        (K x N) array.
+
+        :param v: unit-cell volume in A^3, float or ufloat array
+        :param temp: temperature in K, float or ufloat array
+        :param n_samples: number of samples
+        :param kwargs: options for monte_carlo_propagation, such as cov,
+            correlated, percentiles, chunk_size, and seed.  cov is for the
+            parameters in params_st, params_th, params_anh, and params_el
+            in this order.
+        :return: OrderedDict of mean, std, percentiles, cov, and n_valid,
+            see monte_carlo_propagation
+        """
+        return monte_carlo_propagation(
+            self._cal_p_params, [v, temp] + self._get_params_list(),
+            n_samples=n_samples, **kwargs)
+
+    def cal_v_mc(self, p, temp, n_samples=1000, min_strain=0.2,
+                 max_strain=1.0, **kwargs):
+        """
+        calculate distribution of unit-cell volume by Monte Carlo sampling
+        of the parameters.  Volumes for all samples in a chunk are solved
+        together.
+
+        :param p: pressure in GPa, float or ufloat array
+        :param temp: temperature in K, float or ufloat array
+        :param n_samples: number of samples
+        :param min_strain: minimum strain searched for volume root
+        :param max_strain: maximum strain searched for volume root
+        :param kwargs: options for monte_carlo_propagation, see cal_p_mc
+        :return: OrderedDict of mean, std, percentiles, cov, and n_valid,
+            see monte_carlo_propagation
+        :note: samples without a volume root are excluded
+        """
+        def f_v(p, temp, *params):
+            shape = np.broadcast_shapes(np.shape(p), np.shape(temp),
+                                        np.shape(params[0]['v0']))
+
+            def f_p(v, temp, idx):
+                return self._cal_p_params(
+                    v, temp, *[_select_params(param, shape, idx)
+                               for param in params])
+
+            return _solve_v_samples(f_p, p, temp, params[0]['v0'],
+                                    min_strain=min_strain,
+                                    max_strain=max_strain)
+
+        return monte_carlo_propagation(
+            f_v, [p, temp] + self._get_params_list(), n_samples=n_samples,
+            **kwargs)
+
+    def tabulate(self, v_range, t_range, n_v=256, n_t=64, cache_dir=None):
+        """
+        make a P-V-T table for fast calculation of pressure and volume
+        with nominal values of the parameters
+
+        :param v_range: minimum and maximum unit-cell volumes in A^3
+        :param t_range: minimum and maximum temperatures in K
+        :param n_v: number of grid volumes
+        :param n_t: number of grid temperatures
+        :param cache_dir: if given, the table is read from this directory
+            if it exists there, otherwise made and written to it.
+            See cached_table.
+        :return: PVTTable, see make_table
+        :note: table.max_error and table.max_error_v give the estimated
+            errors of pressure and volume.  Increase n_v and n_t if they
+            are too large.
+        """
+        eos = copy.copy(self)
+        eos.params_st, eos.params_th, eos.params_anh, eos.params_el = [
+            None if p is None else OrderedDict(
+                (key, uct.nominal_value(value)) for key, value in p.items())
+            for p in self._get_params_list()]
+
+        def f_make():
+            return make_table(eos.cal_p, v_range, t_range, n_v=n_v, n_t=n_t)
+
+        if cache_dir is None:
+            return f_make()
+        key = (eos._get_params_list(), self.eqn_st, self.eqn_th,
+               self.eqn_anh, self.eqn_el, self.n, self.z, self.t_ref,
+               self.three_r, tuple(v_range), tuple(t_range), n_v, n_t)
+        return cached_table(f_make, self.__class__.__name__, key, cache_dir)
+
+    def _get_params_list(self):
+        """
+        :return: list of parameters in params_st, params_th, params_anh,
+            and params_el
+        :note: internal function
+        """
+        return [self.params_st, self.params_th, self.params_anh,
+                self.params_el]
+
+    def _cal_p_params(self, v, temp, params_st, params_th, params_anh,
+                      params_el):
+        """
+        calculate total pressure with given parameters
+
+        :param v: unit-cell volume in A^3
+        :param temp: temperature in K
+        :param params_st: parameters for static EOS
+        :param params_th: parameters for thermal EOS
+        :param params_anh: parameters for anharmonic correction
+        :param params_el: parameters for electronic correction
+        :return: pressure in GPa
+        :note: internal function
+        """
+        eos = copy.copy(self)
+        eos.params_st, eos.params_th = params_st, params_th
+        eos.params_anh, eos.params_el = params_anh, params_el
+        return eos.cal_p(v, temp)
 
     # def cal_v(self, p, temp, min_strain=0.2, max_strain=1.0):
     #     """
@@ -231,106 +513,17 @@ class MGEOS(object):
         :return: unit-cell volume in A^3
         :note: 2017/05/10 I found wrap function is not compatible with
             OrderedDict. So I convert unp array to np array.
-        :note: Falls back to spline interpolation if root-finding fails.
-        """
-        v0 = self.params_st['v0'].nominal_value
-        self.force_norm = True
-        pp = unp.nominal_values(p)
-        ttemp = unp.nominal_values(temp)
-
-        def _cal_v_single(pp, ttemp):
-            """Original root-finding approach using brenth."""
-            if (pp <= 1.e-5) and (ttemp == 300.):
-                return v0
-
-            def f_diff(v, ttemp, pp):
-                return self.cal_p(v, ttemp).item() - pp
-            
-            try:
-                v = brenth(f_diff, v0 * max_strain, v0 * min_strain,
-                        args=(ttemp, pp))
-                return v
-            except (ValueError, RuntimeError):
-                return None
-
-        def _cal_v_single_spline(pp, ttemp, n_points=200):
-            """Spline interpolation approach for when root-finding fails."""
-            if (pp <= 1.e-5) and (ttemp == 300.):
-                return v0
-            
-            try:
-                # Adaptive compression range check
-                current_max_strain = max_strain
-                v_min_test = v0 * current_max_strain
-                p_at_min = self.cal_p(v_min_test, ttemp)
-                
-                # Convert to scalar if needed
-                if hasattr(p_at_min, 'item'):
-                    p_at_min = p_at_min.item()
-                
-                # Check if we need more compression
-                if pp > p_at_min:
-                    for _ in range(30):
-                        current_max_strain *= 0.5
-                        if current_max_strain < 1e-10:
-                            return None
-                        
-                        v_min_test = v0 * current_max_strain
-                        p_at_min = self.cal_p(v_min_test, ttemp)
-                        if hasattr(p_at_min, 'item'):
-                            p_at_min = p_at_min.item()
-                        
-                        if pp <= p_at_min:
-                            break
-                    else:
-                        return None
-                
-                # Create volume array (log spacing for better resolution)
-                v_min = v0 * current_max_strain
-                v_max = v0 * min_strain
-                v_array = np.logspace(np.log10(v_min), np.log10(v_max), n_points)
-                
-                # Calculate pressures
-                p_array = np.array([
-                    self.cal_p(v, ttemp).item() if hasattr(self.cal_p(v, ttemp), 'item') 
-                    else float(self.cal_p(v, ttemp))
-                    for v in v_array
-                ])
-                
-                # Sort by pressure (ensure monotonic)
-                sort_idx = np.argsort(p_array)
-                p_array = p_array[sort_idx]
-                v_array = v_array[sort_idx]
-                
-                # Create spline P -> V
-                spline = CubicSpline(p_array, v_array, extrapolate=False)
-                
-                # Evaluate at target pressure
-                v = float(spline(pp))
-                
-                if np.isnan(v):
-                    return None
-                
-                return v
-            
-            except Exception:
-                return None
-
-        def _cal_v_wrapper(pp, ttemp):
-            """Wrapper that tries root-finding first, then falls back to spline."""
-            # Try root-finding first
-            v = _cal_v_single(pp, ttemp)
-            
-            # If failed, try spline approach
-            if v is None:
-                v = _cal_v_single_spline(pp, ttemp)
-            
-            return v
-
-        f_vu = np.vectorize(_cal_v_wrapper)
-        v = f_vu(pp, ttemp)
-        self.force_norm = False
-        return v
+        :note: All (p, temp) pairs are solved together, see _solve_v.
+            Roots which do not reproduce the pressure or are not on the
+            branch where pressure decreases with volume are rejected.
+        """
+        v0 = uct.nominal_value(self.params_st['v0'])
+
+        def f_p(v, temp):
+            return self.cal_p(v, temp, nominal=True)
+
+        return _solve_v(f_p, p, temp, v0, min_strain=min_strain,
+                        max_strain=max_strain)
 
 
 class JHEOS(object):
@@ -338,9 +531,14 @@ class JHEOS(object):
     Jamieson's hugoniot EOS.  The equations are from Jamieson 1982
     """
 
+    reference = None
+    p_range = None
+    t_range = None
+
     def __init__(self, n, z, mass, params_hugoniot, params_therm,
                  three_r=3. * constants.R, c_v=0.0, nonlinear=False,
-                 reference=None, t_ref=300.):
+                 reference=None, t_ref=300., cache_pst=True, p_range=None,
+                 t_range=None):
         """
         :param n: number of elements in a chemical formula
         :param z: number of formula unit in a unit cell
@@ -358,6 +556,12 @@ class JHEOS(object):
             scale
         :param reference: reference for the EOS
         :param t_ref: reference temperature, 300 K
+        :param cache_pst: if True, static pressure with nominal values is
+            interpolated from a cached table, see _get_pst_interpolant
+        :param p_range: valid pressure range in GPa given in the reference
+        :param t_range: valid temperature range in K given in the reference
+        :note: reference, p_range, and t_range which are None are taken
+            from the class attributes
         """
         self.params_hugoniot = params_hugoniot
         self.params_therm = params_therm
@@ -369,20 +573,29 @@ class JHEOS(object):
         self.three_r = three_r
         self.nonlinear = nonlinear
         self.c_v = c_v
-        self.reference = reference
+        if reference is not None:
+            self.reference = reference
         self.t_ref = t_ref
-        self.force_norm = False
-
-    def _set_params(self, p):
+        self.cache_pst = cache_pst
+        if p_range is not None:
+            self.p_range = p_range
+        if t_range is not None:
+            self.t_range = t_range
+        self._pst_cache = None
+        self._pst_sensitivity_cache = None
+        self.pst_max_error = None
+
+    def _set_params(self, p, nominal=False):
         """
         change parameters in OrderedDict to list with or without uncertainties
 
         :param p: parameters in OrderedDict
-        :return: parameters in list
+        :param nominal: if True, return nominal values without uncertainties
+        :return: parameters in list, a new list for each call
         :note: internal function
         """
-        if self.force_norm:
-            params = [value.n for key, value in p.items()]
+        if nominal:
+            params = [uct.nominal_value(value) for key, value in p.items()]
         else:
             params = [value for key, value in p.items()]
         return params
@@ -438,37 +651,196 @@ class JHEOS(object):
         print(v)
         return v
 
-    def cal_pst(self, v):
+    def cal_pst(self, v, nominal=False):
         """
         calculate static pressure at 300 K.
 
         :param v: unit-cell volume in A^3
+        :param nominal: if True, use nominal values of the parameters
         :return: static pressure at t_ref (=300 K) in GPa
+        :note: if cache_pst is True, the pressure is interpolated from a
+            table built on the first call, see _get_pst_interpolant.
+            With uncertainties, the errors are propagated linearly with
+            derivatives for volume and the parameters, which are also
+            interpolated from tables, see _get_pst_sensitivity.
+            If any volume is out of the table, the pressure is calculated
+            directly.
+        """
+        if not self.cache_pst:
+            return self._cal_pst_direct(v, nominal=nominal)
+        v_n = np.asarray(unp.nominal_values(v), dtype=float)
+        interp = self._get_pst_interpolant()
+        p_st = interp(v_n)
+        out = np.isnan(p_st)
+        if np.any(out):
+            if nominal and not isuncertainties([v]):
+                p_st = np.array(p_st, copy=True)
+                p_st[out] = self._cal_pst_direct(v_n[out], nominal=True)
+                return p_st
+            return self._cal_pst_direct(v, nominal=nominal)
+        # first order expansion around the nominal values
+        if isuncertainties([v]):
+            p_st = p_st + interp.derivative()(v_n) * (v - v_n)
+        if nominal:
+            return p_st
+        for key, value in self._get_ufloat_params():
+            p_st = p_st + self._get_pst_sensitivity()[key](v_n) * \
+                (value - uct.nominal_value(value))
+        return p_st
+
+    def _cal_pst_direct(self, v, nominal=False):
         """
-        p_h = self._hugoniot_p(v)
-        p_th_h = self._hugoniot_pth(v)
+        calculate static pressure at 300 K from hugoniot pressure and
+        thermal pressure along the hugoniot.
+
+        :param v: unit-cell volume in A^3
+        :param nominal: if True, use nominal values of the parameters
+        :return: static pressure at t_ref (=300 K) in GPa
+        :note: internal function
+        """
+        p_h = self._hugoniot_p(v, nominal=nominal)
+        p_th_h = self._hugoniot_pth(v, nominal=nominal)
         p_st = p_h - p_th_h
         return p_st
 
-    def _hugoniot_p(self, v):
+    def _get_params_key(self):
+        """
+        get nominal values of all parameters which change static pressure
+
+        :return: tuple of parameters
+        :note: internal function
+        """
+        params = [(key, uct.nominal_value(value))
+                  for p in [self.params_hugoniot, self.params_therm]
+                  for key, value in p.items()]
+        return tuple(params) + (self.n, self.z, self.mass, self.three_r,
+                                self.c_v, self.nonlinear, self.t_ref)
+
+    def _get_pst_interpolant(self, min_strain=0.5, max_strain=1.2,
+                             atol=1.e-6, rtol=1.e-7, n_max=2**16):
+        """
+        get monotone interpolant of static pressure with nominal values.
+        It is built on the first call and rebuilt only when parameters
+        change.  The volume range is the part of [v0 * min_strain,
+        v0 * max_strain] around v0 where static pressure is finite and
+        decreasing.  The grid is refined until the interpolation error at
+        the middle of the intervals is below atol + rtol * |P|.
+        rtol should not be much smaller than the tolerance of the hugoniot
+        temperature integration.
+
+        :param min_strain: minimum v/v0 of the table
+        :param max_strain: maximum v/v0 of the table
+        :param atol: absolute tolerance in GPa
+        :param rtol: relative tolerance
+        :param n_max: maximum number of intervals
+        :return: PchipInterpolator, nan out of the table
+        :note: internal function
+        """
+        key = self._get_params_key()
+        if (self._pst_cache is not None) and (self._pst_cache[0] == key):
+            return self._pst_cache[1]
+        v0 = uct.nominal_value(self.params_therm['v0'])
+        with np.errstate(all='ignore'):
+            v = np.linspace(v0 * min_strain, v0 * max_strain, 65)
+            p = self._cal_pst_direct(v, nominal=True)
+            i0 = np.argmin(np.abs(v - v0))
+            ok = np.isfinite(p) & (np.append(np.diff(p), -1.) < 0.) & \
+                (np.append(-1., np.diff(p)) < 0.)
+            ok[i0] = True
+            bad = np.flatnonzero(~ok)
+            i_lo = bad[bad < i0].max() + 1 if np.any(bad < i0) else 0
+            i_hi = bad[bad > i0].min() - 1 if np.any(bad > i0) else v.size - 1
+            v = np.linspace(v[i_lo], v[i_hi], 65)
+            p = self._cal_pst_direct(v, nominal=True)
+            while True:
+                interp = PchipInterpolator(v, p, extrapolate=False)
+                v_mid = 0.5 * (v[1:] + v[:-1])
+                p_mid = self._cal_pst_direct(v_mid, nominal=True)
+                err = np.abs(interp(v_mid) - p_mid)
+                self.pst_max_error = err.max()
+                if np.all(err <= atol + rtol * np.abs(p_mid)) or \
+                        (v.size > n_max):
+                    break
+                # add the middle points to the grid
+                v_new = np.empty(2 * v.size - 1)
+                p_new = np.empty(2 * v.size - 1)
+                v_new[::2], v_new[1::2] = v, v_mid
+                p_new[::2], p_new[1::2] = p, p_mid
+                v, p = v_new, p_new
+        self._pst_cache = (key, interp)
+        return interp
+
+    def _get_ufloat_params(self):
+        """
+        get parameters with uncertainties
+
+        :return: list of ((name of the parameter dictionary, key), ufloat)
+        :note: internal function
+        """
+        return [((p, key), value)
+                for p in ['params_hugoniot', 'params_therm']
+                for key, value in getattr(self, p).items()
+                if isinstance(value, uct.UFloat)]
+
+    def _get_pst_sensitivity(self, h=1.e-5):
+        """
+        get interpolants of the derivatives of static pressure with respect
+        to the parameters, on the volume grid of _get_pst_interpolant.
+        They are built on the first call and rebuilt only when parameters
+        change.
+
+        :param h: step for central difference relative to the parameters
+        :return: dictionary of (name of the parameter dictionary, key) and
+            PchipInterpolator, nan out of the table
+        :note: internal function
+        """
+        key = self._get_params_key()
+        if (self._pst_sensitivity_cache is not None) and \
+                (self._pst_sensitivity_cache[0] == key):
+            return self._pst_sensitivity_cache[1]
+        v = self._get_pst_interpolant().x
+        params = [OrderedDict((k, uct.nominal_value(value))
+                              for k, value in p.items())
+                  for p in [self.params_hugoniot, self.params_therm]]
+
+        def f_p(v, params_hugoniot, params_therm):
+            eos = copy.copy(self)
+            eos.params_hugoniot, eos.params_therm = \
+                params_hugoniot, params_therm
+            return eos._cal_pst_direct(v, nominal=True)
+
+        sensitivity = {}
+        for i, p in enumerate(['params_hugoniot', 'params_therm']):
+            for k in params[i].keys():
+                with np.errstate(all='ignore'):
+                    d = cal_derivative(f_p, [v] + params, {}, (i + 1, k),
+                                       method='central', h=h)
+                sensitivity[(p, k)] = PchipInterpolator(
+                    v, np.broadcast_to(d, v.shape), extrapolate=False)
+        self._pst_sensitivity_cache = (key, sensitivity)
+        return sensitivity
+
+    def _hugoniot_p(self, v, nominal=False):
         """
         calculate static pressure at 300 K.
 
         :param v: unit-cell volume in A^3
+        :param nominal: if True, use nominal values of the parameters
         :return: static pressure at t_ref (=300 K) in GPa
         """
         rho = self._get_rho(v)
-        params = self._set_params(self.params_hugoniot)
+        params = self._set_params(self.params_hugoniot, nominal=nominal)
         if self.nonlinear:
             return hugoniot_p_nlin(rho, *params)
         else:
             return hugoniot_p(rho, *params)
 
-    def _hugoniot_t(self, v):
+    def _hugoniot_t(self, v, nominal=False):
         """
         calculate Hugoniot temperature
 
         :param v: unit-cell volume in A^3
+        :param nominal: if True, use nominal values of the parameters
         :return: temperature in K
         :note: 2017/05/10, It is intentional that I call hugoniot_t
         instead of hugoniot_t_nlin for the nonlinear case.
@@ -478,8 +850,8 @@ class JHEOS(object):
         non-linear version.
         """
         rho = self._get_rho(v)
-        params_h = self._set_params(self.params_hugoniot)
-        params_t = self._set_params(self.params_therm)
+        params_h = self._set_params(self.params_hugoniot, nominal=nominal)
+        params_t = self._set_params(self.params_therm, nominal=nominal)
         if self.nonlinear:
             return hugoniot_t(rho, *params_h[:-1], *params_t[1:],
                               self.n, self.mass, three_r=self.three_r,
@@ -489,37 +861,148 @@ class JHEOS(object):
                               self.n, self.mass, three_r=self.three_r,
                               c_v=self.c_v)
 
-    def cal_pth(self, v, temp):
+    def cal_pth(self, v, temp, nominal=False):
         """
         calculate thermal pressure
 
         :param v: unit-cell volume in A^3
         :param temp: temperature in K
+        :param nominal: if True, use nominal values of the parameters
         :return: thermal pressure in GPa
         """
-        params_t = self._set_params(self.params_therm)
+        params_t = self._set_params(self.params_therm, nominal=nominal)
         return constq_pth(v, temp, *params_t, self.n, self.z,
                           t_ref=self.t_ref, three_r=self.three_r)
 
-    def _hugoniot_pth(self, v):
+    def _hugoniot_pth(self, v, nominal=False):
         """
         calculate thermal pressure along hugoniot
 
         :param v: unit-cell volume in A^3
+        :param nominal: if True, use nominal values of the parameters
         :return: thermal pressure along hugoniot in GPa
         """
-        temp = self._hugoniot_t(v)
-        return self.cal_pth(v, temp)
+        temp = self._hugoniot_t(v, nominal=nominal)
+        return self.cal_pth(v, temp, nominal=nominal)
 
-    def cal_p(self, v, temp):
+    def cal_p(self, v, temp, nominal=False):
         """
         calculate total pressure at given volume and temperature
 
         :param v: unit-cell volume in A^3
         :param temp: temperature in K
+        :param nominal: if True, use nominal values of the parameters
         :return: pressure in GPa
         """
-        return self.cal_pst(v) + self.cal_pth(v, temp)
+        return self.cal_pst(v, nominal=nominal) + \
+            self.cal_pth(v, temp, nominal=nominal)
+
+    def cal_p_linear(self, v, temp, cov=None):
+        """
+        calculate total pressure and its standard deviation using linear
+        error propagation with float arrays, which is much faster than
+        cal_p with uncertainties
+
+        :param v: unit-cell volume in A^3, float or ufloat array
+        :param temp: temperature in K, float or ufloat array
+        :param cov: covariance matrix of parameters in params_hugoniot and
+            params_therm in this order.  If None, calculated from the
+            ufloats of the parameters.
+        :return: pressure and its standard deviation in GPa
+        :note: derivatives are from central difference because the
+            hugoniot temperature integration cannot handle complex numbers.
+            See linear_propagation for detail.
+        """
+        def f_p(v, temp, params_hugoniot, params_therm):
+            eos = copy.copy(self)
+            eos.params_hugoniot, eos.params_therm = \
+                params_hugoniot, params_therm
+            return eos.cal_p(v, temp)
+
+        return linear_propagation(
+            f_p, [v, temp, self.params_hugoniot, self.params_therm],
+            cov=cov, method='central')
+
+    def cal_p_mc(self, v, temp, n_samples=1000, **kwargs):
+        """
+        calculate distribution of total pressure by Monte Carlo sampling of
+        the parameters
+
+        :param v: unit-cell volume in A^3, float or ufloat array
+        :param temp: temperature in K, float or ufloat array
+        :param n_samples: number of samples
+        :param kwargs: options for monte_carlo_propagation, such as cov,
+            correlated, percentiles, chunk_size, and seed.  cov is for the
+            parameters in params_hugoniot and params_therm in this order.
+        :return: OrderedDict of mean, std, percentiles, cov, and n_valid,
+            see monte_carlo_propagation
+        :note: the hugoniot temperature is integrated for one sample at a
+            time, so this is much slower than MGEOS.cal_p_mc
+        """
+        def f_p(v, temp, params_hugoniot, params_therm):
+            return self._map_samples(
+                lambda eos, v, temp: eos.cal_p(v, temp), v, temp,
+                params_hugoniot, params_therm)
+
+        return monte_carlo_propagation(
+            f_p, [v, temp, self.params_hugoniot, self.params_therm],
+            n_samples=n_samples, **kwargs)
+
+    def cal_v_mc(self, p, temp, n_samples=1000, min_strain=None,
+                 max_strain=1.1, **kwargs):
+        """
+        calculate distribution of unit-cell volume by Monte Carlo sampling
+        of the parameters
+
+        :param p: pressure in GPa, float or ufloat array
+        :param temp: temperature in K, float or ufloat array
+        :param n_samples: number of samples
+        :param min_strain: minimum strain searched for volume root,
+            see cal_v
+        :param max_strain: maximum strain searched for volume root
+        :param kwargs: options for monte_carlo_propagation, see cal_p_mc
+        :return: OrderedDict of mean, std, percentiles, cov, and n_valid,
+            see monte_carlo_propagation
+        :note: volumes are solved for one sample at a time
+        """
+        def f_v(p, temp, params_hugoniot, params_therm):
+            return self._map_samples(
+                lambda eos, p, temp: eos.cal_v(
+                    p, temp, min_strain=min_strain, max_strain=max_strain),
+                p, temp, params_hugoniot, params_therm)
+
+        return monte_carlo_propagation(
+            f_v, [p, temp, self.params_hugoniot, self.params_therm],
+            n_samples=n_samples, **kwargs)
+
+    def _map_samples(self, func, x, temp, params_hugoniot, params_therm):
+        """
+        apply func to each sample of parameters
+
+        :param func: function of (eos, x, temp)
+        :param x: volume or pressure in (k or 1, ...) array
+        :param temp: temperature in (k or 1, ...) array
+        :param params_hugoniot: hugoniot parameters, each in float or
+            (k, 1, ...) array
+        :param params_therm: thermal parameters, each in float or
+            (k, 1, ...) array
+        :return: results in (k, ...) array
+        :note: internal function
+        """
+        x, temp = np.broadcast_arrays(x, temp)
+        n_samples = max([x.shape[0]] + [
+            np.shape(value)[0] for p in [params_hugoniot, params_therm]
+            for value in p.values() if np.ndim(value) != 0])
+        result = np.empty((n_samples,) + x.shape[1:])
+        for i in range(n_samples):
+            eos = copy.copy(self)
+            eos.params_hugoniot, eos.params_therm = [
+                OrderedDict((key, value if np.ndim(value) == 0 else
+                             np.ravel(value)[i]) for key, value in p.items())
+                for p in [params_hugoniot, params_therm]]
+            j = min(i, x.shape[0] - 1)
+            result[i] = func(eos, x[j], temp[j])
+        return result
     
     # def cal_v(self, p, temp, min_strain=0.3, max_strain=1.0):
     #     """
@@ -553,80 +1036,267 @@ class JHEOS(object):
     #     self.force_norm = False
     #     return v
     
-    def cal_v(self, p, temp, min_strain=0.3, max_strain=1.1):
+    def cal_v(self, p, temp, min_strain=None, max_strain=1.1):
         """
         calculate unit-cell volume at given pressure and temperature
 
         :param p: pressure in GPa
         :param temp: temperature in K
-        :param min_strain: minimum strain searched for volume root
+        :param min_strain: minimum strain searched for volume root.
+            If None, 0.3 or the lower limit of the static pressure table
+            if cache_pst is True.
         :param max_strain: maximum strain searched for volume root
         :return: unit-cell volume in A^3
         :note: 2017/05/10 I found wrap function is not compatible with
             OrderedDict. So I convert unp array to np array.
-        :note: Falls back to spline interpolation if root-finding fails.
-        """
-        v0 = self.params_therm['v0'].nominal_value
-        self.force_norm = True
-        pp = unp.nominal_values(p)
-        ttemp = unp.nominal_values(temp)
-
-        def _cal_v_single(pp, ttemp):
-            if (pp <= 1.e-5) and (ttemp == 300.):
-                return v0
-
-            # Try root-finding first
-            def f_diff(v, ttemp, pp):
-                result = self.cal_p(v, ttemp)
-                return (result.item() if hasattr(result, 'item') else float(result)) - pp
-            
-            try:
-                v = brenth(f_diff, v0 * max_strain, v0 * min_strain,
-                        args=(ttemp, pp))
-                return v
-            except (ValueError, RuntimeError):
-                pass  # Fall through to spline approach
-            
-            # Spline fallback
-            try:
-                # Adaptive compression range check
-                current_max = max_strain
-                for _ in range(30):
-                    v_test = v0 * current_max
-                    p_test = self.cal_p(v_test, ttemp)
-                    p_test = p_test.item() if hasattr(p_test, 'item') else float(p_test)
-                    
-                    if pp <= p_test:
-                        break
-                        
-                    current_max *= 0.5
-                    if current_max < 1e-10:
-                        return None
-                
-                # Build spline with log spacing for better resolution
-                v_min = v0 * current_max
-                v_max = v0 * min_strain
-                v_arr = np.logspace(np.log10(v_min), np.log10(v_max), 200)
-                
-                # Calculate pressures
-                p_arr = np.array([
-                    (self.cal_p(v, ttemp).item() if hasattr(self.cal_p(v, ttemp), 'item') 
-                    else float(self.cal_p(v, ttemp)))
-                    for v in v_arr
-                ])
-                
-                # Sort by pressure (ensure monotonic)
-                idx = np.argsort(p_arr)
-                spline = CubicSpline(p_arr[idx], v_arr[idx], extrapolate=False)
-                
-                # Evaluate at target pressure
-                v = float(spline(pp))
-                return v if not np.isnan(v) else None
-                
-            except Exception:
-                return None
-
-        f_vu = np.vectorize(_cal_v_single)
-        v = f_vu(pp, ttemp)
-        self.force_norm = False
-        return v
\ No newline at end of file
+        :note: All (p, temp) pairs are solved together, see _solve_v.
+            Roots which do not reproduce the pressure or are not on the
+            branch where pressure decreases with volume are rejected.
+        :note: if cache_pst is True, static pressure is not physical below
+            the lower limit of the static pressure table, see
+            _get_pst_interpolant.  A smaller min_strain is raised to the
+            limit with a warning.
+        """
+        v0 = uct.nominal_value(self.params_therm['v0'])
+        if self.cache_pst:
+            min_table = self._get_pst_interpolant().x[0] / v0
+            if min_strain is None:
+                min_strain = min_table
+            elif min_strain < min_table:
+                warnings.warn(
+                    'min_strain of {0:.4g} is below the static pressure '
+                    'table and raised to {1:.4g}.'.format(min_strain,
+                                                          min_table),
+                    RuntimeWarning)
+                min_strain = min_table
+        elif min_strain is None:
+            min_strain = 0.3
+
+        def f_p(v, temp):
+            return self.cal_p(v, temp, nominal=True)
+
+        return _solve_v(f_p, p, temp, v0, min_strain=min_strain,
+                        max_strain=max_strain)
+
+
+def _solve_v(f_p, p, temp, v0, min_strain=0.2, max_strain=1.0,
+             n_points=200, ptol=1.e-6):
+    """
+    find unit-cell volumes for arrays of pressure and temperature.
+    f_p is evaluated on the whole array of unsolved (p, temp) pairs at each
+    iteration of the Illinois method.  Pairs without a root in
+    [v0 * min_strain, v0 * max_strain] get their brackets extended and
+    are solved again.  Pairs still failing are solved on the stable
+    branch of a P-V table, which is built once for each temperature.
+
+    :param f_p: function of volume and temperature returning pressure
+        as float
+    :param p: pressure in GPa
+    :param temp: temperature in K
+    :param v0: unit-cell volume in A^3 at 1 bar
+    :param min_strain: minimum strain searched for volume root
+    :param max_strain: maximum strain searched for volume root
+    :param n_points: number of volume points for the fallback table
+    :param ptol: relative tolerance for pressure at the roots, see
+        _check_v
+    :return: unit-cell volume in A^3, nan if no solution is found
+    :note: internal function
+    """
+    pp, ttemp = np.broadcast_arrays(
+        np.asarray(unp.nominal_values(p), dtype=float),
+        np.asarray(unp.nominal_values(temp), dtype=float))
+    shape = pp.shape
+    pp = pp.ravel()
+    ttemp = ttemp.ravel()
+    v = np.full(pp.size, np.nan)
+    at_ref = (pp <= 1.e-5) & (ttemp == 300.)
+    v[at_ref] = v0
+    todo = np.flatnonzero(~at_ref)
+    if todo.size == 0:
+        return v.reshape(shape)
+
+    def f_diff(v, idx):
+        return f_p(v, ttemp[todo[idx]]) - pp[todo[idx]]
+
+    v_lo = np.full(todo.size, v0 * min_strain)
+    v_hi = np.full(todo.size, v0 * max_strain)
+    with np.errstate(all='ignore'):
+        v_root, converged = illinois(f_diff, v_hi, v_lo)
+        converged &= _check_v(f_p, v_root, ttemp[todo], pp[todo], ptol)
+        v[todo[converged]] = v_root[converged]
+        todo, v_lo, v_hi = todo[~converged], v_lo[~converged], \
+            v_hi[~converged]
+        if todo.size != 0:
+            v_lo, v_hi = _extend_bracket(f_diff, v_lo, v_hi)
+            v_root, converged = illinois(f_diff, v_hi, v_lo)
+            converged &= _check_v(f_p, v_root, ttemp[todo], pp[todo], ptol)
+            v[todo[converged]] = v_root[converged]
+            todo = todo[~converged]
+    for t in np.unique(ttemp[todo]):
+        group = todo[ttemp[todo] == t]
+        v[group] = _cal_v_branch(f_p, pp[group], t, v0, min_strain,
+                                 max_strain, n_points=n_points, ptol=ptol)
+    return v.reshape(shape)
+
+
+def _check_v(f_p, v, temp, p, ptol=1.e-6):
+    """
+    check volume roots, which should be positive, reproduce the pressure,
+    and be on a branch where pressure decreases with volume
+
+    :param f_p: function of volume and temperature returning pressure
+        as float
+    :param v: unit-cell volume in A^3, float array
+    :param temp: temperature in K, float array
+    :param p: pressure in GPa, float array
+    :param ptol: relative tolerance for pressure, with 1 GPa as the
+        smallest scale
+    :return: boolean array, True for valid roots
+    :note: internal function
+    """
+    h = 1.e-6
+    with np.errstate(all='ignore'):
+        ok = np.isfinite(v) & (v > 0.)
+        ok &= np.abs(f_p(v, temp) - p) <= ptol * np.maximum(np.abs(p), 1.)
+        ok &= f_p(v * (1. + h), temp) < f_p(v * (1. - h), temp)
+    return ok
+
+
+def _select_params(p, shape, idx):
+    """
+    select parameters for the elements of flattened arrays
+
+    :param p: parameters in OrderedDict, each in float or array
+    :param shape: shape of the arrays
+    :param idx: integer index array for the flattened arrays
+    :return: parameters in OrderedDict
+    :note: internal function
+    """
+    if p is None:
+        return None
+    return OrderedDict(
+        (key, value if np.ndim(value) == 0 else
+         np.broadcast_to(value, shape).ravel()[idx])
+        for key, value in p.items())
+
+
+def _solve_v_samples(f_p, p, temp, v0, min_strain=0.2, max_strain=1.0):
+    """
+    find unit-cell volumes for arrays of pressure, temperature, and
+    parameters, such as samples from Monte Carlo error propagation.
+    Elements with parameters from different samples are solved together.
+
+    :param f_p: function of volume, temperature, and index array for the
+        flattened arrays, returning pressure as float
+    :param p: pressure in GPa, float array
+    :param temp: temperature in K, float array
+    :param v0: unit-cell volume in A^3 at 1 bar, float or float array
+    :param min_strain: minimum strain searched for volume root
+    :param max_strain: maximum strain searched for volume root
+    :return: unit-cell volume in A^3, nan if no solution is found
+    :note: internal function
+    """
+    pp, ttemp, vv0 = np.broadcast_arrays(p, temp, v0)
+    shape = pp.shape
+    pp, ttemp, vv0 = pp.ravel(), ttemp.ravel(), vv0.ravel()
+    v = np.full(pp.size, np.nan)
+    at_ref = (pp <= 1.e-5) & (ttemp == 300.)
+    v[at_ref] = vv0[at_ref]
+    todo = np.flatnonzero(~at_ref)
+
+    def f_diff(v, idx):
+        return f_p(v, ttemp[todo[idx]], todo[idx]) - pp[todo[idx]]
+
+    with np.errstate(all='ignore'):
+        v_lo = vv0[todo] * min_strain
+        v_hi = vv0[todo] * max_strain
+        v_root, converged = illinois(f_diff, v_hi, v_lo)
+        v[todo[converged]] = v_root[converged]
+        todo, v_lo, v_hi = todo[~converged], v_lo[~converged], \
+            v_hi[~converged]
+        if todo.size != 0:
+            v_lo, v_hi = _extend_bracket(f_diff, v_lo, v_hi)
+            v_root, converged = illinois(f_diff, v_hi, v_lo)
+            v[todo[converged]] = v_root[converged]
+    return v.reshape(shape)
+
+
+def _extend_bracket(f_diff, v_lo, v_hi, max_expansion=2.):
+    """
+    extend volume brackets until they contain a sign change
+
+    :param f_diff: function of (v, idx) returning P(v) - p
+    :param v_lo: lower bounds of volume
+    :param v_hi: upper bounds of volume
+    :param max_expansion: maximum factor to increase v_hi
+    :return: extended v_lo and v_hi
+    :note: internal function
+    """
+    idx = np.arange(v_lo.size)
+    v_lo = v_lo.copy()
+    v_hi = v_hi.copy()
+    v_hi_limit = v_hi * max_expansion
+    for _ in range(30):
+        # pressure too high for v_lo, compress further
+        more = f_diff(v_lo, idx) < 0.
+        v_lo[more] *= 0.5
+        if not more.any():
+            break
+    for _ in range(30):
+        # pressure too low for v_hi, expand further
+        more = (f_diff(v_hi, idx) > 0.) & (v_hi < v_hi_limit)
+        v_hi[more] *= 1.05
+        if not more.any():
+            break
+    return v_lo, v_hi
+
+
+def _cal_v_branch(f_p, p, temp, v0, min_strain, max_strain, n_points=200,
+                  ptol=1.e-6):
+    """
+    find volumes on the stable branch of a P-V table at a single
+    temperature.  The branch starts from v0 * max_strain and continues to
+    smaller volumes as long as pressure is finite and increases, so roots
+    beyond a pressure maximum or a pole of P(V) are not used.  The table
+    gives the brackets, which are refined by the Illinois method.
+
+    :param f_p: function of volume and temperature returning pressure
+        as float
+    :param p: pressure in GPa, float array
+    :param temp: temperature in K, scalar
+    :param v0: unit-cell volume in A^3 at 1 bar
+    :param min_strain: minimum strain searched for volume root
+    :param max_strain: maximum strain searched for volume root
+    :param n_points: number of volume points for the table
+    :param ptol: relative tolerance for pressure, see _check_v
+    :return: unit-cell volume in A^3, nan if out of the branch
+    :note: internal function
+    """
+    v = np.full(p.size, np.nan)
+    v_array = np.logspace(np.log10(v0 * min_strain),
+                          np.log10(v0 * max_strain), n_points)
+    with np.errstate(all='ignore'):
+        p_array = f_p(v_array, np.full(n_points, temp))
+    stable = np.isfinite(p_array[:-1]) & np.isfinite(p_array[1:]) & \
+        (p_array[:-1] > p_array[1:])
+    unstable = np.flatnonzero(~stable)
+    i_min = 0 if unstable.size == 0 else unstable[-1] + 1
+    if i_min >= n_points - 1:
+        return v
+    # increasing pressure along the branch
+    p_b, v_b = p_array[i_min:][::-1], v_array[i_min:][::-1]
+    i = np.searchsorted(p_b, p)
+    inside = np.flatnonzero((i > 0) & (i < p_b.size))
+    if inside.size == 0:
+        return v
+    tt = np.full(inside.size, float(temp))
+
+    def f_diff(x, idx):
+        return f_p(x, tt[idx]) - p[inside[idx]]
+
+    with np.errstate(all='ignore'):
+        v_root, converged = illinois(f_diff, v_b[i[inside]],
+                                     v_b[i[inside] - 1])
+        converged &= _check_v(f_p, v_root, tt, p[inside], ptol)
+    v[inside[converged]] = v_root[converged]
+    return v
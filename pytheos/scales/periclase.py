@@ -20,6 +20,8 @@ class Jamieson1982(JHEOS):
     Jamieson et al. 1982. High pressure research in geophysics.
     """
 
+    reference = 'Jamieson et al. 1982. High pressure research in geophysics.'
+
     def __init__(self, v0=v_ref):
         mass_shock = mass * 1.e3  # to mass in g
         three_r = 1.23754 / (3. * n * constants.R / mass_shock) * 3. *\
@@ -33,10 +35,8 @@ class Jamieson1982(JHEOS):
                                     ('gamma0', uct.ufloat(1.32, 0.0)),
                                     ('q', uct.ufloat(1.0, 0.0)),
                                     ('theta0', uct.ufloat(760., 0.0))])
-        reference = 'Jamieson et al. 1982. High pressure research in \
-            geophysics.'
         JHEOS.__init__(self, n, z, mass_shock, params_hugoniot, params_therm,
-                       three_r=three_r, reference=reference)
+                       three_r=three_r)
 
 
 class Zha2000(MGEOS):
@@ -44,13 +44,16 @@ class Zha2000(MGEOS):
     Zha et al. 2000. PNAS 97, 13494+
     """
 
+    reference = 'Zha et al. 2000. PNAS 97, 13494+, no thermal pressure'
+    eqn_st = 'bm3'
+    p_range = (0., 55.)
+    t_range = (300., 300.)
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(160.2, 0.0)),
                                  ('k0p', uct.ufloat(4.03, 0.0))])
-        reference = 'Zha et al. 2000. PNAS 97, 13494+, no thermal pressure'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=None, 
-                       eqn_st='bm3', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=None)
 
 
 class Ye2017(MGEOS):
@@ -58,13 +61,16 @@ class Ye2017(MGEOS):
     Ye et al. 2017. JGR 10.1002/2016JB013811
     """
 
+    reference = 'Ye et al. 2017. JGR 10.1002/2016JB013811, no thermal pressure'
+    eqn_st = 'vinet'
+    p_range = (0., 140.)
+    t_range = (300., 300.)
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(160.3, 0.0)),
                                  ('k0p', uct.ufloat(4.109, 0.022))])
-        reference = 'Ye et al. 2017. JGR 10.1002/2016JB013811, no thermal pressure'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=None,
-                       eqn_st='vinet', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=None)
 
 
 class Speziale2001(MGEOS):
@@ -72,6 +78,11 @@ class Speziale2001(MGEOS):
     Speziale et al. 2001. JGR 106, 515+
     """
 
+    reference = 'Speziale et al. 2001. JGR 106, 515+'
+    eqn_st = 'bm3'
+    eqn_th = 'speziale'
+    p_range = (0., 52.)
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(160.2, 0.0)),
@@ -81,9 +92,7 @@ class Speziale2001(MGEOS):
                                  ('q0', uct.ufloat(1.65, 0.4)),
                                  ('q1', uct.ufloat(11.8, 0.2)),
                                  ('theta0', uct.ufloat(773., 0.0))])
-        reference = 'Speziale et al. 2001. JGR 106, 515+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='bm3', eqn_th='speziale', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Tange2009(MGEOS):
@@ -91,6 +100,10 @@ class Tange2009(MGEOS):
     Tange et al. 2009. JGR 114, B03208+
     """
 
+    reference = 'Tange, 2009, JGR 114, B03208+'
+    eqn_st = 'vinet'
+    eqn_th = 'tange'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(160.63, 0.18)),
@@ -100,9 +113,7 @@ class Tange2009(MGEOS):
                                  ('a', uct.ufloat(0.138, 0.019)),
                                  ('b', uct.ufloat(5.4, 1.1)),
                                  ('theta0', uct.ufloat(761., 13.0))])
-        reference = 'Tange, 2009, JGR 114, B03208+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='vinet', eqn_th='tange', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Dorogokupets2007(MGEOS):
@@ -110,6 +121,12 @@ class Dorogokupets2007(MGEOS):
     Dorogokupets and Dewaele. 2007. HPR 27, 431+
     """
 
+    reference = 'Dorogokupets and Dewaele. 2007. HPR 27, 431+'
+    eqn_st = 'vinet'
+    eqn_th = 'dorogokupets2007'
+    eqn_anh = 'zharkov'
+    eqn_el = 'zharkov'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(160.3, 0.0)),
@@ -125,12 +142,8 @@ class Dorogokupets2007(MGEOS):
         params_el = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('e0', uct.ufloat(0.e-6, 0.0)),
                                  ('g', uct.ufloat(0.0, 0.0))])
-        reference = 'Dorogokupets and Dewaele. 2007. HPR 27, 431+'
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       params_anh=params_anh, params_el=params_el,
-                       eqn_st='vinet', eqn_th='dorogokupets2007',
-                       eqn_anh='zharkov', eqn_el='zharkov',
-                       reference=reference)
+                       params_anh=params_anh, params_el=params_el)
 
 
 class Dorogokupets2015(MGEOS):
@@ -138,6 +151,12 @@ class Dorogokupets2015(MGEOS):
     Dorogokupets et al. 2015. RGG 56, 172+
     """
 
+    reference = 'Dorogokupets et al. 2015. RGG 56, 172+'
+    eqn_st = 'kunc'
+    eqn_th = 'dorogokupets2015'
+    eqn_anh = 'zharkov'
+    eqn_el = 'zharkov'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(160.3, 0.0)),
@@ -156,9 +175,5 @@ class Dorogokupets2015(MGEOS):
         params_el = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('e0', uct.ufloat(0.e-6, 0.0)),
                                  ('g', uct.ufloat(0.0, 0.0))])
-        reference = 'Dorogokupets et al. 2015. RGG 56, 172+'
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       params_anh=params_anh, params_el=params_el,
-                       eqn_st='kunc', eqn_th='dorogokupets2015',
-                       eqn_anh='zharkov', eqn_el='zharkov',
-                       reference=reference)
+                       params_anh=params_anh, params_el=params_el)
@@ -21,6 +21,10 @@ class Fei2004(MGEOS):
     Fei et al. 2004 PEPI 143-144, 515+
     """
 
+    reference = 'Fei et al. 2004 PEPI 143-144, 515+'
+    eqn_st = 'bm3'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(273., 3.0)),
@@ -29,9 +33,7 @@ class Fei2004(MGEOS):
                                  ('gamma0', uct.ufloat(2.69, 0.03)),
                                  ('q', uct.ufloat(0.5, 0.5)),
                                  ('theta0', uct.ufloat(230., 0.0))])
-        reference = 'Fei et al. 2004 PEPI 143-144, 515+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='bm3', eqn_th='constq', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Fei2007vinet(MGEOS):
@@ -39,6 +41,10 @@ class Fei2007vinet(MGEOS):
     Fei et al. 2007 PNAS 104, 9182+
     """
 
+    reference = 'Fei et al. 2007 PNAS 104, 9182+'
+    eqn_st = 'vinet'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(277., 0.0)),
@@ -47,9 +53,7 @@ class Fei2007vinet(MGEOS):
                                  ('gamma0', uct.ufloat(2.72, 0.03)),
                                  ('q', uct.ufloat(0.5, 0.5)),
                                  ('theta0', uct.ufloat(230., 0.0))])
-        reference = 'Fei et al. 2007 PNAS 104, 9182+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='vinet', eqn_th='constq', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Fei2007bm3(MGEOS):
@@ -57,6 +61,10 @@ class Fei2007bm3(MGEOS):
     Fei et al. 2007 PNAS 104, 9182+
     """
 
+    reference = 'Fei et al. 2007 PNAS 104, 9182+'
+    eqn_st = 'bm3'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(277., 0.0)),
@@ -65,9 +73,7 @@ class Fei2007bm3(MGEOS):
                                  ('gamma0', uct.ufloat(2.72, 0.03)),
                                  ('q', uct.ufloat(0.5, 0.5)),
                                  ('theta0', uct.ufloat(230., 0.0))])
-        reference = 'Fei et al. 2007 PNAS 104, 9182+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='bm3', eqn_th='constq', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Dorfman2012(MGEOS):
@@ -75,13 +81,16 @@ class Dorfman2012(MGEOS):
     Dorfman et al. 2012, JGR 117, B08210
     """
 
+    reference = 'Dorfman et al. 2012, JGR 117, B08210'
+    eqn_st = 'vinet'
+    p_range = (0., 250.)
+    t_range = (300., 300.)
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(277., 0.0)),
                                  ('k0p', uct.ufloat(5.43, 0.02))])
-        reference = 'Dorfman et al. 2012, JGR 117, B08210'
-        MGEOS.__init__(self, n, z, params_st=params_st,
-                       eqn_st='vinet', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st)
 
 
 class Ye2017(MGEOS):
@@ -89,13 +98,16 @@ class Ye2017(MGEOS):
     Ye et al. 2017. JGR 10.1002/2016JB013811
     """
 
+    reference = 'Ye et al. 2017. JGR 10.1002/2016JB013811'
+    eqn_st = 'vinet'
+    p_range = (0., 140.)
+    t_range = (300., 300.)
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(277.3, 0.0)),
                                  ('k0p', uct.ufloat(5.226, 0.033))])
-        reference = 'Ye et al. 2017. JGR 10.1002/2016JB013811'
-        MGEOS.__init__(self, n, z, params_st=params_st,
-                       eqn_st='vinet', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st)
 
 
 class Yokoo2009(MGEOS):
@@ -103,6 +115,11 @@ class Yokoo2009(MGEOS):
     Yokoo et al. 2009. PRB 80, 104114
     """
 
+    reference = 'Yokoo et al. 2009. PRB 80, 104114'
+    eqn_st = 'bm3'
+    eqn_th = 'tange'
+    eqn_el = 'tsuchiya'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(276.4, 0.0)),
@@ -117,11 +134,8 @@ class Yokoo2009(MGEOS):
                                  ('b', uct.ufloat(-5.6486e-7, 0.0)),
                                  ('c', uct.ufloat(2.67e-7, 0.0)),
                                  ('d', uct.ufloat(-2.8531e-11, 0.0))])
-        reference = 'Yokoo et al. 2009. PRB 80, 104114'
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       params_el=params_el,
-                       eqn_st='bm3', eqn_th='tange', eqn_el='tsuchiya',
-                       reference=reference)
+                       params_el=params_el)
 
 
 class Jamieson1982(JHEOS):
@@ -129,6 +143,8 @@ class Jamieson1982(JHEOS):
     Jamieson et al. 1982. High pressure research in geophysics.
     """
 
+    reference = 'Jamieson et al. 1982. High pressure research in geophysics.'
+
     def __init__(self, v0=v_ref):
         mass_shock = mass * 1.e3  # to mass in g
         three_r = 0.12786 / (3. * n * constants.R / (mass_shock)) *\
@@ -142,9 +158,8 @@ class Jamieson1982(JHEOS):
                                     ('gamma0', uct.ufloat(2.40, 0.0)),
                                     ('q', uct.ufloat(1.0, 0.0)),
                                     ('theta0', uct.ufloat(200., 0.0))])
-        reference = 'Jamieson et al. 1982. High pressure research in geophysics.'
         JHEOS.__init__(self, n, z, mass_shock, params_hugoniot, params_therm,
-                       three_r=three_r, reference=reference)
+                       three_r=three_r)
 
 
 class Holmes1989(MGEOS):
@@ -152,6 +167,11 @@ class Holmes1989(MGEOS):
     Holmes et al. 1989. JAP 66, 2962+
     """
 
+    reference = 'Holmes et al. 1989. JAP 66, 2962+'
+    eqn_st = 'vinet'
+    eqn_th = 'alphakt'
+    p_range = (0., 660.)
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(266., 0.0)),
@@ -159,9 +179,7 @@ class Holmes1989(MGEOS):
         params_th = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('alpha0', uct.ufloat(0.261e-4, 0.0)),
                                  ('k0', uct.ufloat(266., 0.0))])
-        reference = 'Holmes et al. 1989. JAP 66, 2962+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='vinet', eqn_th='alphakt', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Dorogokupets2007(MGEOS):
@@ -169,6 +187,12 @@ class Dorogokupets2007(MGEOS):
     Dorogokupets and Dewaele. 2007. HPR 27, 431+
     """
 
+    reference = 'Dorogokupets and Dewaele. 2007. HPR 27, 431+'
+    eqn_st = 'vinet'
+    eqn_th = 'dorogokupets2007'
+    eqn_anh = 'zharkov'
+    eqn_el = 'zharkov'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(277.3, 0.0)),
@@ -184,12 +208,8 @@ class Dorogokupets2007(MGEOS):
         params_el = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('e0', uct.ufloat(260.e-6, 0.0)),
                                  ('g', uct.ufloat(2.4, 0.0))])
-        reference = 'Dorogokupets and Dewaele. 2007. HPR 27, 431+'
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       params_anh=params_anh, params_el=params_el,
-                       eqn_st='vinet', eqn_th='dorogokupets2007',
-                       eqn_anh='zharkov', eqn_el='zharkov',
-                       reference=reference)
+                       params_anh=params_anh, params_el=params_el)
 
 
 class Dorogokupets2015(MGEOS):
@@ -197,6 +217,12 @@ class Dorogokupets2015(MGEOS):
     Dorogokupets et al. 2015. RGG 56, 172+
     """
 
+    reference = 'Dorogokupets et al. 2015. RGG 56, 172+'
+    eqn_st = 'vinet'
+    eqn_th = 'dorogokupets2015'
+    eqn_anh = 'zharkov'
+    eqn_el = 'zharkov'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(275.0, 0.0)),
@@ -215,9 +241,5 @@ class Dorogokupets2015(MGEOS):
         params_el = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('e0', uct.ufloat(79.e-6, 0.0)),
                                  ('g', uct.ufloat(0.26, 0.0))])
-        reference = 'Dorogokupets et al. 2015. RGG 56, 172+'
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       params_anh=params_anh, params_el=params_el,
-                       eqn_st='vinet', eqn_th='dorogokupets2015',
-                       eqn_anh='zharkov', eqn_el='zharkov',
-                       reference=reference)
+                       params_anh=params_anh, params_el=params_el)
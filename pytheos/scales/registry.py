@@ -0,0 +1,111 @@
+"""
+Registry of the pressure scales in pytheos.scales.  Scales are referred
+to by keys in 'module/class' format, such as 'gold/Fei2007bm3'.
+Modules are imported and scales are constructed only when they are
+requested, and the constructed scales are cached.
+"""
+import inspect
+import importlib
+from collections import OrderedDict
+from .objs import MGEOS, JHEOS
+
+# module names and materials
+materials = OrderedDict([('gold', 'Au'), ('platinum', 'Pt'),
+                         ('periclase', 'MgO'), ('sodium_chloride', 'NaCl'),
+                         ('sodium_chloride_b2', 'NaCl-B2'), ('neon', 'Ne')])
+
+_scales = {}
+
+
+def get_scale(key, **kwargs):
+    """
+    get a pressure scale by key
+
+    :param key: 'module/class', such as 'gold/Fei2007bm3'
+    :param kwargs: arguments for the scale class, such as v0
+    :return: scale object
+    :note: the same object is returned for the same key and arguments.
+        Make a copy with copy.deepcopy before changing its parameters.
+    """
+    cache_key = (key, tuple(sorted(kwargs.items())))
+    if cache_key not in _scales:
+        _scales[cache_key] = _get_class(key)(**kwargs)
+    return _scales[cache_key]
+
+
+def list_scales(material=None):
+    """
+    list available pressure scales
+
+    :param material: if given, list only the scales for this module name
+        or material, such as 'gold' or 'Au'
+    :return: list of OrderedDicts of key, material, type, equations,
+        reference, p_range in GPa, and t_range in K
+    :note: all scale modules are imported, but the scales are not
+        constructed, as the information is read from the class attributes.
+        p_range and t_range are None if the reference of the scale does
+        not give them.
+    """
+    result = []
+    for module_name, material_name in materials.items():
+        if (material is not None) and \
+                (material not in (module_name, material_name)):
+            continue
+        for name in _find_classes(module_name):
+            key = module_name + '/' + name
+            cls = _get_class(key)
+            info = OrderedDict([
+                ('key', key), ('material', material_name),
+                ('type', 'MGEOS' if issubclass(cls, MGEOS) else 'JHEOS')])
+            if issubclass(cls, MGEOS):
+                info['eqn_st'] = cls.eqn_st
+                info['eqn_th'] = cls.eqn_th
+                info['eqn_anh'] = cls.eqn_anh
+                info['eqn_el'] = cls.eqn_el
+            else:
+                info['eqn_st'] = 'hugoniot'
+                info['eqn_th'] = 'constq'
+                info['eqn_anh'] = None
+                info['eqn_el'] = None
+            info['reference'] = cls.reference
+            info['p_range'] = cls.p_range
+            info['t_range'] = cls.t_range
+            result.append(info)
+    return result
+
+
+def _get_class(key):
+    """
+    import the module and get the scale class for a key
+
+    :param key: 'module/class'
+    :return: scale class
+    :note: internal function
+    """
+    try:
+        module_name, name = key.split('/')
+    except ValueError:
+        raise ValueError('Key should be in module/class format, such as '
+                         'gold/Fei2007bm3.')
+    if module_name not in materials:
+        raise ValueError('Unknown module: ' + module_name +
+                         '.  Available modules are ' +
+                         ', '.join(materials.keys()) + '.')
+    if name not in _find_classes(module_name):
+        raise ValueError('Unknown scale: ' + key + '.')
+    module = importlib.import_module('.' + module_name, __package__)
+    return getattr(module, name)
+
+
+def _find_classes(module_name):
+    """
+    find scale classes defined in a module
+
+    :param module_name: name of the module in pytheos.scales
+    :return: list of class names
+    :note: internal function
+    """
+    module = importlib.import_module('.' + module_name, __package__)
+    return [name for name, cls in inspect.getmembers(module, inspect.isclass)
+            if issubclass(cls, (MGEOS, JHEOS)) and
+            (cls.__module__ == module.__name__)]
@@ -19,6 +19,12 @@ class Dorogokupets2007(MGEOS):
     Dorogokupets and Dewaele. 2007. HPR 27, 431+
     """
 
+    reference = 'Dorogokupets and Dewaele. 2007. HPR 27, 431+'
+    eqn_st = 'vinet'
+    eqn_th = 'dorogokupets2007'
+    eqn_anh = 'zharkov'
+    eqn_el = 'zharkov'
+
     def __init__(self, v0=v_ref):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(23.83, 0.0)),
@@ -34,9 +40,5 @@ class Dorogokupets2007(MGEOS):
         params_el = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('e0', uct.ufloat(0.e-6, 0.0)),
                                  ('g', uct.ufloat(0.0, 0.0))])
-        reference = 'Dorogokupets and Dewaele. 2007. HPR 27, 431+'
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       params_anh=params_anh, params_el=params_el,
-                       eqn_st='vinet', eqn_th='dorogokupets2007',
-                       eqn_anh='zharkov', eqn_el='zharkov',
-                       reference=reference)
+                       params_anh=params_anh, params_el=params_el)
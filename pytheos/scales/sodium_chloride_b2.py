@@ -22,6 +22,12 @@ class Dorogokupets2007(MGEOS):
     However, table for Fei2007 in this paper does not seem to be correct even for 300 K isotherm.
     """
 
+    reference = 'Dorogokupets and Dewaele. 2007. HPR 27, 431+'
+    eqn_st = 'vinet'
+    eqn_th = 'dorogokupets2007'
+    eqn_anh = 'zharkov'
+    eqn_el = 'zharkov'
+
     def __init__(self, v0=v_ref_dorogokupets):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(29.72, 0.0)),
@@ -37,12 +43,8 @@ class Dorogokupets2007(MGEOS):
         params_el = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('e0', uct.ufloat(0.e-6, 0.0)),
                                  ('g', uct.ufloat(0.0, 0.0))])
-        reference = 'Dorogokupets and Dewaele. 2007. HPR 27, 431+'
         MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       params_anh=params_anh, params_el=params_el,
-                       eqn_st='vinet', eqn_th='dorogokupets2007',
-                       eqn_anh='zharkov', eqn_el='zharkov',
-                       reference=reference)
+                       params_anh=params_anh, params_el=params_el)
 
 class Fei2007vinet(MGEOS):
     """
@@ -50,6 +52,10 @@ class Fei2007vinet(MGEOS):
     I can reproduce their figure.
     """
 
+    reference = 'Fei et al. 2007 PNAS 104, 9182+'
+    eqn_st = 'vinet'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref_fei):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(26.86, 2.9)),
@@ -58,9 +64,7 @@ class Fei2007vinet(MGEOS):
                                  ('gamma0', uct.ufloat(1.7, 0.0)),
                                  ('q', uct.ufloat(0.5, 0.3)),
                                  ('theta0', uct.ufloat(290., 0.0))])
-        reference = 'Fei et al. 2007 PNAS 104, 9182+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='vinet', eqn_th='constq', reference=reference)
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
 
 
 class Fei2007bm3(MGEOS):
@@ -69,6 +73,10 @@ class Fei2007bm3(MGEOS):
     I can reproduce their figure.
     """
 
+    reference = 'Fei et al. 2007 PNAS 104, 9182+'
+    eqn_st = 'bm3'
+    eqn_th = 'constq'
+
     def __init__(self, v0=v_ref_fei):
         params_st = OrderedDict([('v0', uct.ufloat(v0, ef_v)),
                                  ('k0', uct.ufloat(30.69, 2.9)),
@@ -77,6 +85,4 @@ class Fei2007bm3(MGEOS):
                                  ('gamma0', uct.ufloat(1.7, 0.0)),
                                  ('q', uct.ufloat(0.5, 0.3)),
                                  ('theta0', uct.ufloat(290., 0.0))])
-        reference = 'Fei et al. 2007 PNAS 104, 9182+'
-        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th,
-                       eqn_st='bm3', eqn_th='constq', reference=reference)
\ No newline at end of file
+        MGEOS.__init__(self, n, z, params_st=params_st, params_th=params_th)
@@ -0,0 +1,443 @@
+"""
+Tabulated pressure scales.  Pressure and its derivatives are calculated
+once on a regular (V, T) grid, and pressure and volume are interpolated
+with bicubic Hermite polynomials, which is much faster than the equations
+and root finding for large arrays.  Gibbs free energy is tabulated on a
+regular (P, T) grid in the same way, see GibbsTable.
+"""
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+
+
+class PVTTable(object):
+    """
+    P-V-T table on a regular grid of volume and temperature
+    """
+
+    def __init__(self, v, temp, p, p_v, p_t, p_vt, max_error=None,
+                 max_error_v=None, lookup=None):
+        """
+        :param v: unit-cell volume in A^3 of the grid, evenly spaced
+        :param temp: temperature in K of the grid, evenly spaced
+        :param p: pressure in GPa in (len(v), len(temp)) array
+        :param p_v: dP/dV in GPa/A^3 in the same shape as p
+        :param p_t: dP/dT in GPa/K in the same shape as p
+        :param p_vt: d^2P/dVdT in the same shape as p
+        :param max_error: estimated maximum error of pressure in GPa
+        :param max_error_v: estimated maximum error of volume in A^3
+        :param lookup: dictionary of coeffs, coeffs_node, and counts from
+            another table of the same grid, to skip the calculation
+        """
+        self.v = np.asarray(v, dtype=float)
+        self.temp = np.asarray(temp, dtype=float)
+        self.p = np.asarray(p, dtype=float)
+        self.p_v = np.asarray(p_v, dtype=float)
+        self.p_t = np.asarray(p_t, dtype=float)
+        self.p_vt = np.asarray(p_vt, dtype=float)
+        self.max_error = max_error
+        self.max_error_v = max_error_v
+        self.dv = self.v[1] - self.v[0]
+        self.dt = self.temp[1] - self.temp[0]
+        self.n_p = 4 * self.v.size
+        self.p_min, self.p_max = self.p.min(), self.p.max()
+        self.dp = (self.p_max - self.p_min) / (self.n_p - 1)
+        if lookup is not None:
+            self.coeffs = lookup['coeffs']
+            self.coeffs_node = lookup['coeffs_node']
+            self.counts = lookup['counts']
+            return
+        if np.any(self.p_v >= 0.):
+            raise ValueError('Pressure has to decrease with volume in '
+                             'the whole table.  Narrow the volume range.')
+        coeffs = cal_bicubic_coeffs(self.p, self.p_v, self.p_t, self.p_vt,
+                                    self.dv, self.dt)
+        self.coeffs = np.ascontiguousarray(coeffs.reshape(-1, 16).T)
+        # cubic polynomials in temperature at the grid volumes, for the
+        # volume index iv and temperature interval it at
+        # iv * (len(temp) - 1) + it
+        self.coeffs_node = np.ascontiguousarray(np.concatenate(
+            [coeffs[:, :, 0, :], coeffs[-1:, :, :, :].sum(axis=2)],
+            axis=0).reshape(-1, 4).T)
+        # number of grid volumes with pressure above evenly spaced
+        # pressures on each isotherm, for the initial brackets in cal_v
+        p_grid = np.linspace(self.p_min, self.p_max, self.n_p)
+        self.counts = np.ascontiguousarray(np.array(
+            [np.searchsorted(-self.p[:, j], -p_grid)
+             for j in range(self.temp.size)]).ravel())
+
+    def save(self, filename):
+        """
+        save the table to a npz file
+
+        :param filename: name of the file
+        """
+        np.savez(filename, v=self.v, temp=self.temp, p=self.p, p_v=self.p_v,
+                 p_t=self.p_t, p_vt=self.p_vt,
+                 max_error=np.nan if self.max_error is None
+                 else self.max_error,
+                 max_error_v=np.nan if self.max_error_v is None
+                 else self.max_error_v)
+
+    def _cubic_in_v(self, cell, ut):
+        """
+        get cubic polynomials in volume at given temperatures
+
+        :param cell: indices of grid cells, iv * (len(temp) - 1) + it for
+            volume interval iv and temperature interval it
+        :param ut: local coordinates of temperature in [0, 1]
+        :return: list of coefficients from the constant term
+        :note: internal function
+        """
+        c = [np.take(x, cell) for x in self.coeffs]
+        return [((c[4 * a + 3] * ut + c[4 * a + 2]) * ut + c[4 * a + 1]) *
+                ut + c[4 * a] for a in range(4)]
+
+    def _p_node(self, node, ut):
+        """
+        calculate pressure at grid volumes
+
+        :param node: iv * (len(temp) - 1) + it for grid volume iv and
+            temperature interval it
+        :param ut: local coordinates of temperature in [0, 1]
+        :return: pressure in GPa
+        :note: internal function
+        """
+        c0, c1, c2, c3 = [np.take(c, node) for c in self.coeffs_node]
+        return ((c3 * ut + c2) * ut + c1) * ut + c0
+
+    def cal_p(self, v, temp):
+        """
+        calculate pressure from the table
+
+        :param v: unit-cell volume in A^3
+        :param temp: temperature in K
+        :return: pressure in GPa, nan out of the table
+        :note: cannot handle uncertainties
+        """
+        v, temp = np.broadcast_arrays(np.asarray(v, dtype=float),
+                                      np.asarray(temp, dtype=float))
+        shape = v.shape
+        iv, uv, in_v = _locate(v.ravel(), self.v, self.dv)
+        it, ut, in_t = _locate(temp.ravel(), self.temp, self.dt)
+        c0, c1, c2, c3 = self._cubic_in_v(iv * (self.temp.size - 1) + it,
+                                          ut)
+        p = ((c3 * uv + c2) * uv + c1) * uv + c0
+        p[~(in_v & in_t)] = np.nan
+        return p.reshape(shape)
+
+    def cal_v(self, p, temp, xtol=1.e-12, maxiter=20):
+        """
+        calculate unit-cell volume from the table.  The volume interval is
+        found by binary search on each isotherm, starting from brackets
+        looked up from the grid, and the root in the interval by Newton
+        iterations.
+
+        :param p: pressure in GPa
+        :param temp: temperature in K
+        :param xtol: tolerance for the local coordinate of volume
+        :param maxiter: maximum number of Newton iterations
+        :return: unit-cell volume in A^3, nan out of the table
+        :note: cannot handle uncertainties
+        """
+        p, temp = np.broadcast_arrays(np.asarray(p, dtype=float),
+                                      np.asarray(temp, dtype=float))
+        shape = p.shape
+        p = p.ravel()
+        n_v, n_t = self.v.size, self.temp.size - 1
+        it, ut, in_t = _locate(temp.ravel(), self.temp, self.dt)
+        # brackets from the two isotherms of the temperature interval,
+        # pressure decreases with volume
+        n_p = self.n_p
+        m = np.clip(((p - self.p_min) / self.dp).astype(np.int64), 0,
+                    n_p - 2)
+        c_lo = np.minimum(np.take(self.counts, it * n_p + m + 1),
+                          np.take(self.counts, (it + 1) * n_p + m + 1))
+        c_hi = np.maximum(np.take(self.counts, it * n_p + m),
+                          np.take(self.counts, (it + 1) * n_p + m))
+        lo = np.clip(c_lo - 1, 0, n_v - 2)
+        hi = np.clip(c_hi, lo + 1, n_v - 1)
+        with np.errstate(invalid='ignore'):
+            inside = in_t & (self._p_node(it, ut) >= p) & \
+                (self._p_node((n_v - 1) * n_t + it, ut) <= p)
+            # temperature interpolation may leave the bracket
+            bad = inside & ~((self._p_node(lo * n_t + it, ut) >= p) &
+                             (self._p_node(hi * n_t + it, ut) <= p))
+        lo[bad], hi[bad] = 0, n_v - 1
+        active = np.flatnonzero(hi - lo > 1)
+        while active.size != 0:
+            mid = (lo[active] + hi[active]) // 2
+            go_up = self._p_node(mid * n_t + it[active], ut[active]) >= \
+                p[active]
+            lo[active[go_up]] = mid[go_up]
+            hi[active[~go_up]] = mid[~go_up]
+            active = active[hi[active] - lo[active] > 1]
+        c0, c1, c2, c3 = self._cubic_in_v(lo * n_t + it, ut)
+        c0 = c0 - p
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # start from linear interpolation
+            u = np.clip(-c0 / (c1 + c2 + c3), 0., 1.)
+            for i in range(maxiter):
+                du = (((c3 * u + c2) * u + c1) * u + c0) / \
+                    ((3. * c3 * u + 2. * c2) * u + c1)
+                u = np.clip(u - du, 0., 1.)
+                if not np.any(np.abs(du) > xtol):
+                    break
+        v = self.v[lo] + u * self.dv
+        v[~inside] = np.nan
+        return v.reshape(shape)
+
+
+class GibbsTable(object):
+    """
+    Gibbs free energy table on a regular grid of pressure and temperature
+    """
+
+    def __init__(self, p, temp, g, g_p, g_t, g_pt, max_error=None):
+        """
+        :param p: pressure in GPa of the grid, evenly spaced
+        :param temp: temperature in K of the grid, evenly spaced
+        :param g: Gibbs free energy in J/mol in (len(p), len(temp)) array
+        :param g_p: dG/dP in J/mol/GPa, molar volume times 1e9, in the
+            same shape as g
+        :param g_t: dG/dT in J/mol/K, negative entropy, in the same shape
+        :param g_pt: d^2G/dPdT in the same shape as g
+        :param max_error: estimated maximum error of G in J/mol
+        """
+        self.p = np.asarray(p, dtype=float)
+        self.temp = np.asarray(temp, dtype=float)
+        self.g = np.asarray(g, dtype=float)
+        self.g_p = np.asarray(g_p, dtype=float)
+        self.g_t = np.asarray(g_t, dtype=float)
+        self.g_pt = np.asarray(g_pt, dtype=float)
+        self.max_error = max_error
+        self.dp = self.p[1] - self.p[0]
+        self.dt = self.temp[1] - self.temp[0]
+        self.coeffs = cal_bicubic_coeffs(self.g, self.g_p, self.g_t,
+                                         self.g_pt, self.dp, self.dt)
+
+    def cal_g(self, p, temp, derivatives=False):
+        """
+        calculate Gibbs free energy from the table
+
+        :param p: pressure in GPa
+        :param temp: temperature in K
+        :param derivatives: if True, dG/dP and dG/dT are also returned
+        :return: Gibbs free energy in J/mol, nan out of the table.
+            With derivatives, also dG/dP in J/mol/GPa and dG/dT in J/mol/K.
+        :note: cannot handle uncertainties
+        """
+        p, temp = np.broadcast_arrays(np.asarray(p, dtype=float),
+                                      np.asarray(temp, dtype=float))
+        shape = p.shape
+        ip, up, in_p = _locate(p.ravel(), self.p, self.dp)
+        it, ut, in_t = _locate(temp.ravel(), self.temp, self.dt)
+        c = self.coeffs[ip, it]
+        # powers of the local coordinates and their derivatives
+        pow_p = np.stack([np.ones_like(up), up, up * up, up * up * up])
+        pow_t = np.stack([np.ones_like(ut), ut, ut * ut, ut * ut * ut])
+        g = np.einsum('iab,ai,bi->i', c, pow_p, pow_t)
+        g[~(in_p & in_t)] = np.nan
+        if not derivatives:
+            return g.reshape(shape)
+        zeros = np.zeros_like(up)
+        dpow_p = np.stack([zeros, np.ones_like(up), 2. * up, 3. * up * up])
+        dpow_t = np.stack([zeros, np.ones_like(ut), 2. * ut, 3. * ut * ut])
+        g_p = np.einsum('iab,ai,bi->i', c, dpow_p, pow_t) / self.dp
+        g_t = np.einsum('iab,ai,bi->i', c, pow_p, dpow_t) / self.dt
+        g_p[np.isnan(g)], g_t[np.isnan(g)] = np.nan, np.nan
+        return g.reshape(shape), g_p.reshape(shape), g_t.reshape(shape)
+
+
+def cal_bicubic_coeffs(f, f_x, f_y, f_xy, dx, dy):
+    """
+    calculate coefficients of bicubic Hermite polynomials,
+    f = sum(c[a, b] * s^a * u^b) with local coordinates s and u in
+    [0, 1] for x and y
+
+    :param f: values on a regular grid in (len(x), len(y)) array
+    :param f_x: df/dx in the same shape as f
+    :param f_y: df/dy in the same shape as f
+    :param f_xy: d^2f/dxdy in the same shape as f
+    :param dx: grid spacing of x
+    :param dy: grid spacing of y
+    :return: coefficients in (len(x) - 1, len(y) - 1, 4, 4) array
+    :note: internal function
+    """
+    m = np.array([[1., 0., 0., 0.], [0., 0., 1., 0.],
+                  [-3., 3., -2., -1.], [2., -2., 1., 1.]])
+
+    def corners(x):
+        return np.stack([np.stack([x[:-1, :-1], x[:-1, 1:]], axis=-1),
+                         np.stack([x[1:, :-1], x[1:, 1:]], axis=-1)],
+                        axis=-2)
+
+    a = np.block([[corners(f), corners(f_y * dy)],
+                  [corners(f_x * dx), corners(f_xy * dx * dy)]])
+    return np.ascontiguousarray(m @ a @ m.T)
+
+
+def _locate(x, x_grid, dx):
+    """
+    find grid intervals and local coordinates
+
+    :param x: float array
+    :param x_grid: evenly spaced grid
+    :param dx: grid spacing
+    :return: indices of the intervals, local coordinates in [0, 1],
+        and boolean array for the points in the grid
+    :note: internal function
+    """
+    inside = (x >= x_grid[0]) & (x <= x_grid[-1])
+    u = np.clip((x - x_grid[0]) / dx, 0., x_grid.size - 1)
+    idx = np.minimum(u.astype(np.int64), x_grid.size - 2)
+    return idx, u - idx, inside
+
+
+def make_gibbs_table(f_g, p_range, t_range, n_p=1000, n_t=1000,
+                     error=True):
+    """
+    make a Gibbs free energy table from a function giving G and its
+    derivatives
+
+    :param f_g: function of pressure and temperature arrays returning G,
+        dG/dP, dG/dT, and d^2G/dPdT, see GibbsTable
+    :param p_range: minimum and maximum pressures in GPa
+    :param t_range: minimum and maximum temperatures in K
+    :param n_p: number of grid pressures
+    :param n_t: number of grid temperatures
+    :param error: if True, error of the table is estimated at the centers
+        of the grid cells, which costs another call of f_g
+    :return: GibbsTable
+    :note: f_g is called once for the whole grid
+    """
+    p = np.linspace(p_range[0], p_range[1], n_p)
+    temp = np.linspace(t_range[0], t_range[1], n_t)
+    pp, tt = np.meshgrid(p, temp, indexing='ij')
+    table = GibbsTable(p, temp, *f_g(pp, tt))
+    if error:
+        p_c = 0.5 * (pp[1:, 1:] + pp[:-1, :-1])
+        t_c = 0.5 * (tt[1:, 1:] + tt[:-1, :-1])
+        table.max_error = np.nanmax(
+            np.abs(table.cal_g(p_c, t_c) - f_g(p_c, t_c)[0]))
+    return table
+
+
+def make_table(f_p, v_range, t_range, n_v=256, n_t=64, h=1.e-20):
+    """
+    make a P-V-T table from a pressure function
+
+    :param f_p: function of volume and temperature returning pressure,
+        which has to handle complex numbers
+    :param v_range: minimum and maximum unit-cell volumes in A^3
+    :param t_range: minimum and maximum temperatures in K
+    :param n_v: number of grid volumes
+    :param n_t: number of grid temperatures
+    :param h: relative step for complex-step derivatives
+    :return: PVTTable
+    :note: error of the table is estimated at the centers of the grid cells
+    """
+    v = np.linspace(v_range[0], v_range[1], n_v)
+    temp = np.linspace(t_range[0], t_range[1], n_t)
+    vv, tt = np.meshgrid(v, temp, indexing='ij')
+    p = np.real(f_p(vv, tt))
+    step_v, step_t = h * vv, h * tt
+    p_v = np.imag(f_p(vv + 1.j * step_v, tt)) / step_v
+    p_t = np.imag(f_p(vv, tt + 1.j * step_t)) / step_t
+    # mixed derivative from central difference of complex-step dP/dV
+    dt = 1.e-4 * tt
+    p_vt = (np.imag(f_p(vv + 1.j * step_v, tt + dt)) -
+            np.imag(f_p(vv + 1.j * step_v, tt - dt))) / step_v / (2. * dt)
+    table = PVTTable(v, temp, p, p_v, p_t, p_vt)
+    v_c = 0.5 * (vv[1:, 1:] + vv[:-1, :-1])
+    t_c = 0.5 * (tt[1:, 1:] + tt[:-1, :-1])
+    p_c = np.real(f_p(v_c, t_c))
+    error = np.abs(table.cal_p(v_c, t_c) - p_c)
+    table.max_error = error.max()
+    table.max_error_v = (error / np.abs(
+        0.25 * (p_v[1:, 1:] + p_v[:-1, :-1] + p_v[1:, :-1] +
+                p_v[:-1, 1:]))).max()
+    return table
+
+
+def load_table(filename):
+    """
+    load a P-V-T table from a npz file
+
+    :param filename: name of the file
+    :return: PVTTable
+    """
+    with np.load(filename) as f:
+        max_error = float(f['max_error'])
+        max_error_v = float(f['max_error_v'])
+        return PVTTable(
+            f['v'], f['temp'], f['p'], f['p_v'], f['p_t'], f['p_vt'],
+            max_error=None if np.isnan(max_error) else max_error,
+            max_error_v=None if np.isnan(max_error_v) else max_error_v)
+
+
+def cached_table(f_make, name, key, cache_dir):
+    """
+    get a P-V-T table from the cache directory, or make it and write it
+    to the cache.  Arrays in the cache are read with memory mapping, so
+    processes using the same table share one copy in memory.
+
+    :param f_make: function without argument returning PVTTable
+    :param name: name of the table, such as the class name of the scale
+    :param key: parameters, equations, and grid which define the table,
+        in any object with repr
+    :param cache_dir: cache directory
+    :return: PVTTable
+    :note: a table is written in a temporary directory and renamed, so
+        other processes never read a partially written table
+    """
+    path = os.path.join(cache_dir, name + '_' + hashlib.sha1(
+        repr(key).encode()).hexdigest()[:16])
+    if not os.path.isdir(path):
+        table = f_make()
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp_')
+        try:
+            os.chmod(tmp_path, 0o755)
+            for array_name in _cached_arrays:
+                np.save(os.path.join(tmp_path, array_name + '.npy'),
+                        getattr(table, array_name))
+            with open(os.path.join(tmp_path, 'info.json'), 'w') as f:
+                json.dump({'name': name, 'key': repr(key),
+                           'max_error': table.max_error,
+                           'max_error_v': table.max_error_v}, f)
+            os.rename(tmp_path, path)
+        except OSError:
+            # another process has written the same table
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+    return load_cached_table(path)
+
+
+def load_cached_table(path):
+    """
+    load a P-V-T table from a directory written by cached_table
+
+    :param path: directory of the table
+    :return: PVTTable with memory-mapped arrays
+    """
+    arrays = dict(
+        (array_name, np.load(os.path.join(path, array_name + '.npy'),
+                             mmap_mode='r'))
+        for array_name in _cached_arrays)
+    with open(os.path.join(path, 'info.json')) as f:
+        info = json.load(f)
+    return PVTTable(
+        arrays['v'], arrays['temp'], arrays['p'], arrays['p_v'],
+        arrays['p_t'], arrays['p_vt'], max_error=info['max_error'],
+        max_error_v=info['max_error_v'],
+        lookup=dict((array_name, arrays[array_name])
+                    for array_name in ['coeffs', 'coeffs_node', 'counts']))
+
+
+_cached_arrays = ['v', 'temp', 'p', 'p_v', 'p_t', 'p_vt', 'coeffs',
+                  'coeffs_node', 'counts']
@@ -0,0 +1,143 @@
+"""
+Array-native root finders used for inverting equations of state.
+All functions here work on float numpy arrays, element by element, and
+iterate only on the elements which are not converged yet.
+"""
+import numpy as np
+
+
+def newton_bracket(f_df, x0, x_lo, x_hi, xtol=1.e-12, maxiter=50):
+    """
+    find roots of many monotonic functions at once using Newton steps
+    safeguarded by a bracket.  A Newton step leaving the bracket is
+    replaced by bisection.
+
+    :param f_df: function of (x, idx) returning (f, df/dx) for the elements
+        selected by the integer index array idx
+    :param x0: initial guesses
+    :param x_lo: lower bounds of the brackets
+    :param x_hi: upper bounds of the brackets
+    :param xtol: relative tolerance for convergence
+    :param maxiter: maximum number of iterations
+    :return: roots and boolean array for convergence
+    """
+    x = np.array(x0, dtype=float, copy=True).ravel()
+    lo = np.broadcast_to(x_lo, x.shape).astype(float).ravel()
+    hi = np.broadcast_to(x_hi, x.shape).astype(float).ravel()
+    f_lo = f_df(lo, np.arange(x.size))[0]
+    converged = np.zeros(x.size, dtype=bool)
+    active = np.flatnonzero(np.isfinite(x))
+    for i in range(maxiter):
+        if active.size == 0:
+            break
+        xa = x[active]
+        f, df = f_df(xa, active)
+        # keep the sign change inside [lo, hi]
+        same_side = np.sign(f) == np.sign(f_lo[active])
+        lo[active] = np.where(same_side, xa, lo[active])
+        f_lo[active] = np.where(same_side, f, f_lo[active])
+        hi[active] = np.where(same_side, hi[active], xa)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_new = xa - f / df
+        outside = ~((x_new >= lo[active]) & (x_new <= hi[active]))
+        x_new[outside] = 0.5 * (lo[active] + hi[active])[outside]
+        x[active] = x_new
+        done = (np.abs(x_new - xa) <= xtol * np.abs(xa)) | (f == 0.)
+        converged[active[done]] = True
+        active = active[~done]
+    return x, converged
+
+
+def illinois(f, x_lo, x_hi, xtol=1.e-12, maxiter=100):
+    """
+    find roots of many functions at once using the Illinois variant of
+    the regula falsi method.  The brackets must contain a sign change.
+
+    :param f: function of (x, idx) returning function values for the
+        elements selected by the integer index array idx
+    :param x_lo: lower bounds of the brackets
+    :param x_hi: upper bounds of the brackets
+    :param xtol: relative tolerance for convergence
+    :param maxiter: maximum number of iterations
+    :return: roots and boolean array for convergence
+    """
+    a = np.array(x_lo, dtype=float, copy=True).ravel()
+    b = np.broadcast_to(x_hi, a.shape).astype(float).ravel()
+    idx = np.arange(a.size)
+    fa = f(a, idx)
+    fb = f(b, idx)
+    x = np.where(np.abs(fa) < np.abs(fb), a, b)
+    converged = (fa == 0.) | (fb == 0.)
+    x[fa == 0.] = a[fa == 0.]
+    x[fb == 0.] = b[fb == 0.]
+    active = np.flatnonzero(~converged & (np.sign(fa) != np.sign(fb)))
+    side = np.zeros(a.size, dtype=int)
+    for i in range(maxiter):
+        if active.size == 0:
+            break
+        aa, bb, faa, fbb = a[active], b[active], fa[active], fb[active]
+        c = (aa * fbb - bb * faa) / (fbb - faa)
+        fc = f(c, active)
+        x[active] = c
+        left = np.sign(fc) == np.sign(faa)
+        # replace the end point with the same sign and halve the other one
+        # if the same end point is kept twice in a row
+        a[active] = np.where(left, c, aa)
+        fa[active] = np.where(left, fc, faa)
+        b[active] = np.where(left, bb, c)
+        fb[active] = np.where(left, fbb, fc)
+        s = side[active]
+        halve_b = left & (s == 1)
+        halve_a = ~left & (s == -1)
+        fb[active[halve_b]] *= 0.5
+        fa[active[halve_a]] *= 0.5
+        side[active] = np.where(left, 1, -1)
+        width = np.abs(b[active] - a[active])
+        done = (width <= xtol * np.abs(c)) | (fc == 0.) | \
+            (np.abs(fc) <= 1.e-15 * (np.abs(faa) + np.abs(fbb)))
+        converged[active[done]] = True
+        active = active[~done]
+    return x, converged
+
+
+def invert_static(p, v0, f_p, f_dpdv, v_init, f_single, min_strain=0.01,
+                  xtol=1.e-12, maxiter=50):
+    """
+    find volumes at given pressures for a static EOS using safeguarded
+    Newton iterations on the whole array.  Elements which do not converge
+    are handed over to the scalar root finder, f_single.
+
+    :param p: pressure in GPa, float array
+    :param v0: unit-cell volume in A^3 at 1 bar
+    :param f_p: function of volume returning pressure
+    :param f_dpdv: function of volume returning dP/dV
+    :param v_init: function of pressure returning initial guesses of volume
+    :param f_single: scalar function of pressure returning volume,
+        used as a bracketed fallback
+    :param min_strain: defining minimum v/v0 value to search volume for
+    :param xtol: relative tolerance for convergence
+    :param maxiter: maximum number of Newton iterations
+    :return: unit-cell volume in A^3, in the same shape as p
+    """
+    p = np.asarray(p, dtype=float)
+    pp = p.ravel()
+    v = np.full(pp.shape, float(v0))
+    todo = np.flatnonzero(pp > 1.e-5)
+    if todo.size == 0:
+        return v.reshape(p.shape)
+    p_t = pp[todo]
+    v_lo = v0 * min_strain
+    # only elements with a sign change in [v0 * min_strain, v0] go to Newton
+    bracketed = (f_p(v_lo) - p_t) * (f_p(v0) - p_t) < 0.
+
+    def f_df(x, idx):
+        return f_p(x) - p_t[idx], f_dpdv(x)
+
+    x0 = np.clip(v_init(p_t), v_lo, v0)
+    x, converged = newton_bracket(f_df, x0, v_lo, v0, xtol=xtol,
+                                  maxiter=maxiter)
+    converged &= bracketed
+    v[todo[converged]] = x[converged]
+    for i in todo[~converged]:
+        v[i] = f_single(pp[i])
+    return v.reshape(p.shape)
@@ -0,0 +1,21 @@
+"""
+Tests for the conversion of pressure between scales
+"""
+import numpy as np
+import pytest
+from pytheos.scales.convert import convert_pressure
+
+
+def test_convert_same_scale():
+    """conversion to the same scale returns the pressure"""
+    p = convert_pressure(30., 300., 'gold/Fei2007bm3', 'gold/Fei2007bm3')
+    assert np.isclose(p, 30.)
+
+
+@pytest.mark.parametrize('from_scale, to_scale', [
+    ('gold/Fei2007bm3', 'platinum/Fei2007bm3'),
+    ('sodium_chloride_b2/Dorogokupets2007', 'sodium_chloride_b2/Fei2007bm3')])
+def test_convert_different_standards(from_scale, to_scale):
+    """scales of different materials or v0 are rejected"""
+    with pytest.raises(ValueError):
+        convert_pressure(30., 300., from_scale, to_scale)
@@ -0,0 +1,38 @@
+"""
+Tests for the tabulated Debye functions, pytheos.eqn_debye
+"""
+import numpy as np
+import pytest
+from pytheos.eqn_debye import DebyeTable, debye_E, cal_debye_E
+
+
+@pytest.mark.parametrize('rtol', [1.e-4, 1.e-8, 1.e-10])
+def test_debye_table_rtol(rtol):
+    """
+    the table is as coarse as rtol allows and within rtol
+    """
+    x = np.linspace(0., 60., 1001)
+    assert np.abs(debye_E(x, table=True, rtol=rtol) /
+                  cal_debye_E(x) - 1.).max() <= rtol
+    # the error of the table stops at about 5e-12
+    assert DebyeTable(rtol=rtol).h >= \
+        DebyeTable(rtol=max(rtol * 1.e-2, 1.e-11)).h
+
+
+def test_debye_table_breakpoints():
+    """
+    the table is within rtol at and next to the formula switches of
+    cal_debye_E
+    """
+    x = np.array([0.1, 7.25])
+    x = np.concatenate([x, x + 1.e-12, x - 1.e-12])
+    assert np.abs(debye_E(x, table=True) / cal_debye_E(x) - 1.).max() <= \
+        1.e-10
+
+
+def test_debye_table_unreachable_rtol():
+    """
+    rtol below the accuracy of cal_debye_E fails without refining further
+    """
+    with pytest.raises(ValueError):
+        DebyeTable(rtol=1.e-14)
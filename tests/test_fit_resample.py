@@ -0,0 +1,26 @@
+"""
+Tests for the bootstrap and jackknife fits
+"""
+import numpy as np
+import pytest
+
+lmfit = pytest.importorskip('lmfit')
+
+
+def test_lists_are_resampled():
+    """independent variables given as lists are resampled with the data"""
+    from pytheos.eqn_bm3 import bm3_p
+    from pytheos.fit_static import BM3Model
+    from pytheos.fit_resample import resample_fit
+    rng = np.random.default_rng(0)
+    v = np.linspace(50., 67., 20)
+    p = bm3_p(v, 67., 167., 5.) + rng.normal(0., 0.1, v.size)
+    model = BM3Model()
+    params = model.make_params(v0=67., k0=160., k0p=4.)
+    params['v0'].vary = False
+    indices = rng.integers(0, v.size, size=(5, v.size))
+    from_array = resample_fit(model, p, params, indices, max_workers=1,
+                              v=v)
+    from_list = resample_fit(model, p, params, indices, max_workers=1,
+                             v=list(v))
+    assert np.allclose(from_array, from_list)
@@ -0,0 +1,24 @@
+"""
+Tests for temperature along a Hugoniot, pytheos.eqn_hugoniot
+"""
+import numpy as np
+import uncertainties as uct
+from uncertainties import unumpy as unp
+from pytheos.eqn_hugoniot import hugoniot_t
+
+
+def test_hugoniot_t_std_at_rho0():
+    """
+    batch integration gives the same errors as uct.wrap, including at
+    rho = rho0 where temperature still depends on rho0
+    """
+    rho0 = uct.ufloat(19.2827, 0.01)
+    rho = np.array([19.2827, 19.30, 19.5])
+    args = (rho0, 3.12, 1.57, 2.97, 1., 170., 1, 196.97)
+    t_batch = hugoniot_t(rho, *args, batch=True)
+    t_single = hugoniot_t(rho, *args, batch=False)
+    assert np.allclose(unp.nominal_values(t_batch),
+                       unp.nominal_values(t_single), rtol=1.e-6)
+    assert np.allclose(unp.std_devs(t_batch), unp.std_devs(t_single),
+                       rtol=1.e-3)
+    assert unp.std_devs(t_batch)[0] > 0.
@@ -0,0 +1,74 @@
+"""
+Tests for the lazy top-level imports of pytheos
+"""
+import os
+import sys
+import subprocess
+
+# cumulative import time of pytheos in seconds.  A bare import takes a few
+# ms.  Importing lmfit or matplotlib alone takes more than 0.5 s.
+import_time_budget = 0.1
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code, *options):
+    """
+    run python code in a fresh interpreter with pytheos from this tree
+
+    :param code: python code
+    :param options: options for the interpreter
+    :return: completed process
+    :note: internal function
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    return subprocess.run([sys.executable] + list(options) + ['-c', code],
+                          env=env, capture_output=True, text=True,
+                          check=True)
+
+
+def _cumulative_time(stderr, module):
+    """
+    read cumulative import time of a top-level module from -X importtime
+
+    :param stderr: output of python -X importtime
+    :param module: module name
+    :return: import time in seconds
+    :note: internal function
+    """
+    for line in stderr.splitlines():
+        fields = line.split('|')
+        # nested imports are indented further
+        if (len(fields) == 3) and (fields[2] == ' ' + module):
+            return int(fields[1]) * 1.e-6
+    raise ValueError(module + ' is not found in the output.')
+
+
+def test_import_time():
+    """
+    bare import of pytheos stays within the budget
+    """
+    times = [_cumulative_time(
+        _run('import pytheos', '-X', 'importtime').stderr, 'pytheos')
+        for i in range(3)]
+    assert min(times) < import_time_budget
+
+
+def test_import_is_lazy():
+    """
+    bare import of pytheos does not import lmfit, matplotlib, or the
+    scale modules, which are imported on the first access
+    """
+    code = ('import sys, pytheos\n'
+            'print(" ".join(sorted(sys.modules)))\n'
+            'pytheos.gold\n'
+            'print("pytheos.scales.gold" in sys.modules)\n')
+    out = _run(code).stdout.splitlines()
+    modules = out[0].split()
+    for name in ['lmfit', 'matplotlib', 'periodictable', 'pytheos.plot',
+                 'pytheos.scales']:
+        assert not any((m == name) or m.startswith(name + '.')
+                       for m in modules), name
+    assert out[1] == 'True'
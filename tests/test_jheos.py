@@ -0,0 +1,53 @@
+"""
+Tests for the cached static pressure of JHEOS
+"""
+import numpy as np
+import pytest
+import uncertainties as uct
+from uncertainties import unumpy as unp
+from pytheos.scales.registry import get_scale
+from pytheos.scales import gold
+
+
+def test_cal_p_uncertainties_from_cache():
+    """
+    pressure with uncertainties from the cached tables agrees with the
+    direct calculation through the hugoniot
+    """
+    eos = gold.Jamieson1982H()
+    v0 = uct.nominal_value(eos.params_therm['v0'])
+    v = v0 * np.linspace(0.75, 0.99, 5)
+    temp = np.linspace(300., 2000., 5)
+    p = eos.cal_p(v, temp)
+    eos.cache_pst = False
+    p_direct = eos.cal_p(v, temp)
+    assert np.allclose(unp.nominal_values(p), unp.nominal_values(p_direct),
+                       atol=1.e-4)
+    assert np.allclose(unp.std_devs(p), unp.std_devs(p_direct), rtol=1.e-4)
+
+
+def test_cal_v_min_strain_below_table():
+    """
+    min_strain below the static pressure table is raised with a warning
+    """
+    eos = get_scale('gold/Jamieson1982L')
+    with pytest.warns(RuntimeWarning, match='min_strain'):
+        v = eos.cal_v(10., 1000., min_strain=0.5)
+    assert np.isclose(v, eos.cal_v(10., 1000.))
+
+
+def test_cal_v_stable_branch():
+    """
+    without the cache, volumes are found only where pressure decreases
+    with volume and nan is returned beyond the maximum of the hugoniot
+    """
+    eos = gold.Jamieson1982L()
+    eos.cache_pst = False
+    v0 = uct.nominal_value(eos.params_therm['v0'])
+    p = np.array([50., 150., 2000.])
+    temp = np.full(p.size, 2000.)
+    v = eos.cal_v(p, temp)
+    assert np.isclose(eos.cal_p(v[0], 2000., nominal=True), p[0],
+                      rtol=1.e-6)
+    assert 0.8 * v0 < v[0] < v0
+    assert np.isnan(v[1:]).all()
@@ -0,0 +1,26 @@
+"""
+Tests for the phase boundary between B1 and B2 NaCl
+"""
+import numpy as np
+import pytest
+from pytheos.scales.registry import get_scale
+from pytheos.phase_boundary import cal_phase_boundary, cal_delta_g
+
+
+def test_dg0_is_required():
+    """dg0 has no default"""
+    b1 = get_scale('sodium_chloride/Dorogokupets2007')
+    b2 = get_scale('sodium_chloride_b2/Dorogokupets2007')
+    with pytest.raises(TypeError):
+        cal_phase_boundary(b1, b2, [300.])
+
+
+def test_boundary_through_known_point():
+    """boundary passes through the point used to set dg0"""
+    b1 = get_scale('sodium_chloride/Dorogokupets2007')
+    b2 = get_scale('sodium_chloride_b2/Dorogokupets2007')
+    dg0 = -cal_delta_g(b1, b2, 29.3, 300., 0.)
+    result = cal_phase_boundary(b1, b2, [300., 1000.], dg0,
+                                p_range=(0., 60.))
+    assert np.isclose(result['p'][0], 29.3, rtol=1.e-6)
+    assert np.isfinite(result['p'][1]) and (result['p'][1] > 0.)
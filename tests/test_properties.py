@@ -0,0 +1,50 @@
+"""
+Tests for the thermodynamic properties of MGEOS, pytheos.properties
+"""
+import numpy as np
+import pytest
+from pytheos.properties import cal_tsuchiya_terms, _get_values
+from pytheos.scales.registry import get_scale, list_scales
+
+mgeos_keys = [info['key'] for info in list_scales()
+              if info['type'] == 'MGEOS']
+
+
+@pytest.mark.parametrize('key', mgeos_keys)
+def test_adiabat_isentropic(key):
+    """
+    entropy is conserved along adiabats for every scale with heat capacity
+    """
+    eos = get_scale(key)
+    p = np.linspace(30., 90., 7)
+    temp0 = np.array([1000., 2000.])
+    if np.all(eos.cal_properties(eos.cal_v(p[0], 1000.), 1000.)['c_v'] ==
+              0.):
+        pytest.skip('no heat capacity, adiabats are not defined')
+    v, temp = eos.cal_adiabat(p, temp0, p0=p[0])
+    assert np.all(np.isfinite(temp))
+    s = eos.cal_properties(v, temp)['s']
+    assert np.allclose(s, s[:, :1], rtol=1.e-6, atol=0.)
+
+
+def test_tsuchiya_heat_capacity():
+    """
+    heat capacity of the Tsuchiya electronic term is T dS/dT
+    """
+    eos = get_scale('gold/Yokoo2009')
+    params = _get_values(eos.params_el)
+    v = eos.params_st['v0'].nominal_value * np.array([0.7, 0.85, 1.])
+    temp, h = 2000., 1.e-2
+
+    def cal_terms(t):
+        return cal_tsuchiya_terms(v, t, params, eos.n, eos.z, eos.t_ref,
+                                  eos.three_r)
+
+    c_v = cal_terms(temp)[3]
+    ds = cal_terms(temp + h)[5] - cal_terms(temp - h)[5]
+    assert np.all(c_v > 0.)
+    assert np.allclose(c_v, temp * ds / (2. * h), rtol=1.e-6)
+    # the whole EOS agrees as well
+    s = [eos.cal_properties(v, t)['s'] for t in [temp - h, temp + h]]
+    assert np.allclose(eos.cal_properties(v, temp)['c_v'],
+                       temp * (s[1] - s[0]) / (2. * h), rtol=1.e-5)
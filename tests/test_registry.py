@@ -0,0 +1,25 @@
+"""
+Tests for the registry of pressure scales
+"""
+from pytheos.scales import registry
+
+
+def test_list_scales_without_construction():
+    """list_scales reads the class attributes without building scales"""
+    registry._scales.clear()
+    scales = registry.list_scales()
+    assert len(registry._scales) == 0
+    assert all(info['reference'] for info in scales)
+
+
+def test_list_scales_matches_objects():
+    """class attributes agree with the constructed scales"""
+    for info in registry.list_scales():
+        scale = registry.get_scale(info['key'])
+        assert scale.reference == info['reference']
+        assert scale.p_range == info['p_range']
+        assert scale.t_range == info['t_range']
+        if info['type'] == 'MGEOS':
+            assert (scale.eqn_st, scale.eqn_th, scale.eqn_anh,
+                    scale.eqn_el) == (info['eqn_st'], info['eqn_th'],
+                                      info['eqn_anh'], info['eqn_el'])